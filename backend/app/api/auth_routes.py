@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 from app.core.database import get_db
 from app.middleware.auth import get_current_user
-from app.models.user import User
+from app.core.auth_cache import AuthenticatedUser
 from app.services.auth_service import AuthService
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -42,18 +42,18 @@ class RefreshTokenRequest(BaseModel):
 
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
-def signup(data: SignupRequest, request: Request, db: Session = Depends(get_db)):
+async def signup(data: SignupRequest, request: Request, db: Session = Depends(get_db)):
     """Register a new user."""
     ip_address = request.client.host if request.client else None
-    return AuthService.signup(db, data.email, data.password, ip_address=ip_address)
+    return await AuthService.signup(db, data.email, data.password, ip_address=ip_address)
 
 
 @router.post("/login")
-def login(data: LoginRequest, request: Request, db: Session = Depends(get_db)):
+async def login(data: LoginRequest, request: Request, db: Session = Depends(get_db)):
     """Login with email/password."""
     ip_address = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent")
-    return AuthService.login(db, data.email, data.password, ip_address=ip_address, user_agent=user_agent)
+    return await AuthService.login(db, data.email, data.password, ip_address=ip_address, user_agent=user_agent)
 
 
 @router.post("/logout")
@@ -75,7 +75,7 @@ def verify_email(data: VerifyEmailRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/resend-verification")
-def resend_verification(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def resend_verification(user: AuthenticatedUser = Depends(get_current_user), db: Session = Depends(get_db)):
     """Resend verification email."""
     return AuthService.resend_verification(db, user)
 
@@ -87,13 +87,13 @@ def forgot_password(data: ForgotPasswordRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/reset-password")
-def reset_password(data: ResetPasswordRequest, db: Session = Depends(get_db)):
+async def reset_password(data: ResetPasswordRequest, db: Session = Depends(get_db)):
     """Reset password with token."""
-    return AuthService.reset_password(db, data.token, data.password)
+    return await AuthService.reset_password(db, data.token, data.password)
 
 
 @router.get("/me")
-def get_profile(user: User = Depends(get_current_user)):
+def get_profile(user: AuthenticatedUser = Depends(get_current_user)):
     """Get current user profile."""
     return {
         "id": user.id,
@@ -1,30 +1,56 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-import uuid
-from datetime import datetime, timezone
+import json
+import os
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from app.core.database import get_db
-from app.repositories.job_repository import JobRepository, get_job_repository
-from app.repositories.slide_repository import SlideRepository
-from app.services.s3_service import S3Service, get_s3_service
-from app.middleware.auth import get_current_user
+from app.core.config import get_settings
+from app.core.database import get_async_db
+from app.repositories.input_repository import AsyncInputRepository
+from app.repositories.job_repository import AsyncJobRepository, encode_job_cursor
+from app.repositories.slide_repository import AsyncSlideRepository
+from app.services.s3_service import (
+    DirectUploadUnavailableError,
+    S3Service,
+    UploadTooLargeError,
+    get_s3_service,
+    input_key,
+    input_sha256,
+    staging_key
+)
+from app.core.auth_utils import create_upload_token, decode_token
+from app.middleware.auth import get_current_user, require_admin
+from app.core.cancellation import request_cancellation
+from app.services.admission_service import AdmissionRejectedError, AdmissionService, CELERY_PRIORITIES
+from app.services.eta_service import EtaService
+from app.core.profiling import profile_prefix
+from app.core.tempfiles import TEMP_PREFIX
 from app.schemas.job import (
     FileUploadResponse,
+    PresignedUploadRequest,
+    PresignedUploadResponse,
+    UploadCompleteRequest,
     JobCreateRequest,
     JobCreateResponse,
     JobStatusResponse,
     PresignedUrlResponse,
     JobListResponse,
-    SlideRegenerateRequest
+    SlideRegenerateRequest,
+    JobProfileRequest,
+    JobProfileResponse
 )
 from app.schemas.slide import SlideResponse
-from app.models.job import JobStatus
+from app.models.job import CANCELLED_MESSAGE, JobStatus
+from app.core.auth_cache import AuthenticatedUser
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 router = APIRouter(prefix="/api/v1", tags=["PPT Generation"], dependencies=[Depends(get_current_user)])
 public_router = APIRouter(prefix="/api/v1", tags=["PPT Generation"])
@@ -33,7 +59,9 @@ public_router = APIRouter(prefix="/api/v1", tags=["PPT Generation"])
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_file(
     file: UploadFile = File(...),
-    s3_service: S3Service = Depends(get_s3_service)
+    db: AsyncSession = Depends(get_async_db),
+    s3_service: S3Service = Depends(get_s3_service),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """
     Upload a file to S3 for PPT generation.
@@ -44,29 +72,197 @@ async def upload_file(
     Returns:
         FileUploadResponse with S3 key and file metadata
     """
+    async def chunks():
+        while chunk := await file.read(settings.upload_chunk_size):
+            yield chunk
+    
+    return await _store_upload(
+        chunks(), file.filename, file.content_type, s3_service, AsyncInputRepository(db), current_user.id
+    )
+
+
+@router.post("/upload/stream", response_model=FileUploadResponse)
+async def upload_file_stream(
+    request: Request,
+    filename: str = Query(..., description="Original file name"),
+    db: AsyncSession = Depends(get_async_db),
+    s3_service: S3Service = Depends(get_s3_service),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Upload a file sent as the raw request body (Content-Type = file type).
+    
+    The body is streamed straight to storage, so memory use is bounded by
+    the upload chunk size whatever the file size. Files over
+    settings.upload_max_bytes are rejected with 413.
+    
+    Args:
+        filename: Original file name
+        
+    Returns:
+        FileUploadResponse with S3 key and file metadata
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.upload_max_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds {settings.upload_max_bytes} bytes")
+    
+    return await _store_upload(
+        request.stream(), filename, request.headers.get("content-type"),
+        s3_service, AsyncInputRepository(db), current_user.id
+    )
+
+
+@router.post("/upload/presign", response_model=PresignedUploadResponse)
+async def presign_upload(
+    request: PresignedUploadRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    s3_service: S3Service = Depends(get_s3_service)
+):
+    """
+    Get presigned URLs to upload a file straight to S3.
+    
+    The client PUTs the file (or each part of it) to the returned URLs, then
+    calls /upload/complete with upload_token, so file bytes never pass
+    through the API. When the user already uploaded the same content and it
+    is still stored, already_uploaded is set and there is nothing to
+    upload. Content stored for other users must still be sent, as proof of
+    possession: a hash alone grants nothing. Returns 501 in Dev Mode; use
+    /upload there.
+    
+    Args:
+        request: File name, size, SHA-256 and content type
+        
+    Returns:
+        PresignedUploadResponse with the URLs and the token to complete with
+    """
+    if request.file_size > settings.upload_max_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds {settings.upload_max_bytes} bytes")
+    
+    sha256 = request.sha256.lower()
+    s3_key = input_key(sha256, request.file_name)
+    upload = {"staging_key": None, "upload_id": None}
+    response = PresignedUploadResponse(upload_token="", s3_key=s3_key, expires_in=settings.presigned_upload_expiry)
+    try:
+        # Same content uploaded by this user before: nothing to send
+        response.already_uploaded = (
+            await AsyncInputRepository(db).is_owner(current_user.id, s3_key)
+            and await run_in_threadpool(s3_service.file_exists, s3_key)
+        )
+        if not response.already_uploaded:
+            presigned = await run_in_threadpool(
+                s3_service.presign_upload,
+                staging_key(request.file_name), request.file_size, sha256, request.content_type
+            )
+            upload = {"staging_key": presigned.s3_key, "upload_id": presigned.upload_id}
+            response.url = presigned.url
+            response.headers = presigned.headers
+            response.upload_id = presigned.upload_id
+            response.part_size = presigned.part_size
+            response.part_urls = presigned.part_urls
+    except DirectUploadUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to presign upload: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to presign upload: {str(e)}")
+    
+    # An upload started just before its URLs expire still has an hour to finish
+    response.upload_token = create_upload_token(
+        {
+            "sub": current_user.id,
+            "key": s3_key,
+            "name": request.file_name,
+            "size": request.file_size,
+            "sha256": sha256,
+            **upload
+        },
+        timedelta(seconds=response.expires_in + 3600)
+    )
+    return response
+
+
+@router.post("/upload/complete", response_model=FileUploadResponse)
+async def complete_upload(
+    request: UploadCompleteRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    s3_service: S3Service = Depends(get_s3_service)
+):
+    """
+    Verify a direct upload against the size and SHA-256 declared at presign time.
+    
+    The returned s3_key can then be used to create a job. An upload that
+    doesn't match is deleted and rejected with 400.
+    
+    Args:
+        request: Token from /upload/presign
+        
+    Returns:
+        FileUploadResponse with S3 key and file metadata
+    """
+    token = decode_token(request.upload_token)
+    if not token or token.get("type") != "upload" or token.get("sub") != current_user.id:
+        raise HTTPException(status_code=400, detail="Invalid or expired upload token")
+    
+    try:
+        if token.get("staging_key"):
+            intact = await s3_service.complete_direct_upload(
+                token["staging_key"], token["size"], token["sha256"], upload_id=token.get("upload_id")
+            )
+            if intact:
+                await s3_service.promote(token["staging_key"], token["key"])
+        else:
+            # The user's own earlier upload; gone if its last job was deleted since
+            intact = await run_in_threadpool(s3_service.file_exists, token["key"])
+        if intact:
+            await AsyncInputRepository(db).record_upload(current_user.id, token["key"])
+    except Exception as e:
+        logger.error(f"Failed to complete upload: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to complete upload: {str(e)}")
+    if not intact:
+        raise HTTPException(status_code=400, detail="Uploaded file is missing or doesn't match its size and SHA-256")
+    
+    return FileUploadResponse(
+        s3_key=token["key"],
+        file_name=token["name"],
+        file_size=token["size"],
+        sha256=token["sha256"]
+    )
+
+
+async def _store_upload(
+    chunks,
+    filename: str,
+    content_type: Optional[str],
+    s3_service: S3Service,
+    input_repo: AsyncInputRepository,
+    user_id: str
+) -> FileUploadResponse:
+    """
+    Stream an upload to storage, enforcing the size limit, and file it under
+    its content hash (reusing the stored copy of content seen before). The
+    user is recorded as an uploader of the input.
+    """
     try:
-        # Generate unique S3 key with ppt-yash-proj prefix
-        file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
-        s3_key = f"ppt-yash-proj/inputs/{uuid.uuid4()}.{file_extension}"
-        
-        # Get file size first
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset
-        
-        # Upload to S3 (or local storage)
-        await s3_service.upload_file(
-            file.file,
-            s3_key,
-            content_type=file.content_type
+        stored = await s3_service.upload_stream(
+            chunks,
+            staging_key(filename),
+            content_type=content_type,
+            max_bytes=settings.upload_max_bytes
         )
+        s3_key = input_key(stored.sha256, filename)
+        await s3_service.promote(stored.s3_key, s3_key)
+        await input_repo.record_upload(user_id, s3_key)
         
         return FileUploadResponse(
             s3_key=s3_key,
-            file_name=file.filename,
-            file_size=file_size
+            file_name=filename,
+            file_size=stored.size,
+            sha256=stored.sha256
         )
     
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         logger.error(f"File upload failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
@@ -75,13 +271,19 @@ async def upload_file(
 @router.post("/jobs", response_model=JobCreateResponse)
 async def create_job(
     request: JobCreateRequest,
-    db: Session = Depends(get_db),
-    s3_service: S3Service = Depends(get_s3_service)
+    db: AsyncSession = Depends(get_async_db),
+    s3_service: S3Service = Depends(get_s3_service),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """
     Create a new PPT generation job and queue it for processing.
     Returns immediately with job ID - processing happens asynchronously.
     
+    The input must have been uploaded by the user (inputs are shared by
+    content hash, so knowing a key proves nothing). Refused with 429 and a
+    Retry-After estimate when the user or the system has too many
+    unfinished jobs (see AdmissionService).
+    
     Args:
         request: Job creation request with input S3 key and config
         
@@ -89,15 +291,21 @@ async def create_job(
         JobCreateResponse with job ID and status
     """
     try:
-        # Verify input file exists in S3
-        if not s3_service.file_exists(request.input_s3_key):
+        # Verify the user uploaded the input and it still exists in S3
+        if not await AsyncInputRepository(db).is_owner(current_user.id, request.input_s3_key) \
+                or not await run_in_threadpool(s3_service.file_exists, request.input_s3_key):
             raise HTTPException(status_code=404, detail="Input file not found in S3")
         
+        job_repo = AsyncJobRepository(db)
+        await AdmissionService(job_repo).admit(current_user.id, request.priority)
+        
         # Create job in database
-        job_repo = JobRepository(db)
-        job = job_repo.create_job(
+        job = await job_repo.create_job(
             input_s3_key=request.input_s3_key,
-            config=request.config
+            config=request.config,
+            user_id=current_user.id,
+            input_sha256=input_sha256(request.input_s3_key),
+            priority=request.priority
         )
         
         logger.info(f"Created job: {job.id}, queuing for processing...")
@@ -105,12 +313,20 @@ async def create_job(
         # Queue the entire pipeline (HTML generation + conversion)
         try:
             from app.tasks.conversion_tasks import generate_html_and_convert_task
-            task_result = generate_html_and_convert_task.delay(job.id)
+            # Publishing is blocking broker I/O (and runs the whole task when
+            # Celery is in eager mode), so keep it off the event loop. The task
+            # ID is the job ID so cancelling can revoke it while still queued.
+            task_result = await run_in_threadpool(
+                generate_html_and_convert_task.apply_async,
+                args=[job.id],
+                task_id=job.id,
+                priority=CELERY_PRIORITIES[job.priority]
+            )
             logger.info(f"Job {job.id} queued successfully with task ID: {task_result.id}")
         except Exception as e:
             logger.error(f"Failed to queue job {job.id}: {str(e)}")
             # Update job with error
-            job_repo.update_job_status(job.id, JobStatus.FAILED, error_message=f"Failed to queue task: {str(e)}")
+            await job_repo.update_job_status(job.id, JobStatus.FAILED, error_message=f"Failed to queue task: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to queue job: {str(e)}")
         
         return JobCreateResponse(
@@ -119,6 +335,10 @@ async def create_job(
             created_at=job.created_at
         )
     
+    except AdmissionRejectedError as e:
+        # Release the admission lock on the user's row
+        await db.rollback()
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except HTTPException:
         raise
     except Exception as e:
@@ -129,19 +349,22 @@ async def create_job(
 @router.get("/jobs/{job_id}", response_model=JobStatusResponse)
 async def get_job_status(
     job_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get the status of a PPT generation job.
     
+    Unfinished jobs include an estimated time to completion and, while
+    pending, their position in the queue.
+    
     Args:
         job_id: Job ID
         
     Returns:
         JobStatusResponse with current status and progress
     """
-    job_repo = JobRepository(db)
-    job = job_repo.get_job(job_id)
+    job_repo = AsyncJobRepository(db)
+    job = await job_repo.get_job(job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -151,6 +374,8 @@ async def get_job_status(
     if job.total_slides > 0:
         progress = (job.completed_slides / job.total_slides) * 100
     
+    eta = await EtaService(job_repo).estimate(job)
+    
     return JobStatusResponse(
         job_id=job.id,
         status=job.status,
@@ -162,33 +387,53 @@ async def get_job_status(
         created_at=job.created_at,
         updated_at=job.updated_at,
         started_at=job.started_at,
-        completed_at=job.completed_at
+        completed_at=job.completed_at,
+        eta_seconds=eta.eta_seconds,
+        queue_position=eta.queue_position,
+        estimated_completion_at=eta.estimated_completion_at
     )
 
 
 @router.get("/jobs", response_model=JobListResponse)
 async def list_jobs(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (deprecated, use cursor)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
     status: Optional[JobStatus] = Query(None, description="Filter by status"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """
-    List all PPT generation jobs with pagination.
+    List the current user's PPT generation jobs, newest first.
+    
+    Follow next_cursor to page through the list; page is still accepted
+    for older clients but gets slower the deeper it goes. total is cached
+    for a few seconds.
     
     Args:
-        page: Page number (1-indexed)
+        page: Page number (1-indexed), ignored when cursor is given
         page_size: Number of items per page
         status: Optional status filter
+        cursor: Cursor returned with the previous page
         
     Returns:
         JobListResponse with paginated jobs
     """
-    job_repo = JobRepository(db)
+    job_repo = AsyncJobRepository(db)
     
-    skip = (page - 1) * page_size
-    jobs = job_repo.list_jobs(skip=skip, limit=page_size, status=status)
-    total = job_repo.count_jobs(status=status)
+    skip = 0 if cursor else (page - 1) * page_size
+    try:
+        # One extra row tells whether there is a next page
+        jobs = await job_repo.list_jobs(
+            current_user.id, limit=page_size + 1, status=status, cursor=cursor, skip=skip
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = None
+    if len(jobs) > page_size:
+        jobs = jobs[:page_size]
+        next_cursor = encode_job_cursor(jobs[-1])
+    total = await job_repo.count_jobs(current_user.id, status=status)
     
     job_responses = []
     for job in jobs:
@@ -214,7 +459,8 @@ async def list_jobs(
         jobs=job_responses,
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
@@ -222,7 +468,7 @@ async def list_jobs(
 async def get_download_url(
     job_id: str,
     expiration: int = Query(3600, ge=60, le=86400, description="URL expiration in seconds"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     s3_service: S3Service = Depends(get_s3_service)
 ):
     """
@@ -235,8 +481,8 @@ async def get_download_url(
     Returns:
         PresignedUrlResponse with presigned download URL
     """
-    job_repo = JobRepository(db)
-    job = job_repo.get_job(job_id)
+    job_repo = AsyncJobRepository(db)
+    job = await job_repo.get_job(job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -266,19 +512,22 @@ async def get_download_url(
 @router.post("/jobs/{job_id}/cancel")
 async def cancel_job(
     job_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Cancel a running job.
     
+    Marks the job cancelled and signals its worker, which stops before the
+    next slide or conversion step and aborts an LLM request in flight.
+    
     Args:
         job_id: Job ID
         
     Returns:
         Success message
     """
-    job_repo = JobRepository(db)
-    job = job_repo.get_job(job_id)
+    job_repo = AsyncJobRepository(db)
+    job = await job_repo.get_job(job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -287,7 +536,9 @@ async def cancel_job(
         raise HTTPException(status_code=400, detail=f"Job is already {job.status}")
     
     try:
-        job_repo.update_job_status(job_id, JobStatus.FAILED, error_message="Cancelled by user")
+        await job_repo.update_job_status(job_id, JobStatus.FAILED, error_message=CANCELLED_MESSAGE)
+        if not await run_in_threadpool(request_cancellation, job_id):
+            logger.warning(f"Could not signal cancellation of job {job_id}, workers will see it in the database")
         logger.info(f"Job {job_id} cancelled")
         return {"message": "Job cancelled successfully"}
     
@@ -299,11 +550,10 @@ async def cancel_job(
 @router.delete("/jobs/{job_id}")
 async def delete_job(
     job_id: str,
-    db: Session = Depends(get_db),
-    s3_service: S3Service = Depends(get_s3_service)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Delete a job and its associated files.
+    Delete a job; its files are deleted by a background task.
     
     Args:
         job_id: Job ID
@@ -311,52 +561,34 @@ async def delete_job(
     Returns:
         Success message
     """
-    job_repo = JobRepository(db)
-    job = job_repo.get_job(job_id)
+    job_repo = AsyncJobRepository(db)
+    job = await job_repo.get_job(job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     try:
-        # Delete output files from S3 if exists
-        if job.output_s3_key:
-            # Delete both HTML folder and final output
-            if job.output_s3_key.startswith("html:"):
-                html_folder = job.output_s3_key.replace("html:", "")
-                # Delete HTML files (best effort)
-                try:
-                    for i in range(1, 100):  # Max 100 slides
-                        html_key = f"{html_folder}/slide_{i}.html"
-                        if s3_service.file_exists(html_key):
-                            await s3_service.delete_file(html_key)
-                        else:
-                            break
-                except:
-                    pass
-            else:
-                await s3_service.delete_file(job.output_s3_key)
-        
-        # Delete input file
-        if job.input_s3_key:
-            try:
-                await s3_service.delete_file(job.input_s3_key)
-            except:
-                pass
-        
         # Delete job from database
-        job_repo.delete_job(job_id)
-        
-        return {"message": "Job deleted successfully"}
-    
+        await job_repo.delete_job(job_id)
     except Exception as e:
         logger.error(f"Failed to delete job: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to delete job")
+    
+    # Delete HTML slides, outputs and the (unshared) input in the background
+    try:
+        from app.tasks.maintenance_tasks import delete_job_storage_task
+        await run_in_threadpool(delete_job_storage_task.delay, job_id, job.input_s3_key)
+    except Exception as e:
+        # The job is gone either way; its files are left to the storage sweep
+        logger.error(f"Failed to queue storage cleanup of job {job_id}: {str(e)}")
+    
+    return {"message": "Job deleted successfully"}
 
 
 @router.get("/jobs/{job_id}/slides")
 async def get_job_slides(
     job_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     s3_service: S3Service = Depends(get_s3_service)
 ):
     """
@@ -369,15 +601,15 @@ async def get_job_slides(
         List of slides with presigned URLs
     """
     try:
-        job_repo = JobRepository(db)
-        slide_repo = SlideRepository(db)
+        job_repo = AsyncJobRepository(db)
+        slide_repo = AsyncSlideRepository(db)
         
-        job = job_repo.get_job(job_id)
+        job = await job_repo.get_job(job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
         # Get slides from database
-        db_slides = slide_repo.get_by_job_id(job_id)
+        db_slides = await slide_repo.get_by_job_id(job_id)
         logger.info(f"Found {len(db_slides)} slides in database for job {job_id}")
         
         # Generate presigned URLs for each slide
@@ -409,7 +641,7 @@ async def get_job_slides(
 async def regenerate_slides(
     job_id: str,
     request: SlideRegenerateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     s3_service: S3Service = Depends(get_s3_service)
 ):
     """
@@ -423,8 +655,8 @@ async def regenerate_slides(
         Success message
     """
     try:
-        job_repo = JobRepository(db)
-        job = job_repo.get_job(job_id)
+        job_repo = AsyncJobRepository(db)
+        job = await job_repo.get_job(job_id)
         
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -434,7 +666,8 @@ async def regenerate_slides(
         
         # Queue slide regeneration task
         from app.tasks.conversion_tasks import regenerate_slides_task
-        regenerate_slides_task.delay(
+        await run_in_threadpool(
+            regenerate_slides_task.delay,
             job_id,
             request.slide_numbers,
             request.instructions
@@ -452,6 +685,66 @@ async def regenerate_slides(
         raise HTTPException(status_code=500, detail=f"Failed to regenerate slides: {str(e)}")
 
 
+@router.post("/admin/jobs/{job_id}/profile", response_model=JobProfileResponse, dependencies=[Depends(require_admin)])
+async def set_job_profiling(
+    job_id: str,
+    request: JobProfileRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Turn cProfile/tracemalloc profiling on or off for a job (admin only).
+    
+    Applies to the stages (HTML generation, conversion) that have not started yet.
+    
+    Args:
+        job_id: Job ID
+        request: Whether to enable profiling
+        
+    Returns:
+        JobProfileResponse with the new state
+    """
+    job_repo = AsyncJobRepository(db)
+    job = await job_repo.set_profiling(job_id, request.enabled)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return JobProfileResponse(job_id=job_id, enabled=request.enabled)
+
+
+@router.get("/admin/jobs/{job_id}/profile", response_model=JobProfileResponse, dependencies=[Depends(require_admin)])
+async def get_job_profile(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    s3_service: S3Service = Depends(get_s3_service)
+):
+    """
+    List a job's profile artifacts with download URLs (admin only).
+    
+    Args:
+        job_id: Job ID
+        
+    Returns:
+        JobProfileResponse with artifact URLs
+    """
+    job_repo = AsyncJobRepository(db)
+    job = await job_repo.get_job(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    prefix = profile_prefix(job_id)
+    # Listing is a blocking S3 request; presigning is local
+    names = await run_in_threadpool(s3_service.list_files, prefix)
+    artifacts = {name: s3_service.generate_presigned_url(f"{prefix}/{name}") for name in names}
+    
+    return JobProfileResponse(
+        job_id=job_id,
+        enabled=json.loads(job.config_json).get("profile", False),
+        artifacts=artifacts
+    )
+
+
 @public_router.get("/storage/{path:path}")
 async def serve_storage_file(path: str, s3_service: S3Service = Depends(get_s3_service)):
     """Serve files from S3 or local storage (proxied to avoid CORS)."""
@@ -461,7 +754,7 @@ async def serve_storage_file(path: str, s3_service: S3Service = Depends(get_s3_s
         
         # Dev mode - serve from local storage
         if settings.aws_access_key_id == "placeholder_access_key":
-            storage_base = Path(__file__).parent.parent.parent / "storage"
+            storage_base = Path(settings.local_storage_path)
             file_path = storage_base / path
             
             if not file_path.exists() or not file_path.is_file():
@@ -480,21 +773,16 @@ async def serve_storage_file(path: str, s3_service: S3Service = Depends(get_s3_s
         
         # Production - fetch from S3 and serve
         import tempfile
-        import boto3
-        
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.aws_access_key_id,
-            aws_secret_access_key=settings.aws_secret_access_key,
-            region_name=settings.aws_region
-        )
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(path).suffix) as tmp_file:
+        with tempfile.NamedTemporaryFile(delete=False, prefix=TEMP_PREFIX, suffix=Path(path).suffix) as tmp_file:
+            tmp_path = tmp_file.name
             try:
-                s3_client.download_fileobj(settings.s3_bucket_name, path, tmp_file)
-                tmp_path = tmp_file.name
+                await run_in_threadpool(
+                    s3_service.s3_client.download_fileobj, settings.s3_bucket_name, path, tmp_file
+                )
             except Exception as e:
                 logger.error(f"S3 download failed: {e}")
+                os.unlink(tmp_path)
                 raise HTTPException(status_code=404, detail="File not found in S3")
         
         content_type = 'text/html' if path.endswith('.html') else 'application/octet-stream'
@@ -505,7 +793,9 @@ async def serve_storage_file(path: str, s3_service: S3Service = Depends(get_s3_s
             headers={
                 "Cache-Control": "public, max-age=3600",
                 "Access-Control-Allow-Origin": "*"
-            }
+            },
+            # Remove the temp copy once it has been sent
+            background=BackgroundTask(os.unlink, tmp_path)
         )
         
     except HTTPException:
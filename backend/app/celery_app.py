@@ -1,5 +1,18 @@
 from celery import Celery
+from celery.concurrency import get_implementation
+from celery.concurrency.prefork import TaskPool as PreforkPool
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+)
 from app.core.config import get_settings
+from app.core import metrics, tracing
+from app.core.database import engine
 
 settings = get_settings()
 
@@ -7,7 +20,7 @@ celery_app = Celery(
     "ppt_worker",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
-    include=['app.tasks.conversion_tasks']
+    include=['app.tasks.conversion_tasks', 'app.tasks.maintenance_tasks']
 )
 
 # Celery configuration
@@ -21,4 +34,59 @@ celery_app.conf.update(
     task_acks_late=True,
     worker_prefetch_multiplier=1,  # Process one task at a time per worker
     worker_max_tasks_per_child=10,  # Restart worker after 10 tasks to prevent memory leaks
+    # Redis has no message priorities; Celery emulates them with one list per
+    # step and serves lower numbers first (see admission_service.CELERY_PRIORITIES)
+    broker_transport_options={
+        'priority_steps': list(range(10)),
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+    },
 )
+
+# Periodic tasks, run by `celery -A app.celery_app beat`
+if settings.storage_gc_interval > 0:
+    celery_app.conf.beat_schedule = {
+        'collect-storage-garbage': {
+            'task': 'app.tasks.maintenance_tasks.collect_storage_garbage',
+            'schedule': settings.storage_gc_interval,
+            # A missed run is simply done next time
+            'options': {'expires': settings.storage_gc_interval},
+        },
+    }
+
+
+@worker_init.connect
+def start_metrics_exporter(sender=None, **kwargs):
+    """Expose worker metrics; a prefork pool needs PROMETHEUS_MULTIPROC_DIR to aggregate its children."""
+    if settings.metrics_enabled:
+        prefork = issubclass(get_implementation(sender.pool_cls), PreforkPool)
+        metrics.start_worker_exporter(settings.worker_metrics_port, prefork=prefork)
+
+
+@worker_process_init.connect
+def reset_db_pool(**kwargs):
+    """Don't reuse connections inherited from the parent across the fork."""
+    engine.dispose(close=False)
+
+
+@worker_process_shutdown.connect
+def cleanup_process_metrics(pid=None, **kwargs):
+    """Discard a recycled pool process's live metrics (multiprocess mode)."""
+    # Close this child's connections now rather than leaving them to server timeouts
+    engine.dispose()
+    metrics.mark_process_dead(pid)
+    tracing.shutdown_tracing()
+
+
+@worker_init.connect
+@worker_process_init.connect
+def init_tracing(**kwargs):
+    """Set up tracing in the worker and in each pool process."""
+    tracing.setup_tracing("synthatext-worker")
+
+
+# Trace context travels from the publisher (API) to the worker in task headers
+before_task_publish.connect(tracing.inject_task_headers, weak=False)
+task_prerun.connect(tracing.start_task_span, weak=False)
+task_failure.connect(tracing.record_task_failure, weak=False)
+task_postrun.connect(tracing.end_task_span, weak=False)
@@ -0,0 +1,105 @@
+"""Cache of authenticated users and sessions.
+
+get_current_user() runs on every API request; with this cache a valid
+token is resolved without touching the database. Entries are short-lived
+and are dropped explicitly whenever what they describe changes (logout,
+token refresh, lock, password reset, profile updates).
+"""
+import hashlib
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from app.core.cache import TwoTierCache
+from app.core.config import get_settings
+from app.models.user import User
+
+_settings = get_settings()
+_users = TwoTierCache("auth:user", _settings.auth_cache_ttl, _settings.auth_cache_local_ttl)
+_sessions = TwoTierCache("auth:session", _settings.auth_cache_ttl, _settings.auth_cache_local_ttl)
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Detached snapshot of the User fields request handlers read."""
+
+    id: str
+    email: str
+    name: Optional[str] = None
+    avatar: Optional[str] = None
+    email_verified: bool = False
+    two_factor_enabled: bool = False
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    role_names: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            avatar=user.avatar,
+            email_verified=bool(user.email_verified),
+            two_factor_enabled=bool(user.two_factor_enabled),
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            role_names=tuple(role.name for role in user.roles),
+        )
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        for field in ("created_at", "updated_at"):
+            if data[field] is not None:
+                data[field] = data[field].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AuthenticatedUser":
+        data = dict(data)
+        for field in ("created_at", "updated_at"):
+            if data.get(field):
+                data[field] = datetime.fromisoformat(data[field])
+        data["role_names"] = tuple(data.get("role_names", ()))
+        return cls(**data)
+
+
+def _session_key(refresh_token: str) -> str:
+    # Never keep raw refresh tokens in Redis
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+def get_cached_user(user_id: str) -> Optional[AuthenticatedUser]:
+    """Cached snapshot of an unlocked user, if any."""
+    data = _users.get(user_id)
+    return AuthenticatedUser.from_dict(data) if data else None
+
+
+def cache_user(user: User) -> AuthenticatedUser:
+    """Snapshot an unlocked user and cache it."""
+    snapshot = AuthenticatedUser.from_user(user)
+    _users.set(user.id, snapshot.to_dict())
+    return snapshot
+
+
+def invalidate_user(user_id: str):
+    """Forget a user after a change to their account (lock, password, profile)."""
+    _users.delete(user_id)
+
+
+def get_cached_session(refresh_token: str) -> Optional[Tuple[str, datetime]]:
+    """(user_id, expires_at) of a cached session, if any."""
+    data = _sessions.get(_session_key(refresh_token))
+    if not data:
+        return None
+    return data["user_id"], datetime.fromisoformat(data["expires_at"])
+
+
+def cache_session(refresh_token: str, user_id: str, expires_at: datetime):
+    """Cache a valid session."""
+    _sessions.set(_session_key(refresh_token), {"user_id": user_id, "expires_at": expires_at.isoformat()})
+
+
+def invalidate_session(refresh_token: str):
+    """Forget a session that was revoked or rotated."""
+    _sessions.delete(_session_key(refresh_token))
@@ -0,0 +1,148 @@
+"""Small in-process caches, optionally backed by Redis."""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# After a Redis error, skip Redis for this many seconds instead of timing out on every call
+REDIS_RETRY_AFTER = 30.0
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire ttl seconds after being set.
+
+    Entries are per process: with several API workers a value may be stale
+    for up to ttl seconds after another worker changed it.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default when missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Cache a value, evicting the least recently used entry when full."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        """Drop a key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+
+_redis_client = None
+_redis_down_until = 0.0
+
+
+def shared_redis():
+    """Shared Redis client, or None while Redis is unavailable."""
+    global _redis_client
+    if time.monotonic() < _redis_down_until:
+        return None
+    if _redis_client is None:
+        import redis
+        from app.core.config import get_settings
+
+        _redis_client = redis.Redis.from_url(
+            get_settings().redis_url, socket_timeout=0.25, socket_connect_timeout=0.25
+        )
+    return _redis_client
+
+
+def redis_failed(error: Exception):
+    """Stop using Redis for REDIS_RETRY_AFTER seconds after an error."""
+    global _redis_down_until
+    if time.monotonic() >= _redis_down_until:
+        logger.warning(f"Redis unavailable, not using it for {REDIS_RETRY_AFTER:.0f}s: {error}")
+    _redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+
+
+class TwoTierCache:
+    """
+    TTLCache in front of Redis, for JSON-serializable values.
+
+    Reads try this process first, then Redis; writes and deletes go to both.
+    A delete only reaches the local tier of the process doing it, so other
+    processes may serve the old value for up to local_ttl seconds - keep it
+    short. Redis errors degrade to the local tier instead of failing.
+    """
+
+    def __init__(self, namespace: str, ttl: float, local_ttl: float, maxsize: int = 4096):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = TTLCache(local_ttl, maxsize)
+
+    def _key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def get(self, key: str) -> Any:
+        """Return the cached value or None."""
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        client = shared_redis() if self.ttl > 0 else None
+        if client is None:
+            return None
+        try:
+            raw = client.get(self._key(key))
+        except Exception as e:
+            redis_failed(e)
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        """Cache a value in both tiers."""
+        self.local.set(key, value)
+        client = shared_redis()
+        if client is None or self.ttl <= 0:
+            return
+        try:
+            client.set(self._key(key), json.dumps(value), ex=max(1, int(self.ttl)))
+        except Exception as e:
+            redis_failed(e)
+
+    def delete(self, key: str):
+        """Drop a key from both tiers."""
+        self.local.delete(key)
+        client = shared_redis()
+        if client is None:
+            return
+        try:
+            client.delete(self._key(key))
+        except Exception as e:
+            redis_failed(e)
@@ -0,0 +1,94 @@
+"""Cooperative job cancellation through a Redis flag."""
+import logging
+import time
+from typing import Callable, Optional
+
+from app.core.cache import redis_failed, shared_redis
+
+logger = logging.getLogger(__name__)
+
+# Cancellation flags outlive any job run; they only need to be seen by the worker
+CANCEL_FLAG_TTL = 24 * 3600
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job was cancelled."""
+
+
+def _cancel_key(job_id: str) -> str:
+    return f"job:cancel:{job_id}"
+
+
+def request_cancellation(job_id: str) -> bool:
+    """
+    Ask the workers to stop a job.
+
+    Sets the job's cancellation flag, which running workers poll between
+    slides, conversion steps and LLM stream chunks, and revokes its queued
+    Celery task (tasks are queued under the job ID) so it never starts.
+
+    Returns:
+        False if the flag could not be set; workers then only notice the
+        cancelled status in the database
+    """
+    client = shared_redis()
+    if client is None:
+        return False
+    try:
+        client.set(_cancel_key(job_id), 1, ex=CANCEL_FLAG_TTL)
+    except Exception as e:
+        redis_failed(e)
+        return False
+
+    # Only attempted once Redis answered: the broker is the same Redis, and
+    # publishing to it while it is down retries for several seconds
+    try:
+        from app.celery_app import celery_app
+        celery_app.control.revoke(job_id)
+    except Exception as e:
+        logger.warning(f"Failed to revoke task of job {job_id}: {str(e)}")
+    return True
+
+
+class CancellationToken:
+    """
+    Checks whether a job was cancelled, at most once per check_interval.
+
+    Cheap enough to call per LLM stream chunk: between checks the last
+    answer is reused. While Redis is unavailable the fallback (usually a
+    database status check) is used instead. Once cancelled, stays cancelled.
+    Calling the token returns is_cancelled(), so it can be passed wherever a
+    should_abort callable is expected.
+    """
+
+    def __init__(self, job_id: str, check_interval: float = 1.0, fallback: Optional[Callable[[], bool]] = None):
+        self.job_id = job_id
+        self.check_interval = check_interval
+        self.fallback = fallback
+        self._cancelled = False
+        self._checked_at = float("-inf")
+
+    def is_cancelled(self) -> bool:
+        if self._cancelled or time.monotonic() - self._checked_at < self.check_interval:
+            return self._cancelled
+        self._checked_at = time.monotonic()
+        self._cancelled = self._check()
+        if self._cancelled:
+            logger.info(f"Job {self.job_id} was cancelled")
+        return self._cancelled
+
+    __call__ = is_cancelled
+
+    def raise_if_cancelled(self):
+        """Raise JobCancelled if the job was cancelled."""
+        if self.is_cancelled():
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+    def _check(self) -> bool:
+        client = shared_redis()
+        if client is not None:
+            try:
+                return bool(client.exists(_cancel_key(self.job_id)))
+            except Exception as e:
+                redis_failed(e)
+        return bool(self.fallback and self.fallback())
@@ -1,19 +1,66 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from uuid import uuid4
 from app.core.config import get_settings
+from app.core.metrics import instrument_pool, timed_pool_class
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+# Async drivers for the API's engine, by backend
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str):
+    """The same database as url, through its asyncio driver."""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def engine_options(url, name: str, queue_pool) -> dict:
+    """create_engine() pool arguments from settings; name labels the pool metrics."""
+    options = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if settings.db_pool_mode == "null":
+        options["poolclass"] = timed_pool_class(NullPool, name)
+        if url.drivername == "postgresql+asyncpg":
+            # PgBouncer transaction pooling hands each transaction any server
+            # connection, so asyncpg's named prepared statements must not be reused
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+    else:
+        options.update(
+            poolclass=timed_pool_class(queue_pool, name),
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    return options
+
+
+_sync_url = make_url(settings.database_url)
+engine = create_engine(_sync_url, **engine_options(_sync_url, "sync", QueuePool))
+instrument_pool(engine.pool, "sync")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Used by the API routes so queries don't block the event loop; Celery
+# workers and the auth dependency keep the sync engine above
+_async_url = async_database_url(settings.database_url)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url, "async", AsyncAdaptedQueuePool))
+instrument_pool(async_engine.sync_engine.pool, "async")
+
+# expire_on_commit=False: attributes can't be lazily reloaded outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -24,3 +71,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
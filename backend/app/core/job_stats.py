@@ -0,0 +1,73 @@
+"""Rolling averages of pipeline durations, shared through Redis, for time estimates."""
+import logging
+from typing import Dict
+
+from app.core.cache import TTLCache, redis_failed, shared_redis
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+
+# Stats of models or formats no longer used expire
+STATS_TTL = 30 * 24 * 3600
+
+# Seconds each process reuses a value read from Redis
+LOCAL_TTL = 15.0
+
+# Used until a duration has been observed
+DEFAULT_SECONDS: Dict[str, float] = {
+    "setup": 5.0,        # job start to the first slide (download, extraction), by provider
+    "slide": 20.0,       # one slide generated and uploaded, by "provider:model"
+    "conversion": 15.0,  # HTML to the output file, by output format
+    "job": 300.0,        # job start to completion, all jobs
+}
+
+# Atomic EWMA update: HGET, blend, HSET, refresh TTL
+_EWMA_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+local value = tonumber(ARGV[2])
+if current then
+    value = tonumber(current) + tonumber(ARGV[3]) * (value - tonumber(current))
+end
+redis.call('HSET', KEYS[1], ARGV[1], value)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return tostring(value)
+"""
+
+_local = TTLCache(LOCAL_TTL)
+
+
+def _stats_key(stat: str) -> str:
+    return f"stats:duration:{stat}"
+
+
+def record_duration(stat: str, key: str, seconds: float):
+    """Fold a measured duration into the moving average of (stat, key). Never raises."""
+    client = shared_redis()
+    if client is None or seconds < 0:
+        return
+    try:
+        value = client.eval(_EWMA_SCRIPT, 1, _stats_key(stat), key, seconds, EWMA_ALPHA, STATS_TTL)
+        _local.set((stat, key), float(value))
+    except Exception as e:
+        redis_failed(e)
+
+
+def average_duration(stat: str, key: str) -> float:
+    """Moving average of (stat, key) in seconds, or its default when unknown."""
+    value = _local.get((stat, key))
+    if value is not None:
+        return value
+    value = None
+    client = shared_redis()
+    if client is not None:
+        try:
+            raw = client.hget(_stats_key(stat), key)
+            value = float(raw) if raw is not None else None
+        except Exception as e:
+            redis_failed(e)
+    if value is None:
+        value = DEFAULT_SECONDS[stat]
+    _local.set((stat, key), value)
+    return value
@@ -0,0 +1,18 @@
+"""LLM provider and model of a job, kept free of the generation imports so the API can use it."""
+from typing import Any, Dict
+
+# Model used for each provider (see PPTService._prepare_ppt_config)
+LLM_MODELS = {
+    "claude": "claude-sonnet-4-5-20250929",
+    "gemini": "gemini-2.0-flash-exp",
+}
+
+
+def metric_labels(config: Dict[str, Any]) -> Dict[str, str]:
+    """Metric labels (provider, model, output_format) for a job config."""
+    provider = config.get("llm_provider", "gemini")
+    return {
+        "provider": provider,
+        "model": LLM_MODELS.get(provider, ""),
+        "output_format": config.get("output_format", "pdf"),
+    }
@@ -0,0 +1,251 @@
+"""Prometheus metrics for the generation pipeline."""
+import contextvars
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from app.core.tracing import span
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages run from milliseconds (DB, storage) to minutes (LLM, PDF)
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+STAGE_LABELS = ("stage", "provider", "model", "output_format")
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "ppt_pipeline_stage_seconds",
+    "Time spent in each pipeline stage",
+    STAGE_LABELS,
+    buckets=STAGE_BUCKETS,
+)
+
+LLM_TOKENS = Counter(
+    "ppt_llm_tokens_total",
+    "Tokens sent to / received from LLM providers",
+    ("provider", "model", "direction"),
+)
+
+LLM_RETRIES = Counter(
+    "ppt_llm_retries_total",
+    "LLM requests repeated after an unusable response",
+    ("provider", "model", "reason"),
+)
+
+CACHE_LOOKUPS = Counter(
+    "ppt_cache_lookups_total",
+    "Pipeline cache lookups by outcome",
+    ("cache", "result"),
+)
+
+STORAGE_DELETED_OBJECTS = Counter(
+    "ppt_storage_deleted_objects_total",
+    "Stored objects and temp files deleted by cleanup, by reason",
+    ("reason",),
+)
+
+STORAGE_RECLAIMED_BYTES = Counter(
+    "ppt_storage_reclaimed_bytes_total",
+    "Bytes freed by deleting stored objects and temp files, by reason",
+    ("reason",),
+)
+
+JOB_QUEUE_WAIT_SECONDS = Histogram(
+    "ppt_job_queue_wait_seconds",
+    "Time from job creation until a worker starts it, by job priority",
+    ("priority",),
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200),
+)
+
+# Pool gauges are summed over live processes in multiprocess mode, giving
+# the deployment-wide connection count
+DB_POOL_CHECKED_OUT = Gauge(
+    "ppt_db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+    ("pool",),
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_OPEN = Gauge(
+    "ppt_db_pool_open_connections",
+    "Database connections currently open (checked out or idle in the pool)",
+    ("pool",),
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    "ppt_db_pool_overflow",
+    "Connections open beyond pool_size",
+    ("pool",),
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_WAIT_SECONDS = Histogram(
+    "ppt_db_pool_wait_seconds",
+    "Time to get a connection from the pool (including connecting)",
+    ("pool",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Labels of the job being processed; set once per task with job_labels()
+_job_labels = contextvars.ContextVar("metrics_job_labels", default={})
+
+
+@contextmanager
+def job_labels(provider: str = "", model: str = "", output_format: str = ""):
+    """Attach provider/model/output_format labels to every stage timed inside the block."""
+    token = _job_labels.set({"provider": provider, "model": model, "output_format": output_format})
+    try:
+        yield
+    finally:
+        _job_labels.reset(token)
+
+
+def _labels(stage: str, **overrides) -> dict:
+    labels = {"stage": stage, "provider": "", "model": "", "output_format": ""}
+    labels.update(_job_labels.get())
+    labels.update({key: value for key, value in overrides.items() if value})
+    return labels
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Observe the duration of the block in the stage histogram (also on error) and trace it."""
+    start = time.perf_counter()
+    try:
+        with span(stage, **{f"ppt.{key}": value for key, value in _job_labels.get().items() if value}):
+            yield
+    finally:
+        PIPELINE_STAGE_SECONDS.labels(**_labels(stage)).observe(time.perf_counter() - start)
+
+
+def observe_llm_call(provider, model, seconds, input_tokens=None, output_tokens=None):
+    """LLM observer registered with generate_ppt.add_llm_observer()."""
+    labels = _labels("llm_call", provider=provider, model=model)
+    PIPELINE_STAGE_SECONDS.labels(**labels).observe(seconds)
+    if input_tokens:
+        LLM_TOKENS.labels(labels["provider"], labels["model"], "input").inc(input_tokens)
+    if output_tokens:
+        LLM_TOKENS.labels(labels["provider"], labels["model"], "output").inc(output_tokens)
+
+
+def record_llm_retry(reason: str, count: int = 1):
+    """Count LLM requests that had to be repeated for the current job."""
+    labels = _labels("")
+    LLM_RETRIES.labels(labels["provider"], labels["model"], reason).inc(count)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Count a hit or miss of a pipeline cache."""
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_storage_reclaimed(reason: str, objects: int, size: int):
+    """Count objects deleted by storage cleanup and the bytes they held."""
+    STORAGE_DELETED_OBJECTS.labels(reason=reason).inc(objects)
+    STORAGE_RECLAIMED_BYTES.labels(reason=reason).inc(size)
+
+
+def observe_queue_wait(priority: str, seconds: float):
+    """Record how long a job waited in the queue before starting."""
+    JOB_QUEUE_WAIT_SECONDS.labels(priority=priority).observe(max(0.0, seconds))
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Registry to expose.
+
+    With PROMETHEUS_MULTIPROC_DIR set (gunicorn workers, prefork Celery pool)
+    samples from every process are aggregated; otherwise this process only.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def start_worker_exporter(port: int, prefork: bool = False):
+    """
+    Serve /metrics for a Celery worker on the given port.
+
+    Tasks of a prefork pool run in child processes, whose samples reach this
+    (parent) process's exporter only through PROMETHEUS_MULTIPROC_DIR, an
+    empty directory at worker start. Without it the exporter would serve
+    none of the job metrics, so it is not started.
+    """
+    if prefork and not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        logger.warning(
+            "Worker metrics exporter not started: the prefork pool needs "
+            "PROMETHEUS_MULTIPROC_DIR to export its children's metrics"
+        )
+        return
+    start_http_server(port, registry=metrics_registry())
+    logger.info(f"Worker metrics exporter listening on :{port}")
+
+
+def mark_process_dead(pid: int):
+    """Drop a finished worker child's live gauges in multiprocess mode."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+def timed_pool_class(base, name: str):
+    """Subclass of a SQLAlchemy pool class recording checkout waits for pool name."""
+    wait = DB_POOL_WAIT_SECONDS.labels(name)
+
+    class TimedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                wait.observe(time.perf_counter() - start)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def instrument_pool(pool, name: str):
+    """Track checked-out, open and overflow connections of a pool (and its recreations)."""
+    from sqlalchemy import event
+
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+    open_gauge = DB_POOL_OPEN.labels(name)
+    overflow = DB_POOL_OVERFLOW.labels(name)
+    # NullPool has no size, so no overflow
+    size = pool.size() if hasattr(pool, "overflow") else None
+    open_connections = 0
+
+    def set_open(delta):
+        nonlocal open_connections
+        open_connections += delta
+        open_gauge.set(open_connections)
+        if size is not None:
+            overflow.set(max(0, open_connections - size))
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        set_open(1)
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_connection, connection_record):
+        set_open(-1)
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
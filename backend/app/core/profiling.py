@@ -0,0 +1,123 @@
+"""Opt-in per-job profiling (cProfile + tracemalloc).
+
+Enabled with the job config flag "profile" (set at creation or through the
+admin API). Each profiled section produces:
+
+    {section}.prof         cProfile stats, load with pstats / snakeviz
+    {section}.txt          top functions by cumulative and own time
+    {section}_memory.txt   peak traced memory and top allocation sites
+
+Artifacts are uploaded next to the job outputs, under
+ppt-yash-proj/outputs/{job_id}/profile/.
+"""
+import cProfile
+import io
+import logging
+import pstats
+import shutil
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List
+
+from app.core.tempfiles import TEMP_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# Rows written to the text reports
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 30
+# Frames kept per allocation traceback (more is slower and uses more memory)
+TRACEMALLOC_FRAMES = 10
+
+
+def profile_prefix(job_id: str) -> str:
+    """Storage prefix of a job's profile artifacts."""
+    return f"ppt-yash-proj/outputs/{job_id}/profile"
+
+
+class JobProfiler:
+    """Collects profile artifacts for one job; does nothing when disabled."""
+
+    def __init__(self, job_id: str, enabled: bool):
+        self.job_id = job_id
+        self.enabled = enabled
+        self.artifacts: List[Path] = []
+        self._dir = Path(tempfile.mkdtemp(prefix=f"{TEMP_PREFIX}profile-{job_id}-")) if enabled else None
+
+    @contextmanager
+    def section(self, name: str):
+        """Profile the block (current thread) and record its memory allocations."""
+        if not self.enabled:
+            yield
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            self._write(name, profiler, elapsed, snapshot, current, peak)
+
+    def _write(self, name, profiler, elapsed, snapshot, current, peak):
+        prof_path = self._dir / f"{name}.prof"
+        profiler.dump_stats(str(prof_path))
+
+        report = io.StringIO()
+        report.write(f"Job {self.job_id} - {name}: {elapsed:.2f}s wall\n\n")
+        stats = pstats.Stats(profiler, stream=report).strip_dirs()
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(TOP_FUNCTIONS)
+        text_path = self._dir / f"{name}.txt"
+        text_path.write_text(report.getvalue(), encoding="utf-8")
+
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        lines = [
+            f"Job {self.job_id} - {name}",
+            f"Peak traced memory: {peak / 2**20:.1f} MiB, still allocated at end: {current / 2**20:.1f} MiB",
+            "",
+            f"Top {TOP_ALLOCATIONS} allocation sites (live at end of section):",
+        ]
+        lines += [str(stat) for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]]
+        memory_path = self._dir / f"{name}_memory.txt"
+        memory_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        self.artifacts += [prof_path, text_path, memory_path]
+        logger.info(f"Profiled {name} for job {self.job_id}: {elapsed:.2f}s, peak {peak / 2**20:.1f} MiB")
+
+    async def upload(self, s3_service) -> List[str]:
+        """Upload collected artifacts and clean up; returns their storage keys."""
+        if not self.enabled:
+            return []
+        keys = []
+        try:
+            for path in self.artifacts:
+                key = f"{profile_prefix(self.job_id)}/{path.name}"
+                content_type = "text/plain" if path.suffix == ".txt" else "application/octet-stream"
+                await s3_service.upload_file_from_path(str(path), key, content_type=content_type)
+                keys.append(key)
+            if keys:
+                logger.info(f"Uploaded {len(keys)} profile artifacts for job {self.job_id}")
+        except Exception as e:
+            # Profiling must never fail the job
+            logger.error(f"Failed to upload profile for job {self.job_id}: {e}")
+        finally:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self.artifacts = []
+        return keys
@@ -0,0 +1,53 @@
+"""Temp files and directories, named so ones left behind can be found and swept."""
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+# Prefix of every temp file/dir the app creates (generate_ppt.TEMP_DIR_PREFIX
+# repeats it, as the standalone generator does not import the app)
+TEMP_PREFIX = "synthatext-"
+
+
+def temp_directory() -> tempfile.TemporaryDirectory:
+    """TemporaryDirectory with the app's prefix."""
+    return tempfile.TemporaryDirectory(prefix=TEMP_PREFIX)
+
+
+def sweep_temp(max_age_seconds: float) -> Tuple[int, int]:
+    """
+    Delete the app's temp files/dirs not modified for max_age_seconds.
+    
+    Catches what a killed process (OOM, worker recycling, SIGKILL) never got
+    to clean up. Only entries with TEMP_PREFIX are touched.
+    
+    Returns:
+        (entries deleted, bytes freed)
+    """
+    cutoff = time.time() - max_age_seconds
+    deleted = freed = 0
+    for path in Path(tempfile.gettempdir()).glob(f"{TEMP_PREFIX}*"):
+        try:
+            if path.lstat().st_mtime >= cutoff:
+                continue
+            if path.is_dir() and not path.is_symlink():
+                size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file() and not f.is_symlink())
+                shutil.rmtree(path)
+            else:
+                size = path.lstat().st_size
+                path.unlink()
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning(f"Could not remove stale temp entry {path}: {e}")
+            continue
+        deleted += 1
+        freed += size
+    
+    if deleted:
+        logger.info(f"Removed {deleted} stale temp entries ({freed} bytes) from {tempfile.gettempdir()}")
+    return deleted, freed
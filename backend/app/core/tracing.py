@@ -0,0 +1,168 @@
+"""OpenTelemetry tracing for the API, Celery tasks and LLM calls.
+
+A job's trace starts in the API request that creates it. The context travels
+to the worker in the Celery task headers, so generation, LLM calls, storage
+and conversion spans all end up on the same timeline.
+
+Exporters (settings.tracing_exporter):
+    none  - tracing disabled (the OpenTelemetry API is a no-op)
+    otlp  - OTLP/HTTP to settings.otlp_endpoint (e.g. a local collector/Jaeger)
+    file  - one JSON span per line appended to settings.tracing_file
+"""
+import functools
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("synthatext")
+
+# Spans of the Celery tasks running in this process, by task id
+_task_spans: Dict[str, tuple] = {}
+
+_configured = False
+
+
+def setup_tracing(service_name: str):
+    """Configure the tracer provider and exporter for this process (once)."""
+    global _configured
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    exporter_name = settings.tracing_exporter.lower()
+    if exporter_name == "none" or _configured:
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if exporter_name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=f"{settings.otlp_endpoint.rstrip('/')}/v1/traces")
+    elif exporter_name == "file":
+        exporter = ConsoleSpanExporter(
+            out=open(settings.tracing_file, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    else:
+        logger.warning(f"Unknown tracing exporter '{settings.tracing_exporter}', tracing disabled")
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _configured = True
+    logger.info(f"Tracing enabled for {service_name} ({exporter_name} exporter)")
+
+
+def shutdown_tracing():
+    """Flush pending spans (call before the process exits)."""
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
+
+
+@contextmanager
+def span(name: str, kind: SpanKind = SpanKind.INTERNAL, **attributes):
+    """Run the block in a child span of the current one; exceptions are recorded."""
+    with tracer.start_as_current_span(name, kind=kind, attributes=attributes or None):
+        yield
+
+
+def traced(name: str, kind: SpanKind = SpanKind.CLIENT):
+    """Decorator tracing every call of a (sync or async) function as a span."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, kind=kind):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, kind=kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_llm_call(provider, model, seconds, input_tokens=None, output_tokens=None):
+    """
+    LLM observer registered with generate_ppt.add_llm_observer().
+
+    The call has already finished, so its span is recorded after the fact
+    with the measured start time, under whatever span is current.
+    """
+    end = time.time_ns()
+    llm_span = tracer.start_span(
+        f"llm {provider}",
+        kind=SpanKind.CLIENT,
+        start_time=end - int(seconds * 1e9),
+        attributes={"gen_ai.system": provider, "gen_ai.request.model": model},
+    )
+    if input_tokens:
+        llm_span.set_attribute("gen_ai.usage.input_tokens", input_tokens)
+    if output_tokens:
+        llm_span.set_attribute("gen_ai.usage.output_tokens", output_tokens)
+    llm_span.end(end_time=end)
+
+
+# -- Celery propagation -------------------------------------------------------
+
+def inject_task_headers(headers=None, **kwargs):
+    """before_task_publish handler: carry the current trace context in the task headers."""
+    if headers is not None:
+        propagate.inject(headers)
+
+
+class _RequestGetter:
+    """Read propagated headers from a Celery task request."""
+
+    def get(self, carrier, key):
+        value = getattr(carrier, key, None)
+        if value is None:
+            return None
+        return value if isinstance(value, list) else [value]
+
+    def keys(self, carrier):
+        return []
+
+
+def start_task_span(task_id=None, task=None, **kwargs):
+    """task_prerun handler: continue the publisher's trace in a span for this task."""
+    # Eager tasks have no headers and simply continue the caller's context
+    parent = propagate.extract(task.request, context=otel_context.get_current(), getter=_RequestGetter())
+    task_span = tracer.start_span(
+        f"celery {task.name}",
+        context=parent,
+        kind=SpanKind.CONSUMER,
+        attributes={"celery.task_id": task_id, "celery.task_name": task.name},
+    )
+    token = otel_context.attach(trace.set_span_in_context(task_span, parent))
+    _task_spans[task_id] = (task_span, token)
+
+
+def record_task_failure(task_id=None, exception=None, **kwargs):
+    """task_failure handler: mark the task's span as failed."""
+    entry = _task_spans.get(task_id)
+    if entry and exception is not None:
+        entry[0].record_exception(exception)
+        entry[0].set_status(Status(StatusCode.ERROR, str(exception)))
+
+
+def end_task_span(task_id=None, **kwargs):
+    """task_postrun handler: close the task's span and restore the context."""
+    entry = _task_spans.pop(task_id, None)
+    if entry:
+        task_span, token = entry
+        task_span.end()
+        otel_context.detach(token)
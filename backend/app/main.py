@@ -1,8 +1,10 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router, public_router
 from app.api.auth_routes import router as auth_router, api_router as auth_api_router
 from app.core.database import engine, Base
+from app.core.tempfiles import sweep_temp
 import logging
 
 # Configure logging
@@ -26,6 +28,12 @@ app = FastAPI(
 from app.core.config import get_settings
 settings = get_settings()
 
+# Tracing (no-op unless TRACING_EXPORTER is set)
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.middleware.tracing import TracingMiddleware
+setup_tracing("synthatext-api")
+app.add_middleware(TracingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,  # Use specific origins from config
@@ -40,10 +48,16 @@ app.include_router(public_router)
 app.include_router(auth_router)
 app.include_router(auth_api_router)
 
+# Prometheus metrics
+if settings.metrics_enabled:
+    from prometheus_client import make_asgi_app
+    from app.core.metrics import metrics_registry
+    app.mount("/metrics", make_asgi_app(registry=metrics_registry()))
+
 # Mount static files for local storage (Dev Mode)
 from fastapi.staticfiles import StaticFiles
 import os
-storage_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "storage")
+storage_path = settings.local_storage_path
 if not os.path.exists(storage_path):
     os.makedirs(storage_path)
 app.mount("/api/v1/storage", StaticFiles(directory=storage_path), name="storage")
@@ -53,12 +67,15 @@ app.mount("/api/v1/storage", StaticFiles(directory=storage_path), name="storage"
 async def startup_event():
     """Application startup event."""
     logger.info("Starting PPT Generation API...")
+    # Storage proxy temp files a previous (killed) process never removed
+    await run_in_threadpool(sweep_temp, settings.temp_max_age_hours * 3600)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown event."""
     logger.info("Shutting down PPT Generation API...")
+    shutdown_tracing()
 
 
 if __name__ == "__main__":
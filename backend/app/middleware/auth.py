@@ -4,6 +4,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.auth_utils import decode_token
+from app.core.auth_cache import AuthenticatedUser, cache_session, cache_user, get_cached_session, get_cached_user
 from app.models.user import User, Session as UserSession
 from datetime import datetime, timezone
 from typing import Optional
@@ -16,8 +17,13 @@ def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     session_cookie: Optional[str] = Cookie(None, alias="session"),
     db: Session = Depends(get_db),
-) -> User:
-    """Get current authenticated user from Bearer token or session cookie."""
+) -> AuthenticatedUser:
+    """
+    Get current authenticated user from Bearer token or session cookie.
+    
+    Users and sessions are served from the auth cache when possible, so a
+    valid token usually costs no database query.
+    """
     
     # Try Bearer token first (from Authorization header)
     if credentials:
@@ -26,19 +32,26 @@ def get_current_user(
         if payload and payload.get("type") == "access":
             user_id = payload.get("sub")
             if user_id:
-                user = db.query(User).filter(User.id == user_id).first()
-                if user and not user.locked:
+                user = _load_user(db, user_id)
+                if user:
                     return user
     
     # Try session cookie (from OAuth redirect)
     if session_cookie:
-        session = db.query(UserSession).filter(
-            UserSession.refresh_token == session_cookie
-        ).first()
+        cached_session = get_cached_session(session_cookie)
+        if cached_session:
+            user_id, expires_at = cached_session
+        else:
+            session = db.query(UserSession).filter(
+                UserSession.refresh_token == session_cookie
+            ).first()
+            user_id, expires_at = (session.user_id, session.expires_at) if session else (None, None)
+            if session:
+                cache_session(session_cookie, user_id, expires_at)
         
-        if session and session.expires_at > datetime.now(timezone.utc):
-            user = db.query(User).filter(User.id == session.user_id).first()
-            if user and not user.locked:
+        if user_id and expires_at > datetime.now(timezone.utc):
+            user = _load_user(db, user_id)
+            if user:
                 return user
     
     # No valid authentication found
@@ -48,6 +61,27 @@ def get_current_user(
     )
 
 
+def _load_user(db: Session, user_id: str) -> Optional[AuthenticatedUser]:
+    """Unlocked user by ID, from the auth cache or the database."""
+    user = get_cached_user(user_id)
+    if user:
+        return user
+    db_user = db.query(User).filter(User.id == user_id).first()
+    if db_user and not db_user.locked:
+        return cache_user(db_user)
+    return None
+
+
+def require_admin(current_user: AuthenticatedUser = Depends(get_current_user)) -> AuthenticatedUser:
+    """Require an authenticated user with the "admin" role."""
+    if "admin" not in current_user.role_names:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin role required",
+        )
+    return current_user
+
+
 def get_optional_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db),
@@ -0,0 +1,37 @@
+"""Tracing middleware: one server span per HTTP request."""
+from opentelemetry import propagate
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from app.core.tracing import tracer
+
+
+class TracingMiddleware:
+    """ASGI middleware continuing incoming trace context and recording request spans."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        parent = propagate.extract(headers)
+        name = f"{scope['method']} {scope['path']}"
+
+        with tracer.start_as_current_span(
+            name,
+            context=parent,
+            kind=SpanKind.SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        ) as request_span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    request_span.set_attribute("http.status_code", status_code)
+                    if status_code >= 500:
+                        request_span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
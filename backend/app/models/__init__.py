@@ -1,11 +1,13 @@
 """Models module initialization."""
 from app.models.job import PPTJob, JobStatus
+from app.models.input_upload import InputUpload
 from app.models.slide import Slide
 from app.models.user import User, Session, VerificationToken, PasswordResetToken, TwoFactorAuth, Account, Role, Permission
 
 __all__ = [
     "PPTJob",
     "JobStatus",
+    "InputUpload",
     "Slide",
     "User",
     "Session",
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class InputUpload(Base):
+    """
+    A user's upload of a content-addressed input file.
+    
+    Inputs are stored once per content hash, so the storage key alone proves
+    nothing: a user may only create jobs from inputs they uploaded (sent the
+    bytes of) themselves. uploaded_at is refreshed on every upload of the
+    same content, and storage GC keeps inputs uploaded within its grace
+    period even when no job uses them yet.
+    """
+    
+    __tablename__ = "input_uploads"
+    __table_args__ = (
+        # Storage GC: latest upload of a set of inputs
+        Index("ix_input_uploads_key_uploaded", "input_s3_key", "uploaded_at"),
+    )
+    
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    input_s3_key = Column(String, primary_key=True)
+    uploaded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
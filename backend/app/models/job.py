@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum, Text, Integer
+from sqlalchemy import Column, String, DateTime, Enum, Text, Integer, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -14,19 +14,50 @@ class JobStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+class JobPriority(str, enum.Enum):
+    """Scheduling priority: batch jobs only run when no interactive job is waiting."""
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+# error_message of jobs cancelled by their owner (status FAILED)
+CANCELLED_MESSAGE = "Cancelled by user"
+
+
 class PPTJob(Base):
     """PPT Generation Job model."""
     
     __tablename__ = "ppt_jobs"
+    __table_args__ = (
+        # Keyset pagination of a user's jobs, newest first (optionally by status);
+        # id breaks created_at ties so the cursor is stable
+        Index("ix_ppt_jobs_user_created", "user_id", "created_at", "id"),
+        Index("ix_ppt_jobs_user_status_created", "user_id", "status", "created_at", "id"),
+        # Inputs are shared by content hash; deleting a job checks for other users of its input
+        Index("ix_ppt_jobs_input_s3_key", "input_s3_key"),
+        # Backlog size and queue positions (pending jobs, oldest first)
+        Index("ix_ppt_jobs_status_created", "status", "created_at"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     
+    # Owner (NULL for jobs created before jobs were scoped to users)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    
     # File references
     input_s3_key = Column(String, nullable=False)
     output_s3_key = Column(String, nullable=True)
+    # Hex SHA-256 of the input content (NULL for inputs stored before content addressing)
+    input_sha256 = Column(String(64), nullable=True)
     
     # Job status
     status = Column(Enum(JobStatus), default=JobStatus.PENDING, nullable=False)
+    priority = Column(
+        Enum(JobPriority, native_enum=False, length=16),
+        default=JobPriority.INTERACTIVE,
+        server_default=JobPriority.INTERACTIVE.name,
+        nullable=False
+    )
     
     # Configuration (stored as JSON string)
     config_json = Column(Text, nullable=False)
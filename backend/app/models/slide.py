@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -9,6 +9,10 @@ class Slide(Base):
     """Individual slide model for tracking HTML slides."""
     
     __tablename__ = "slides"
+    __table_args__ = (
+        # One row per slide position; also serves the per-job slide listing
+        Index("uq_slides_job_id_slide_number", "job_id", "slide_number", unique=True),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     
@@ -0,0 +1,77 @@
+"""Repository for the ownership and upload times of input files."""
+import logging
+from datetime import datetime
+from typing import Iterable, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.input_upload import InputUpload
+
+logger = logging.getLogger(__name__)
+
+# Dialects with INSERT ... ON CONFLICT support
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+class InputRepository:
+    """Input upload records, for storage GC (sync, in Celery workers)."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def recently_uploaded(self, input_s3_keys: Iterable[str], since: datetime) -> Set[str]:
+        """The subset of input_s3_keys uploaded by anyone at or after since."""
+        return set(self.db.scalars(
+            select(InputUpload.input_s3_key).where(
+                InputUpload.input_s3_key.in_(list(input_s3_keys)),
+                InputUpload.uploaded_at >= since
+            ).distinct()
+        ))
+    
+    def delete_uploads(self, input_s3_keys: Iterable[str]) -> int:
+        """Forget the uploads of deleted input files; returns the row count."""
+        result = self.db.execute(
+            delete(InputUpload).where(InputUpload.input_s3_key.in_(list(input_s3_keys)))
+        )
+        self.db.commit()
+        return result.rowcount
+
+
+class AsyncInputRepository:
+    """Input upload records on an AsyncSession, for the API routes."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def record_upload(self, user_id: str, input_s3_key: str):
+        """Record that a user uploaded an input (again): grants access and refreshes uploaded_at."""
+        dialect_insert = _UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if dialect_insert is None:
+            result = await self.db.execute(
+                update(InputUpload)
+                .where(InputUpload.user_id == user_id, InputUpload.input_s3_key == input_s3_key)
+                .values(uploaded_at=func.now())
+            )
+            if not result.rowcount:
+                self.db.add(InputUpload(user_id=user_id, input_s3_key=input_s3_key))
+        else:
+            stmt = dialect_insert(InputUpload).values(user_id=user_id, input_s3_key=input_s3_key)
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[InputUpload.user_id, InputUpload.input_s3_key],
+                set_={"uploaded_at": func.now()}
+            ))
+        await self.db.commit()
+    
+    async def is_owner(self, user_id: str, input_s3_key: str) -> bool:
+        """Whether a user uploaded an input file."""
+        return await self.db.scalar(
+            select(func.count()).select_from(InputUpload).where(
+                InputUpload.user_id == user_id,
+                InputUpload.input_s3_key == input_s3_key
+            )
+        ) > 0
@@ -1,12 +1,46 @@
+from sqlalchemy import and_, or_, select, update, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional, List
-from app.models.job import PPTJob, JobStatus
+from typing import Iterable, Optional, List, Set, Tuple
+from datetime import datetime
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.models.job import CANCELLED_MESSAGE, PPTJob, JobPriority, JobStatus
+from app.models.user import User
 from app.schemas.job import JobCreateRequest, PPTConfigSchema
+from app.schemas.slide import SlideCreate
+import base64
 import json
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Job counts per (user_id, status), shared by the repositories of this process
+_job_counts = TTLCache(ttl=get_settings().job_count_cache_ttl)
+
+
+def encode_job_cursor(job: PPTJob) -> str:
+    """Opaque list cursor pointing just after the given job."""
+    raw = json.dumps([job.created_at.isoformat(), job.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_job_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor made by encode_job_cursor().
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, job_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(job_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 
 class JobRepository:
     """Repository for PPT Job database operations."""
@@ -17,7 +51,10 @@ class JobRepository:
     def create_job(
         self, 
         input_s3_key: str, 
-        config: PPTConfigSchema
+        config: PPTConfigSchema,
+        user_id: Optional[str] = None,
+        input_sha256: Optional[str] = None,
+        priority: JobPriority = JobPriority.INTERACTIVE
     ) -> PPTJob:
         """
         Create a new PPT generation job.
@@ -25,6 +62,9 @@ class JobRepository:
         Args:
             input_s3_key: S3 key of input file
             config: PPT generation configuration
+            user_id: ID of the user creating the job
+            input_sha256: Hex SHA-256 of the input, when known
+            priority: Scheduling priority
             
         Returns:
             Created PPTJob instance
@@ -32,12 +72,16 @@ class JobRepository:
         job = PPTJob(
             input_s3_key=input_s3_key,
             config_json=config.model_dump_json(),
-            status=JobStatus.PENDING
+            status=JobStatus.PENDING,
+            user_id=user_id,
+            input_sha256=input_sha256,
+            priority=priority
         )
         
         self.db.add(job)
         self.db.commit()
         self.db.refresh(job)
+        _invalidate_job_counts(user_id)
         
         logger.info(f"Created job: {job.id}")
         return job
@@ -54,6 +98,13 @@ class JobRepository:
         """
         return self.db.query(PPTJob).filter(PPTJob.id == job_id).first()
     
+    def is_cancelled(self, job_id: str) -> bool:
+        """Whether a job was cancelled or deleted (read from the database, not the session)."""
+        status = self.db.execute(
+            select(PPTJob.status, PPTJob.error_message).where(PPTJob.id == job_id)
+        ).first()
+        return status is None or (status.status == JobStatus.FAILED and status.error_message == CANCELLED_MESSAGE)
+    
     def update_job_status(
         self, 
         job_id: str, 
@@ -71,14 +122,8 @@ class JobRepository:
         Returns:
             Updated PPTJob instance
         """
-        job = self.get_job(job_id)
+        job = self._update(job_id, _status_values(status, error_message))
         if job:
-            job.status = status
-            if error_message:
-                job.error_message = error_message
-            
-            self.db.commit()
-            self.db.refresh(job)
             logger.info(f"Updated job {job_id} status to {status}")
         
         return job
@@ -100,15 +145,10 @@ class JobRepository:
         Returns:
             Updated PPTJob instance
         """
-        job = self.get_job(job_id)
-        if job:
-            job.completed_slides = completed_slides
-            job.total_slides = total_slides
-            
-            self.db.commit()
-            self.db.refresh(job)
-        
-        return job
+        return self._update(job_id, {
+            "completed_slides": completed_slides,
+            "total_slides": total_slides
+        })
     
     def set_output_s3_key(
         self, 
@@ -122,59 +162,171 @@ class JobRepository:
             job_id: Job ID
             output_s3_key: S3 key of output file
             
+        Returns:
+            Updated PPTJob instance
+        """
+        job = self._update(job_id, {"output_s3_key": output_s3_key})
+        if job:
+            logger.info(f"Set output S3 key for job {job_id}: {output_s3_key}")
+        
+        return job
+    
+    def complete_job(self, job_id: str, output_s3_key: str) -> Optional[PPTJob]:
+        """
+        Set a job's output S3 key and mark it completed, unless it failed meanwhile.
+        
+        One conditional UPDATE: a cancellation (which marks the job FAILED)
+        landing after the worker's last cancellation check is not overwritten.
+        
+        Args:
+            job_id: Job ID
+            output_s3_key: S3 key of output file
+            
+        Returns:
+            Updated PPTJob instance, or None if the job failed, was cancelled or deleted
+        """
+        values = _status_values(JobStatus.COMPLETED, None)
+        values["output_s3_key"] = output_s3_key
+        job = self._update(job_id, values, PPTJob.status != JobStatus.FAILED)
+        if job:
+            logger.info(f"Job {job_id} completed with output {output_s3_key}")
+        
+        return job
+    
+    def _update(self, job_id: str, values: dict, *criteria) -> Optional[PPTJob]:
+        """
+        Apply values to a job with a single UPDATE ... RETURNING and commit.
+        
+        Args:
+            job_id: Job ID
+            values: Column values (may be SQL expressions)
+            criteria: Further conditions the job must meet
+            
+        Returns:
+            Updated PPTJob instance, or None if no job matched
+        """
+        job = self.db.scalars(_update_statement(job_id, values, *criteria)).first()
+        self.db.commit()
+        return job
+    
+    def set_profiling(self, job_id: str, enabled: bool) -> Optional[PPTJob]:
+        """
+        Turn per-job profiling on or off in the job's stored config.
+        
+        Takes effect for task stages that have not started yet.
+        
+        Args:
+            job_id: Job ID
+            enabled: Whether to profile the job
+            
         Returns:
             Updated PPTJob instance
         """
         job = self.get_job(job_id)
         if job:
-            job.output_s3_key = output_s3_key
+            config = json.loads(job.config_json)
+            config["profile"] = enabled
+            job.config_json = json.dumps(config)
             
             self.db.commit()
             self.db.refresh(job)
-            logger.info(f"Set output S3 key for job {job_id}: {output_s3_key}")
+            logger.info(f"Set profiling for job {job_id}: {enabled}")
         
         return job
     
     def list_jobs(
         self, 
-        skip: int = 0, 
+        user_id: str,
         limit: int = 100,
-        status: Optional[JobStatus] = None
+        status: Optional[JobStatus] = None,
+        cursor: Optional[str] = None,
+        skip: int = 0
     ) -> List[PPTJob]:
         """
-        List jobs with pagination.
+        List a user's jobs, newest first.
+        
+        Pages are read by keyset on (created_at, id) using the
+        ix_ppt_jobs_user_*created indexes, so the cost depends on the page
+        size only. Pass the cursor of the last job of the previous page
+        (encode_job_cursor); skip is the legacy offset and is ignored when a
+        cursor is given.
         
         Args:
-            skip: Number of records to skip
+            user_id: Owner of the jobs
             limit: Maximum number of records to return
             status: Filter by status
+            cursor: Cursor of the last job already returned
+            skip: Number of records to skip
             
         Returns:
             List of PPTJob instances
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        query = self.db.query(PPTJob)
-        
-        if status:
-            query = query.filter(PPTJob.status == status)
-        
-        return query.order_by(PPTJob.created_at.desc()).offset(skip).limit(limit).all()
+        return list(self.db.scalars(_list_jobs_statement(user_id, limit, status, cursor, skip)))
     
-    def count_jobs(self, status: Optional[JobStatus] = None) -> int:
+    def count_jobs(self, user_id: str, status: Optional[JobStatus] = None) -> int:
         """
-        Count total jobs.
+        Count a user's jobs.
+        
+        The result is cached for settings.job_count_cache_ttl seconds;
+        creating or deleting a job resets it, status changes may show up late.
         
         Args:
+            user_id: Owner of the jobs
             status: Filter by status
             
         Returns:
             Total count
         """
-        query = self.db.query(PPTJob)
-        
-        if status:
-            query = query.filter(PPTJob.status == status)
+        key = (user_id, status)
+        total = _job_counts.get(key)
+        if total is None:
+            total = self.db.scalar(_count_jobs_statement(user_id, status))
+            _job_counts.set(key, total)
+        return total
+    
+    def count_running_jobs(self, user_id: str, exclude_job_id: Optional[str] = None) -> int:
+        """Count a user's jobs being processed right now, other than exclude_job_id (uncached)."""
+        stmt = _count_jobs_statement(user_id, JobStatus.PROCESSING)
+        if exclude_job_id:
+            stmt = stmt.where(PPTJob.id != exclude_job_id)
+        return self.db.scalar(stmt)
+    
+    def list_finished_jobs(
+        self,
+        status: JobStatus,
+        finished_before: datetime,
+        limit: int,
+        cancelled: Optional[bool] = None
+    ) -> List[PPTJob]:
+        """
+        Jobs in a final status that finished before a time, oldest first.
         
-        return query.count()
+        Args:
+            status: COMPLETED or FAILED
+            finished_before: Cutoff on completed_at (else the last update)
+            limit: Maximum number of jobs
+            cancelled: Only cancelled (True) or not cancelled (False) failures
+        """
+        finished_at = func.coalesce(PPTJob.completed_at, PPTJob.updated_at, PPTJob.created_at)
+        query = self.db.query(PPTJob).filter(PPTJob.status == status, finished_at < finished_before)
+        if cancelled is True:
+            query = query.filter(PPTJob.error_message == CANCELLED_MESSAGE)
+        elif cancelled is False:
+            query = query.filter(or_(PPTJob.error_message.is_(None), PPTJob.error_message != CANCELLED_MESSAGE))
+        return query.order_by(finished_at).limit(limit).all()
+    
+    def existing_job_ids(self, job_ids: Iterable[str]) -> Set[str]:
+        """The subset of job_ids that still have a job row."""
+        return set(self.db.scalars(select(PPTJob.id).where(PPTJob.id.in_(list(job_ids)))))
+    
+    def referenced_inputs(self, input_s3_keys: Iterable[str]) -> Set[str]:
+        """The subset of input_s3_keys used by at least one job."""
+        return set(self.db.scalars(
+            select(PPTJob.input_s3_key).where(PPTJob.input_s3_key.in_(list(input_s3_keys))).distinct()
+        ))
     
     def delete_job(self, job_id: str) -> bool:
         """
@@ -190,11 +342,309 @@ class JobRepository:
         if job:
             self.db.delete(job)
             self.db.commit()
+            _invalidate_job_counts(job.user_id)
             logger.info(f"Deleted job: {job_id}")
             return True
         return False
 
 
+class AsyncJobRepository:
+    """
+    Repository for PPT Job database operations on an AsyncSession.
+    
+    Used by the API routes; mirrors the JobRepository methods they need.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create_job(
+        self, 
+        input_s3_key: str, 
+        config: PPTConfigSchema,
+        user_id: Optional[str] = None,
+        input_sha256: Optional[str] = None,
+        priority: JobPriority = JobPriority.INTERACTIVE
+    ) -> PPTJob:
+        """Create a new PPT generation job (see JobRepository.create_job)."""
+        job = PPTJob(
+            input_s3_key=input_s3_key,
+            config_json=config.model_dump_json(),
+            status=JobStatus.PENDING,
+            user_id=user_id,
+            input_sha256=input_sha256,
+            priority=priority
+        )
+        
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        _invalidate_job_counts(user_id)
+        
+        logger.info(f"Created job: {job.id}")
+        return job
+    
+    async def get_job(self, job_id: str) -> Optional[PPTJob]:
+        """Get a job by ID."""
+        return await self.db.get(PPTJob, job_id)
+    
+    async def update_job_status(
+        self, 
+        job_id: str, 
+        status: JobStatus,
+        error_message: Optional[str] = None
+    ) -> Optional[PPTJob]:
+        """Update job status (see JobRepository.update_job_status)."""
+        job = (await self.db.scalars(_update_statement(job_id, _status_values(status, error_message)))).first()
+        await self.db.commit()
+        if job:
+            logger.info(f"Updated job {job_id} status to {status}")
+        
+        return job
+    
+    async def set_profiling(self, job_id: str, enabled: bool) -> Optional[PPTJob]:
+        """Turn per-job profiling on or off (see JobRepository.set_profiling)."""
+        job = await self.get_job(job_id)
+        if job:
+            config = json.loads(job.config_json)
+            config["profile"] = enabled
+            job.config_json = json.dumps(config)
+            
+            await self.db.commit()
+            logger.info(f"Set profiling for job {job_id}: {enabled}")
+        
+        return job
+    
+    async def list_jobs(
+        self, 
+        user_id: str,
+        limit: int = 100,
+        status: Optional[JobStatus] = None,
+        cursor: Optional[str] = None,
+        skip: int = 0
+    ) -> List[PPTJob]:
+        """
+        List a user's jobs, newest first (see JobRepository.list_jobs).
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        return list(await self.db.scalars(_list_jobs_statement(user_id, limit, status, cursor, skip)))
+    
+    async def count_jobs(self, user_id: str, status: Optional[JobStatus] = None) -> int:
+        """Count a user's jobs, cached like JobRepository.count_jobs."""
+        key = (user_id, status)
+        total = _job_counts.get(key)
+        if total is None:
+            total = await self.db.scalar(_count_jobs_statement(user_id, status))
+            _job_counts.set(key, total)
+        return total
+    
+    async def lock_user(self, user_id: str) -> None:
+        """
+        Lock a user's row until the transaction ends (SELECT ... FOR UPDATE).
+        
+        Serializes one user's admission checks and job inserts, so a burst
+        of requests can't all count the same jobs before any is inserted.
+        """
+        await self.db.execute(select(User.id).where(User.id == user_id).with_for_update())
+    
+    async def count_unfinished_jobs(self, user_id: str) -> int:
+        """Count a user's pending and processing jobs (uncached, for admission control)."""
+        return await self.db.scalar(
+            select(func.count(PPTJob.id)).where(
+                PPTJob.user_id == user_id,
+                PPTJob.status.in_((JobStatus.PENDING, JobStatus.PROCESSING))
+            )
+        )
+    
+    async def count_jobs_by_status(self, status: JobStatus) -> int:
+        """Count the jobs of all users in a status (uncached; e.g. the pending backlog)."""
+        return await self.db.scalar(select(func.count(PPTJob.id)).where(PPTJob.status == status))
+    
+    async def count_pending_ahead(self, job: PPTJob) -> int:
+        """
+        Count the pending jobs that will be started before a pending job:
+        older ones of the same priority, and for batch jobs every
+        interactive one.
+        """
+        ahead = and_(PPTJob.priority == job.priority, PPTJob.created_at < job.created_at)
+        if job.priority == JobPriority.BATCH:
+            ahead = or_(PPTJob.priority == JobPriority.INTERACTIVE, ahead)
+        return await self.db.scalar(
+            select(func.count(PPTJob.id)).where(PPTJob.status == JobStatus.PENDING, ahead)
+        )
+    
+    async def finished_jobs_since(self, since: datetime, sample_size: int = 200) -> Tuple[int, List[float]]:
+        """
+        Jobs that finished (completed or failed) since a time.
+        
+        Returns:
+            Tuple of (count, processing seconds of up to sample_size of the
+            latest completed ones)
+        """
+        count = await self.db.scalar(
+            select(func.count(PPTJob.id)).where(
+                PPTJob.status.in_((JobStatus.COMPLETED, JobStatus.FAILED)),
+                PPTJob.completed_at >= since
+            )
+        )
+        rows = await self.db.execute(
+            select(PPTJob.started_at, PPTJob.completed_at)
+            .where(
+                PPTJob.status == JobStatus.COMPLETED,
+                PPTJob.completed_at >= since,
+                PPTJob.started_at.is_not(None)
+            )
+            .order_by(PPTJob.completed_at.desc())
+            .limit(sample_size)
+        )
+        durations = [(completed_at - started_at).total_seconds() for started_at, completed_at in rows]
+        return count, durations
+    
+    async def delete_job(self, job_id: str) -> bool:
+        """Delete a job and its slide rows."""
+        job = await self.get_job(job_id)
+        if job:
+            await self.db.delete(job)
+            await self.db.commit()
+            _invalidate_job_counts(job.user_id)
+            logger.info(f"Deleted job: {job_id}")
+            return True
+        return False
+
+
+def _status_values(status: JobStatus, error_message: Optional[str]) -> dict:
+    """Column values for a status change, stamping started_at/completed_at."""
+    values = {"status": status}
+    if error_message:
+        values["error_message"] = error_message
+    if status == JobStatus.PROCESSING:
+        values["started_at"] = func.coalesce(PPTJob.started_at, func.now())
+    elif status in (JobStatus.COMPLETED, JobStatus.FAILED):
+        values["completed_at"] = func.now()
+    return values
+
+
+def _update_statement(job_id: str, values: dict, *criteria):
+    """Single UPDATE ... RETURNING of a job, if it matches criteria."""
+    return (
+        update(PPTJob)
+        .where(PPTJob.id == job_id, *criteria)
+        .values(**values)
+        .returning(PPTJob)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def _list_jobs_statement(
+    user_id: str,
+    limit: int,
+    status: Optional[JobStatus],
+    cursor: Optional[str],
+    skip: int
+):
+    """Keyset (or legacy offset) page of a user's jobs, newest first."""
+    stmt = select(PPTJob).where(PPTJob.user_id == user_id)
+    
+    if status:
+        stmt = stmt.where(PPTJob.status == status)
+    
+    if cursor:
+        created_at, job_id = decode_job_cursor(cursor)
+        stmt = stmt.where(tuple_(PPTJob.created_at, PPTJob.id) < tuple_(created_at, job_id))
+        skip = 0
+    
+    return stmt.order_by(PPTJob.created_at.desc(), PPTJob.id.desc()).offset(skip).limit(limit)
+
+
+def _count_jobs_statement(user_id: str, status: Optional[JobStatus]):
+    """SELECT count of a user's jobs (optionally by status)."""
+    stmt = select(func.count(PPTJob.id)).where(PPTJob.user_id == user_id)
+    if status:
+        stmt = stmt.where(PPTJob.status == status)
+    return stmt
+
+
+def _invalidate_job_counts(user_id: Optional[str]):
+    """Forget the cached job counts of a user."""
+    for status in (None, *JobStatus):
+        _job_counts.delete((user_id, status))
+
+
+class JobProgressBuffer:
+    """
+    Coalesces a job's progress updates and new slide rows in memory.
+    
+    update() writes through at most once per flush_interval seconds; the
+    latest values are always written by flush(), which callers must invoke
+    when the job finishes, also when it fails. Slide rows queued with
+    add_slide() are upserted in one statement on the same flush, before the
+    progress they account for.
+    
+    Trade-off: a slide shows up in the live preview (and in the progress)
+    up to flush_interval seconds after it was generated, in exchange for
+    one write per interval instead of two per slide. A flush_interval of 0
+    writes every slide and tick immediately. Safe to use from several
+    threads.
+    """
+    
+    def __init__(self, job_repo: JobRepository, job_id: str, flush_interval: float = 2.0, slide_repo=None):
+        self.job_repo = job_repo
+        self.slide_repo = slide_repo
+        self.job_id = job_id
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Optional[tuple] = None
+        self._slides: List[SlideCreate] = []
+        self._last_flush = 0.0
+    
+    def add_slide(self, slide: SlideCreate):
+        """
+        Queue a slide row for the next flush.
+        
+        Args:
+            slide: Slide record to upsert
+        """
+        with self._lock:
+            self._slides.append(slide)
+    
+    def update(self, completed_slides: int, total_slides: int):
+        """
+        Record progress, writing it if the flush interval has elapsed.
+        
+        Args:
+            completed_slides: Number of completed slides
+            total_slides: Total number of slides
+        """
+        with self._lock:
+            self._pending = (completed_slides, total_slides)
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+    
+    def flush(self):
+        """Write the latest recorded progress, if not written yet."""
+        with self._lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        if self._slides:
+            slides, self._slides = self._slides, []
+            try:
+                self.slide_repo.upsert_by_job_and_number(slides)
+            except Exception as e:
+                # Slide rows only drive the live preview; don't fail the job
+                logger.error(f"Failed to save {len(slides)} slide records for job {self.job_id}: {e}")
+                self.slide_repo.db.rollback()
+        if self._pending is None:
+            return
+        completed_slides, total_slides = self._pending
+        self.job_repo.update_job_progress(self.job_id, completed_slides, total_slides)
+        self._pending = None
+        self._last_flush = time.monotonic()
+
+
 def get_job_repository(db: Session) -> JobRepository:
     """Dependency for getting job repository instance."""
     return JobRepository(db)
+
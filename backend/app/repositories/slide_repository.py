@@ -1,11 +1,25 @@
 """Repository for Slide database operations."""
+import logging
 from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects import postgresql, sqlite
 
 from app.models.slide import Slide
 from app.schemas.slide import SlideCreate
 
+logger = logging.getLogger(__name__)
+
+# Dialects with INSERT ... ON CONFLICT support
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# Columns refreshed when a (job_id, slide_number) row already exists
+_UPSERT_COLUMNS = ("s3_key", "slide_type", "content_preview")
+
 
 class SlideRepository:
     """Repository for slide-related database operations."""
@@ -15,9 +29,6 @@ class SlideRepository:
     
     def create(self, slide_data: SlideCreate) -> Slide:
         """Create a new slide record."""
-        import logging
-        logger = logging.getLogger(__name__)
-        
         slide = Slide(
             job_id=slide_data.job_id,
             slide_number=slide_data.slide_number,
@@ -25,13 +36,52 @@ class SlideRepository:
             slide_type=slide_data.slide_type,
             content_preview=slide_data.content_preview
         )
-        logger.info(f"Creating slide record: job_id={slide_data.job_id}, slide_number={slide_data.slide_number}")
         self.db.add(slide)
         self.db.commit()
-        logger.info(f"Slide committed to DB: {slide.id}")
         self.db.refresh(slide)
+        logger.info(f"Created slide {slide.id}: job_id={slide_data.job_id}, slide_number={slide_data.slide_number}")
         return slide
     
+    def upsert_by_job_and_number(self, slides: List[SlideCreate]) -> int:
+        """
+        Insert slide records, updating rows that already exist for the same
+        (job_id, slide_number) instead of duplicating them. Returns the row count.
+        """
+        if not slides:
+            return 0
+        # One statement can't touch the same row twice; the last write wins
+        slides = list({(slide.job_id, slide.slide_number): slide for slide in slides}.values())
+        
+        dialect = self.db.get_bind().dialect.name
+        dialect_insert = _UPSERT_INSERTS.get(dialect)
+        if dialect_insert is None:
+            self._upsert_row_by_row(slides)
+        else:
+            stmt = dialect_insert(Slide)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Slide.job_id, Slide.slide_number],
+                set_={
+                    **{column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+                    "updated_at": func.now()
+                }
+            )
+            self.db.execute(stmt, [slide.model_dump() for slide in slides])
+        
+        self.db.commit()
+        logger.info(f"Upserted {len(slides)} slide records for job {slides[0].job_id}")
+        return len(slides)
+    
+    def _upsert_row_by_row(self, slides: List[SlideCreate]):
+        """Portable upsert for dialects without ON CONFLICT (not committed)."""
+        for slide_data in slides:
+            slide = self.get_by_slide_number(slide_data.job_id, slide_data.slide_number)
+            if slide is None:
+                self.db.add(Slide(**slide_data.model_dump()))
+            else:
+                for column in _UPSERT_COLUMNS:
+                    setattr(slide, column, getattr(slide_data, column))
+            self.db.flush()
+    
     def get_by_job_id(self, job_id: str) -> List[Slide]:
         """Get all slides for a job, ordered by slide number."""
         return (
@@ -63,3 +113,22 @@ class SlideRepository:
         deleted_count = self.db.query(Slide).filter(Slide.job_id == job_id).delete()
         self.db.commit()
         return deleted_count
+
+
+class AsyncSlideRepository:
+    """Read-side slide operations on an AsyncSession, for the API routes."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_by_job_id(self, job_id: str) -> List[Slide]:
+        """Get all slides for a job, ordered by slide number."""
+        return list(await self.db.scalars(
+            select(Slide).where(Slide.job_id == job_id).order_by(Slide.slide_number)
+        ))
+    
+    async def get_by_slide_number(self, job_id: str, slide_number: int) -> Optional[Slide]:
+        """Get a specific slide by job ID and slide number."""
+        return (await self.db.scalars(
+            select(Slide).where(and_(Slide.job_id == job_id, Slide.slide_number == slide_number))
+        )).first()
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
 from datetime import datetime
-from app.models.job import JobStatus
+from app.models.job import JobPriority, JobStatus
 
 
 class PPTConfigSchema(BaseModel):
@@ -13,6 +13,8 @@ class PPTConfigSchema(BaseModel):
     pages_to_process: int = Field(-1, description="Number of pages to process from input")
     output_format: str = Field("pdf", description="Output format: pdf or pptx")
     llm_provider: str = Field("gemini", description="LLM provider: claude or gemini")
+    slides_per_request: int = Field(1, ge=1, le=8, description="Content slides generated per LLM request (1 disables batching)")
+    profile: bool = Field(False, description="Record cProfile/tracemalloc artifacts next to the job outputs")
     
     # Styling
     primary_color: str = Field("#004080", description="Primary color")
@@ -33,12 +35,43 @@ class FileUploadResponse(BaseModel):
     s3_key: str = Field(..., description="S3 key of uploaded file")
     file_name: str = Field(..., description="Original file name")
     file_size: int = Field(..., description="File size in bytes")
+    sha256: Optional[str] = Field(None, description="Hex SHA-256 of the file content")
+
+
+class PresignedUploadRequest(BaseModel):
+    """Request to upload a file directly to S3."""
+    file_name: str = Field(..., description="Original file name")
+    file_size: int = Field(..., gt=0, description="File size in bytes")
+    sha256: str = Field(..., pattern="^[0-9a-fA-F]{64}$", description="Hex SHA-256 of the file content")
+    content_type: Optional[str] = Field(None, description="MIME type of the file")
+
+
+class PresignedUploadResponse(BaseModel):
+    """Where and how to upload a file directly to S3."""
+    upload_token: str = Field(..., description="Pass to /upload/complete once the upload finished")
+    s3_key: str = Field(..., description="S3 key the file will be stored under")
+    expires_in: int = Field(..., description="URL expiration time in seconds")
+    already_uploaded: bool = Field(False, description="The same content is already stored; skip the upload and just complete")
+    url: Optional[str] = Field(None, description="Single PUT URL (small files)")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Headers to send with the PUT")
+    upload_id: Optional[str] = Field(None, description="Multipart upload ID (large files)")
+    part_size: Optional[int] = Field(None, description="Bytes per part; the last part may be shorter")
+    part_urls: list[str] = Field(default_factory=list, description="PUT URL of each part, in order")
+
+
+class UploadCompleteRequest(BaseModel):
+    """Request to verify and register a direct upload."""
+    upload_token: str = Field(..., description="Token from /upload/presign")
 
 
 class JobCreateRequest(BaseModel):
     """Request to create a new PPT generation job."""
     input_s3_key: str = Field(..., description="S3 key of input file")
     config: PPTConfigSchema = Field(..., description="PPT generation configuration")
+    priority: JobPriority = Field(
+        JobPriority.INTERACTIVE,
+        description="interactive, or batch for jobs nobody is waiting on (queued behind interactive jobs)"
+    )
 
 
 class JobCreateResponse(BaseModel):
@@ -61,6 +94,10 @@ class JobStatusResponse(BaseModel):
     updated_at: Optional[datetime] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    # Estimates for unfinished jobs (see EtaService); only on GET /jobs/{job_id}
+    eta_seconds: Optional[int] = Field(None, description="Estimated seconds until the job finishes")
+    queue_position: Optional[int] = Field(None, description="1-based position among the jobs waiting to start")
+    estimated_completion_at: Optional[datetime] = Field(None, description="Estimated finish time")
     
     class Config:
         from_attributes = True
@@ -78,9 +115,22 @@ class JobListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to get the next page; null on the last page")
 
 
 class SlideRegenerateRequest(BaseModel):
     """Request to regenerate specific slides."""
     slide_numbers: list[int] = Field(..., description="List of slide numbers to regenerate")
     instructions: str = Field(..., description="Instructions for regenerating slides")
+
+
+class JobProfileRequest(BaseModel):
+    """Request to toggle profiling for a job."""
+    enabled: bool = Field(True, description="Profile the job's remaining stages")
+
+
+class JobProfileResponse(BaseModel):
+    """Profiling state and artifacts of a job."""
+    job_id: str
+    enabled: bool
+    artifacts: Dict[str, str] = Field(default_factory=dict, description="Artifact name -> download URL")
@@ -0,0 +1,103 @@
+"""Admission control for new jobs: per-user and system backlog limits."""
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import get_settings
+from app.models.job import JobPriority, JobStatus
+from app.repositories.job_repository import AsyncJobRepository
+
+logger = logging.getLogger(__name__)
+
+# Celery message priority of each job priority (Redis transport: 0 is served first)
+CELERY_PRIORITIES = {
+    JobPriority.INTERACTIVE: 0,
+    JobPriority.BATCH: 9,
+}
+
+# Bounds of the Retry-After estimate, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 3600
+# Retry-After when no job finished recently to estimate from
+DEFAULT_RETRY_AFTER = 60
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a job may not be queued now."""
+    
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionService:
+    """
+    Decides whether a new job may be queued.
+    
+    A user may have settings.max_pending_jobs_per_user unfinished jobs, and
+    the system settings.max_pending_jobs pending ones; batch jobs are
+    refused once the backlog fills settings.batch_backlog_share of that, so
+    interactive jobs always find room. Refusals carry a Retry-After
+    estimate from the backlog and the throughput of the last
+    settings.admission_throughput_window seconds.
+    """
+    
+    def __init__(self, job_repo: AsyncJobRepository):
+        self.job_repo = job_repo
+        self.settings = get_settings()
+    
+    async def admit(self, user_id: str, priority: JobPriority):
+        """
+        Check the limits for a new job of a user.
+        
+        Call it in the transaction that inserts the job: the per-user check
+        locks the user's row until that transaction ends. The system backlog
+        isn't serialized and may be exceeded by a few concurrent requests.
+        
+        Raises:
+            AdmissionRejectedError: If a limit is reached
+        """
+        user_limit = self.settings.max_pending_jobs_per_user
+        if user_limit > 0:
+            await self.job_repo.lock_user(user_id)
+            unfinished = await self.job_repo.count_unfinished_jobs(user_id)
+            if unfinished >= user_limit:
+                retry_after = await self._retry_after(unfinished - user_limit + 1, per_user=True)
+                raise AdmissionRejectedError(
+                    f"You have {unfinished} unfinished jobs (limit {user_limit}); "
+                    f"wait for some to finish or cancel them",
+                    retry_after
+                )
+        
+        backlog_limit = self.backlog_limit(priority)
+        if backlog_limit > 0:
+            pending = await self.job_repo.count_jobs_by_status(JobStatus.PENDING)
+            if pending >= backlog_limit:
+                retry_after = await self._retry_after(pending - backlog_limit + 1)
+                logger.warning(f"Refused {priority.value} job of user {user_id}: {pending} jobs pending")
+                raise AdmissionRejectedError("Too many jobs are queued right now, try again later", retry_after)
+    
+    def backlog_limit(self, priority: JobPriority) -> int:
+        """Pending jobs in the system at which jobs of a priority are refused (0: no limit)."""
+        limit = self.settings.max_pending_jobs
+        if limit > 0 and priority == JobPriority.BATCH:
+            return max(1, int(limit * self.settings.batch_backlog_share))
+        return limit
+    
+    async def _retry_after(self, jobs: int, per_user: bool = False) -> int:
+        """Seconds until about `jobs` more jobs have finished, at the recent pace."""
+        window = self.settings.admission_throughput_window
+        finished, durations = await self.job_repo.finished_jobs_since(
+            datetime.now(timezone.utc) - timedelta(seconds=window)
+        )
+        if per_user:
+            # A user's jobs run at most max_running_jobs_per_user at a time
+            if not durations:
+                return DEFAULT_RETRY_AFTER
+            parallel = max(1, self.settings.max_running_jobs_per_user)
+            seconds = jobs * (sum(durations) / len(durations)) / parallel
+        else:
+            if not finished:
+                return DEFAULT_RETRY_AFTER
+            seconds = jobs * window / finished
+        return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(seconds)))
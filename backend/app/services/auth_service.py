@@ -1,17 +1,19 @@
 """Authentication service."""
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime, timedelta, timezone
 from app.models.user import User, Session as UserSession, VerificationToken, PasswordResetToken, Account
 from app.core.auth_utils import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password_async,
     create_access_token,
     create_refresh_token,
     generate_token,
     generate_device_id,
     decode_token,
 )
+from app.core.auth_cache import AuthenticatedUser, invalidate_session, invalidate_user
 from app.core.config import get_settings
 import httpx
 from urllib.parse import urlencode
@@ -28,16 +30,25 @@ class AuthService:
     """Authentication service."""
 
     @staticmethod
-    def signup(db: Session, email: str, password: str, ip_address: str | None = None) -> dict:
+    async def signup(db: Session, email: str, password: str, ip_address: str | None = None) -> dict:
         """Register a new user with email/password."""
+        await run_in_threadpool(AuthService._check_email_available, db, email)
+        # Awaited, so no request thread (or pooled connection) is held while hashing
+        password_hash = await hash_password_async(password)
+        return await run_in_threadpool(AuthService._create_user, db, email, password_hash, ip_address)
+
+    @staticmethod
+    def _check_email_available(db: Session, email: str):
         existing_user = db.query(User).filter(User.email == email).first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
+        db.rollback()
 
-        password_hash = hash_password(password)
+    @staticmethod
+    def _create_user(db: Session, email: str, password_hash: str, ip_address: str | None) -> dict:
         user = User(email=email, password_hash=password_hash)
         db.add(user)
         db.flush()
@@ -81,7 +92,7 @@ class AuthService:
         }
 
     @staticmethod
-    def login(
+    async def login(
         db: Session,
         email: str,
         password: str,
@@ -90,6 +101,17 @@ class AuthService:
         user_agent: str | None = None,
     ) -> dict:
         """Login with email/password."""
+        user, password_hash, lock_expired = await run_in_threadpool(AuthService._find_login_user, db, email)
+        # Awaited, so no request thread (or pooled connection) is held while bcrypt runs
+        valid, new_hash = await verify_and_update_password_async(password, password_hash)
+        return await run_in_threadpool(
+            AuthService._complete_login,
+            db, user, valid, new_hash, lock_expired, device_id, ip_address, user_agent
+        )
+
+    @staticmethod
+    def _find_login_user(db: Session, email: str) -> tuple:
+        """The user logging in, their password hash and whether their lock expired."""
         user = db.query(User).filter(User.email == email).first()
 
         if not user or not user.password_hash:
@@ -98,17 +120,37 @@ class AuthService:
                 detail="Invalid credentials",
             )
 
+        lock_expired = False
         if user.locked and user.locked_until:
             if datetime.now(timezone.utc) < user.locked_until:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Account is locked. Try again later.",
                 )
+            lock_expired = True
+
+        # Return the connection to the pool while bcrypt runs; user reloads on next access
+        password_hash = user.password_hash
+        db.rollback()
+        return user, password_hash, lock_expired
+
+    @staticmethod
+    def _complete_login(
+        db: Session,
+        user: User,
+        valid: bool,
+        new_hash: str | None,
+        lock_expired: bool,
+        device_id: str | None,
+        ip_address: str | None,
+        user_agent: str | None,
+    ) -> dict:
+        if lock_expired:
             user.locked = False
             user.locked_until = None
             user.failed_login_attempts = 0
 
-        if not verify_password(password, user.password_hash):
+        if not valid:
             user.failed_login_attempts += 1
             if user.failed_login_attempts >= ACCOUNT_LOCKOUT_ATTEMPTS:
                 user.locked = True
@@ -116,6 +158,7 @@ class AuthService:
                     minutes=ACCOUNT_LOCKOUT_DURATION_MINUTES
                 )
                 db.commit()
+                invalidate_user(user.id)
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Account locked due to too many failed login attempts",
@@ -127,6 +170,8 @@ class AuthService:
             )
 
         user.failed_login_attempts = 0
+        if new_hash:
+            user.password_hash = new_hash
 
         if user.two_factor_enabled:
             db.commit()
@@ -196,6 +241,7 @@ class AuthService:
         session.refresh_token = new_refresh_token
         session.expires_at = datetime.now(timezone.utc) + timedelta(hours=settings.session_expire_hours)
         db.commit()
+        invalidate_session(refresh_token)
 
         return {
             "accessToken": access_token,
@@ -209,6 +255,7 @@ class AuthService:
         if session:
             db.delete(session)
             db.commit()
+        invalidate_session(refresh_token)
         return {"message": "Logged out"}
 
     @staticmethod
@@ -231,11 +278,13 @@ class AuthService:
             user.email_verified = True
         db.delete(verification)
         db.commit()
+        if user:
+            invalidate_user(user.id)
 
         return {"message": "Email verified successfully"}
 
     @staticmethod
-    def resend_verification(db: Session, user: User) -> dict:
+    def resend_verification(db: Session, user: AuthenticatedUser) -> dict:
         """Resend email verification token."""
         token = generate_token()
         expires_at = datetime.now(timezone.utc) + timedelta(hours=VERIFICATION_TOKEN_EXPIRE_HOURS)
@@ -260,8 +309,15 @@ class AuthService:
         return {"message": "If the email exists, a reset link will be sent", "token": token}
 
     @staticmethod
-    def reset_password(db: Session, token: str, new_password: str) -> dict:
+    async def reset_password(db: Session, token: str, new_password: str) -> dict:
         """Reset password with token."""
+        await run_in_threadpool(AuthService._check_reset_token, db, token)
+        # Awaited, so no request thread (or pooled connection) is held while hashing
+        password_hash = await hash_password_async(new_password)
+        return await run_in_threadpool(AuthService._set_password, db, token, password_hash)
+
+    @staticmethod
+    def _check_reset_token(db: Session, token: str):
         reset_token = db.query(PasswordResetToken).filter(PasswordResetToken.token == token).first()
         if not reset_token:
             raise HTTPException(
@@ -274,15 +330,28 @@ class AuthService:
                 detail="Reset token expired",
             )
 
+        db.rollback()
+
+    @staticmethod
+    def _set_password(db: Session, token: str, password_hash: str) -> dict:
+        reset_token = db.query(PasswordResetToken).filter(PasswordResetToken.token == token).first()
+        if not reset_token:
+            # Redeemed by a concurrent request while hashing
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid reset token",
+            )
         user = db.query(User).filter(User.id == reset_token.user_id).first()
         if user:
-            user.password_hash = hash_password(new_password)
+            user.password_hash = password_hash
             user.failed_login_attempts = 0
             user.locked = False
             user.locked_until = None
 
         db.delete(reset_token)
         db.commit()
+        if user:
+            invalidate_user(user.id)
 
         return {"message": "Password reset successfully"}
 
@@ -399,6 +468,7 @@ class AuthService:
         )
         db.add(session)
         db.commit()
+        invalidate_user(user.id)
 
         return {
             "accessToken": access_token_jwt,
@@ -0,0 +1,86 @@
+"""Estimated time to completion of jobs."""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from app.core.job_stats import average_duration
+from app.core.llm_models import metric_labels
+from app.models.job import JobStatus, PPTJob
+from app.repositories.job_repository import AsyncJobRepository
+
+logger = logging.getLogger(__name__)
+
+# Title and ending slides, on top of the configured content slides
+EXTRA_SLIDES = 2
+
+# job_stats key of the whole-job average
+ALL_JOBS = "all"
+
+
+def slide_stats_key(config: Dict[str, Any]) -> str:
+    """job_stats key of the per-slide average of a job config ("provider:model")."""
+    labels = metric_labels(config)
+    return f"{labels['provider']}:{labels['model']}"
+
+
+@dataclass
+class JobEta:
+    """Time estimate of an unfinished job; all None once it finished."""
+    eta_seconds: Optional[int] = None
+    queue_position: Optional[int] = None
+    estimated_completion_at: Optional[datetime] = None
+
+
+class EtaService:
+    """
+    Estimates when a job will finish.
+    
+    Its own remaining work comes from the moving averages of recent slide,
+    setup and conversion times for its provider/model and output format
+    (app.core.job_stats). A pending job also waits for the jobs ahead of it
+    in the queue; those are assumed to drain at the average job duration
+    spread over the jobs processing right now. Per-user running limits are
+    ignored, so a user's own queued jobs may start later than estimated.
+    """
+    
+    def __init__(self, job_repo: AsyncJobRepository):
+        self.job_repo = job_repo
+    
+    async def estimate(self, job: PPTJob) -> JobEta:
+        """Estimate a job's remaining time and queue position."""
+        if job.status not in (JobStatus.PENDING, JobStatus.PROCESSING):
+            return JobEta()
+        
+        config = json.loads(job.config_json)
+        # The averages may be read from Redis (blocking)
+        seconds = await asyncio.to_thread(self.remaining_work, job, config)
+        
+        queue_position = None
+        if job.status == JobStatus.PENDING:
+            ahead = await self.job_repo.count_pending_ahead(job)
+            queue_position = ahead + 1
+            if ahead:
+                running = await self.job_repo.count_jobs_by_status(JobStatus.PROCESSING)
+                job_seconds = await asyncio.to_thread(average_duration, "job", ALL_JOBS)
+                seconds += ahead * job_seconds / max(1, running)
+        
+        eta_seconds = round(seconds)
+        return JobEta(
+            eta_seconds=eta_seconds,
+            queue_position=queue_position,
+            estimated_completion_at=datetime.now(timezone.utc) + timedelta(seconds=eta_seconds)
+        )
+    
+    def remaining_work(self, job: PPTJob, config: Dict[str, Any]) -> float:
+        """Seconds of processing a job still needs once started."""
+        slide_seconds = average_duration("slide", slide_stats_key(config))
+        if job.total_slides:
+            seconds = max(0, job.total_slides - job.completed_slides) * slide_seconds
+        else:
+            # Not started, or still extracting its input
+            slides = config.get("number_of_slides", 15) + EXTRA_SLIDES
+            seconds = average_duration("setup", config.get("llm_provider", "gemini")) + slides * slide_seconds
+        return seconds + average_duration("conversion", config.get("output_format", "pdf"))
@@ -1,15 +1,26 @@
 """PPT generation service for synchronous HTML generation."""
+import asyncio
+import io
+import json
 import logging
 import os
+import re
 import sys
-import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Optional, Tuple, List
 
+from app.core.cancellation import CancellationToken
 from app.core.config import get_settings
-from app.core.database import SessionLocal
+from app.core.job_stats import record_duration
+from app.core.llm_models import LLM_MODELS, metric_labels
+from app.core.metrics import time_stage, observe_llm_call, record_cache_lookup, record_llm_retry
+from app.core.tempfiles import temp_directory
+from app.core.tracing import trace_llm_call
+from app.services.eta_service import slide_stats_key
 from app.services.s3_service import S3Service
-from app.repositories.job_repository import JobRepository
+from app.repositories.job_repository import JobRepository, JobProgressBuffer
 from app.repositories.slide_repository import SlideRepository
 from app.models.job import JobStatus
 from app.schemas.slide import SlideCreate
@@ -28,9 +39,86 @@ from generate_ppt import (
     generate_ending_slide_html,
     generate_content_slide_html,
     save_html_slide,
-    get_instructions
+    get_instructions,
+    build_content_prompt_template,
+    build_batched_prompt_template,
+    plan_content_batches,
+    generate_content_slides_batch_html,
+    add_llm_observer,
+    PptxDeckBuilder,
+    source_extractor
 )
 
+add_llm_observer(observe_llm_call)
+add_llm_observer(trace_llm_call)
+
+# Content type of each output format
+OUTPUT_CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
+
+# Bump when extraction output changes so pages cached by older code aren't reused
+EXTRACTION_CACHE_VERSION = 2
+EXTRACTION_CACHE_PREFIX = "ppt-yash-proj/cache/extract/"
+
+
+def extraction_cache_key(input_sha256: str, extractor: str, pages_to_process: int) -> str:
+    """
+    Storage key of the extracted pages of an input: by content hash and by
+    extractor, since the same bytes uploaded as .pdf and as .md are read
+    differently (see generate_ppt.source_extractor).
+    """
+    return f"{EXTRACTION_CACHE_PREFIX}v{EXTRACTION_CACHE_VERSION}/{input_sha256}-{extractor}-{pages_to_process}.json"
+
+
+_EXTRACTION_CACHE_KEY_RE = re.compile(
+    rf"^{re.escape(EXTRACTION_CACHE_PREFIX)}v{EXTRACTION_CACHE_VERSION}/([0-9a-f]{{64}})-[a-z]+--?\d+\.json$"
+)
+
+
+def extraction_cache_sha256(cache_key: str) -> Optional[str]:
+    """Input hash of an extraction cache key of the current version, or None for any other key."""
+    match = _EXTRACTION_CACHE_KEY_RE.match(cache_key)
+    return match.group(1) if match else None
+
+
+def output_file_key(job_id: str, file_name: str) -> str:
+    """Storage key of a job's output file."""
+    return f"ppt-yash-proj/outputs/{job_id}/{file_name}"
+
+
+class DeckStream:
+    """
+    Feeds generated slides to a PptxDeckBuilder on a background thread, so
+    converting one slide overlaps generating the next. Slides are added in
+    the order given. If a slide fails to convert, finish() returns None and
+    the job falls back to converting the HTML files at the end.
+    """
+    
+    def __init__(self, builder: PptxDeckBuilder):
+        self.builder = builder
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pptx-deck")
+        self._pending = []
+    
+    def add(self, html: str):
+        """Queue a slide's HTML for conversion."""
+        self._pending.append(self._executor.submit(self.builder.add_slide, html))
+    
+    def finish(self, output_folder: Path) -> Optional[Path]:
+        """Wait for the queued slides and save the deck; returns its path, or None on failure."""
+        try:
+            for future in self._pending:
+                future.result()
+            return self.builder.save(output_folder)
+        except Exception as e:
+            logger.warning(f"Building the deck during generation failed, converting afterwards: {str(e)}")
+            return None
+    
+    def close(self):
+        """Stop converting (e.g. after an error); queued slides are dropped."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
 
 class PPTService:
     """Service for PPT generation operations."""
@@ -45,42 +133,60 @@ class PPTService:
         self,
         job_id: str,
         input_s3_key: str,
-        config: Dict[str, Any]
-    ) -> Tuple[str, int]:
+        config: Dict[str, Any],
+        input_sha256: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[str, int, Optional[str]]:
         """
         Generate HTML slides synchronously and upload to S3.
         
+        With a cancel_token, cancellation is checked before each slide (or
+        batch) and while LLM responses stream in.
+        
+        For pptx output the deck is built while the slides are generated
+        (see DeckStream) and uploaded as soon as the last one is done, so
+        the job needs no separate conversion step.
+        
         Returns:
-            Tuple of (html_folder_s3_key, total_slides)
+            Tuple of (html_folder_s3_key, total_slides, output_s3_key); the
+            output key is None when the output still has to be converted
+            
+        Raises:
+            JobCancelled / GenerationCancelled: If the job was cancelled
         """
-        import asyncio
-        
         logger.info(f"Starting HTML generation for job {job_id}")
         
+        # Don't flip a job cancelled while queued back to processing
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        
         # Update status to processing
         self.job_repo.update_job_status(job_id, JobStatus.PROCESSING)
+        started = time.perf_counter()
+        slide_key = slide_stats_key(config)
         
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with temp_directory() as temp_dir:
             temp_path = Path(temp_dir)
             input_path = temp_path / "input"
             output_path = temp_path / "output"
             input_path.mkdir(exist_ok=True)
             output_path.mkdir(exist_ok=True)
             
-            # Download input file
-            logger.info(f"Downloading input file: {input_s3_key}")
             file_ext = Path(input_s3_key).suffix
             input_file = input_path / f"input_file{file_ext}"
-            await self.s3_service.download_file(input_s3_key, str(input_file))
             
             # Prepare config
             ppt_config = self._prepare_ppt_config(
                 job_id, config, input_file, output_path
             )
+            if cancel_token:
+                ppt_config["llm"]["should_abort"] = cancel_token
+            deck = DeckStream(PptxDeckBuilder(ppt_config)) if ppt_config["output"]["format"] == "pptx" else None
             
             # Change to temp directory for generate_ppt module
             original_dir = os.getcwd()
             os.chdir(temp_path)
+            progress = None
             
             try:
                 import generate_ppt
@@ -89,7 +195,7 @@ class PPTService:
                 
                 # Load instructions and content
                 instructions = get_instructions()
-                pages = load_source_content(ppt_config)
+                pages = await self.load_source_pages(input_s3_key, input_sha256, ppt_config, input_file)
                 logger.info(f"Loaded {len(pages)} pages from source")
                 
                 if not pages:
@@ -101,7 +207,15 @@ class PPTService:
                 logger.info(f"Distributing content across {len(slides_content)} slides")
                 
                 total_slides = len(slides_content) + 2  # +2 for title and ending
-                self.job_repo.update_job_progress(job_id, 0, total_slides)
+                # Progress ticks and slide rows are coalesced; flushed for good
+                # when generation ends, successfully or not
+                progress = JobProgressBuffer(
+                    self.job_repo, job_id, self.settings.progress_flush_interval, slide_repo=self.slide_repo
+                )
+                progress.update(0, total_slides)
+                
+                # Render the static part of the content prompt once per job
+                prompt_template = build_content_prompt_template(ppt_config, instructions)
                 
                 # Generate slides
                 slide_number = 1
@@ -109,48 +223,152 @@ class PPTService:
                 # Prepare S3 folder key
                 html_folder_s3_key = f"ppt-yash-proj/htmls/{job_id}"
                 
+                record_duration("setup", config.get("llm_provider", "gemini"), time.perf_counter() - started)
+                
                 # Title slide
                 logger.info("Generating title slide...")
+                slide_started = time.perf_counter()
                 title_html = generate_title_slide_html(ppt_config, instructions)
                 if title_html:
                     save_html_slide(title_html, slide_number, output_path)
+                    if deck:
+                        deck.add(title_html)
                     # Upload immediately to S3 and DB
-                    await self._upload_single_slide(job_id, output_path, slide_number, html_folder_s3_key, slide_type="title")
+                    await self._upload_single_slide(job_id, output_path, slide_number, html_folder_s3_key, progress, slide_type="title")
                     slide_number += 1
-                    self.job_repo.update_job_progress(job_id, slide_number - 1, total_slides)
+                    progress.update(slide_number - 1, total_slides)
+                    record_duration("slide", slide_key, time.perf_counter() - slide_started)
                 
-                # Content slides
-                for i, slide_content in enumerate(slides_content):
-                    logger.info(f"Generating content slide {i+1}/{len(slides_content)}...")
-                    html = generate_content_slide_html(
-                        slide_content,
-                        slide_number,
-                        total_slides,
-                        ppt_config,
-                        instructions
-                    )
-                    save_html_slide(html, slide_number, output_path)
-                    # Upload immediately to S3 and DB for live preview
-                    await self._upload_single_slide(job_id, output_path, slide_number, html_folder_s3_key, slide_type="content")
-                    slide_number += 1
-                    self.job_repo.update_job_progress(job_id, slide_number - 1, total_slides)
+                # Content slides (optionally several per LLM request)
+                slides_per_request = ppt_config["processing"].get("slides_per_request", 1)
+                batches = plan_content_batches(slides_content, slides_per_request)
+                batch_template = build_batched_prompt_template(ppt_config, instructions) if slides_per_request > 1 else None
+                
+                for batch in batches:
+                    if cancel_token:
+                        cancel_token.raise_if_cancelled()
+                    slide_started = time.perf_counter()
+                    batch_htmls = [None] * len(batch)
+                    if len(batch) > 1:
+                        logger.info(f"Generating content slides {batch[0]+1}-{batch[-1]+1}/{len(slides_content)} in one request...")
+                        batch_htmls = generate_content_slides_batch_html(
+                            [slides_content[i] for i in batch],
+                            slide_number,
+                            total_slides,
+                            ppt_config,
+                            instructions,
+                            batch_template=batch_template
+                        )
+                        failed = batch_htmls.count(None)
+                        if failed:
+                            record_llm_retry("batch_fallback", failed)
+                            logger.warning(f"Batched response unusable for {failed}/{len(batch)} slides, falling back to per-slide generation")
+                    
+                    for i, html in zip(batch, batch_htmls):
+                        if html is None:
+                            if cancel_token:
+                                cancel_token.raise_if_cancelled()
+                            logger.info(f"Generating content slide {i+1}/{len(slides_content)}...")
+                            html = generate_content_slide_html(
+                                slides_content[i],
+                                slide_number,
+                                total_slides,
+                                ppt_config,
+                                instructions,
+                                prompt_template=prompt_template
+                            )
+                        save_html_slide(html, slide_number, output_path)
+                        if deck:
+                            deck.add(html)
+                        # Upload immediately to S3 and DB for live preview
+                        await self._upload_single_slide(job_id, output_path, slide_number, html_folder_s3_key, progress, slide_type="content")
+                        slide_number += 1
+                        progress.update(slide_number - 1, total_slides)
+                    record_duration("slide", slide_key, (time.perf_counter() - slide_started) / len(batch))
                 
                 # Ending slide
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
                 logger.info("Generating ending slide...")
+                slide_started = time.perf_counter()
                 ending_html = generate_ending_slide_html(ppt_config, instructions)
                 if ending_html:
                     save_html_slide(ending_html, slide_number, output_path)
+                    if deck:
+                        deck.add(ending_html)
                     # Upload immediately to S3 and DB
-                    await self._upload_single_slide(job_id, output_path, slide_number, html_folder_s3_key, slide_type="ending")
-                    self.job_repo.update_job_progress(job_id, slide_number, total_slides)
+                    await self._upload_single_slide(job_id, output_path, slide_number, html_folder_s3_key, progress, slide_type="ending")
+                    progress.update(slide_number, total_slides)
+                    record_duration("slide", slide_key, time.perf_counter() - slide_started)
                 
+                progress.flush()
                 generate_ppt.SCRIPT_DIR = old_script_dir
                 
                 logger.info(f"HTML generation completed for job {job_id}")
-                return html_folder_s3_key, total_slides
+                
+                output_s3_key = None
+                if deck:
+                    if cancel_token:
+                        cancel_token.raise_if_cancelled()
+                    output_s3_key = await self._upload_deck(job_id, deck, temp_path / "deck")
+                return html_folder_s3_key, total_slides, output_s3_key
                 
             finally:
                 os.chdir(original_dir)
+                if deck:
+                    deck.close()
+                if progress:
+                    # Slides generated before a failure or cancellation stay visible
+                    try:
+                        progress.flush()
+                    except Exception as e:
+                        logger.error(f"Failed to save the progress of job {job_id}: {str(e)}")
+    
+    async def load_source_pages(
+        self,
+        input_s3_key: str,
+        input_sha256: Optional[str],
+        ppt_config: Dict[str, Any],
+        input_file: Path
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract the pages of a job's input, through a storage cache keyed by
+        content hash so jobs on the same file share one extraction.
+        
+        On a miss the input is downloaded to input_file and extracted with
+        load_source_content (generate_ppt.SCRIPT_DIR must point at its
+        parent's parent). Inputs without a known hash are never cached.
+        """
+        cache_key = None
+        if input_sha256:
+            cache_key = extraction_cache_key(
+                input_sha256,
+                source_extractor(Path(input_s3_key).suffix),
+                ppt_config["slides"]["pages_to_process"]
+            )
+            try:
+                cached = await asyncio.to_thread(self.s3_service.read_file, cache_key)
+            except Exception as e:
+                logger.warning(f"Extraction cache unavailable: {e}")
+                cached = None
+            record_cache_lookup("extraction", cached is not None)
+            if cached is not None:
+                logger.info(f"Using cached extraction of {input_s3_key}")
+                return json.loads(cached)
+        
+        logger.info(f"Downloading input file: {input_s3_key}")
+        await self.s3_service.download_file(input_s3_key, str(input_file))
+        with time_stage("extract"):
+            pages = load_source_content(ppt_config)
+        
+        if cache_key and pages:
+            try:
+                await self.s3_service.upload_file(
+                    io.BytesIO(json.dumps(pages).encode()), cache_key, content_type="application/json"
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache extraction of {input_s3_key}: {e}")
+        return pages
     
     def _prepare_ppt_config(
         self,
@@ -213,11 +431,11 @@ class PPTService:
             "llm": {
                 "provider": config.get("llm_provider", "gemini"),
                 "claude": {
-                    "model": "claude-sonnet-4-5-20250929",
+                    "model": LLM_MODELS["claude"],
                     "max_tokens": 10000
                 },
                 "gemini": {
-                    "model": "gemini-2.0-flash-exp",
+                    "model": LLM_MODELS["gemini"],
                     "max_tokens": 10000
                 }
             },
@@ -225,7 +443,8 @@ class PPTService:
                 "verbose": True,
                 "save_html_files": True,
                 "cleanup_html": False,
-                "max_retries": 2
+                "max_retries": 2,
+                "slides_per_request": config.get("slides_per_request", 1)
             }
         }
     
@@ -235,41 +454,51 @@ class PPTService:
         output_path: Path, 
         slide_number: int, 
         html_folder_s3_key: str,
+        progress: JobProgressBuffer,
         slide_type: str = "content"
     ):
-        """Upload a single HTML slide to S3 and save to DB immediately after generation."""
-        html_file = output_path / f"slide_{slide_number}.html"
-        if html_file.exists():
-            s3_key = f"{html_folder_s3_key}/slide_{slide_number}.html"
-            
-            # Upload to S3
-            await self.s3_service.upload_file_from_path(
-                str(html_file),
-                s3_key,
-                content_type="text/html"
-            )
-            logger.info(f"Uploaded slide_{slide_number}.html to S3 for live preview")
-            
-            # Save to database with a fresh session
-            db = None
-            try:
-                db = SessionLocal()
-                slide_repo = SlideRepository(db)
-                slide_data = SlideCreate(
+        """
+        Upload a single HTML slide to S3 and queue its DB row with the next
+        progress flush (see JobProgressBuffer for the delay).
+        """
+        with time_stage("slide_upload"):
+            html_file = output_path / f"slide_{slide_number}.html"
+            if html_file.exists():
+                s3_key = f"{html_folder_s3_key}/slide_{slide_number}.html"
+                
+                # Upload to S3
+                await self.s3_service.upload_file_from_path(
+                    str(html_file),
+                    s3_key,
+                    content_type="text/html"
+                )
+                logger.info(f"Uploaded slide_{slide_number}.html to S3 for live preview")
+                
+                progress.add_slide(SlideCreate(
                     job_id=job_id,
                     slide_number=slide_number,
                     s3_key=s3_key,
                     slide_type=slide_type
-                )
-                slide = slide_repo.create(slide_data)
-                logger.info(f"Saved slide_{slide_number} (id: {slide.id}) to database")
-            except Exception as e:
-                logger.error(f"Failed to save slide to database: {e}")
-                if db:
-                    db.rollback()
-            finally:
-                if db:
-                    db.close()
+                ))
+    
+    async def _upload_deck(self, job_id: str, deck: "DeckStream", deck_path: Path) -> Optional[str]:
+        """Save a streamed deck and upload it as the job output; None if the deck failed."""
+        deck_path.mkdir(exist_ok=True)
+        started = time.perf_counter()
+        with time_stage("conversion"):
+            output_file = await asyncio.to_thread(deck.finish, deck_path)
+        if output_file is None:
+            return None
+        record_duration("conversion", "pptx", time.perf_counter() - started)
+        
+        output_s3_key = output_file_key(job_id, output_file.name)
+        await self.s3_service.upload_file_from_path(
+            str(output_file),
+            output_s3_key,
+            content_type=OUTPUT_CONTENT_TYPES["pptx"]
+        )
+        logger.info(f"Uploaded deck of job {job_id} built during generation")
+        return output_s3_key
     
     async def _upload_html_folder(self, output_path: Path, html_folder_s3_key: str):
         """Upload all HTML files from output folder to S3."""
@@ -1,28 +1,145 @@
+import asyncio
+import base64
 import boto3
+import hashlib
+import math
+import os
+import re
+import shutil
+import uuid
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Optional, BinaryIO
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator, List, Optional, BinaryIO
 from pathlib import Path
 from app.core.config import get_settings
+from app.core.metrics import time_stage
+from app.core.tracing import traced
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Inputs are stored once per content: <INPUTS_PREFIX>/<sha256><ext>. Uploads
+# land under UPLOADS_PREFIX first, since the hash is only known at the end.
+INPUTS_PREFIX = "ppt-yash-proj/inputs"
+UPLOADS_PREFIX = "ppt-yash-proj/uploads"
+
+_INPUT_KEY_RE = re.compile(rf"^{INPUTS_PREFIX}/([0-9a-f]{{64}})(\.[^/]*)?$")
+
+
+def input_key(sha256: str, filename: str) -> str:
+    """Content-addressed key of an input file (the extension tells extraction the file type)."""
+    return f"{INPUTS_PREFIX}/{sha256}{Path(filename).suffix.lower()}"
+
+
+def staging_key(filename: str) -> str:
+    """Fresh key to upload a file to before its hash is known."""
+    return f"{UPLOADS_PREFIX}/{uuid.uuid4()}{Path(filename).suffix.lower()}"
+
+
+def input_sha256(s3_key: str) -> Optional[str]:
+    """SHA-256 of a content-addressed input key, or None for other keys."""
+    match = _INPUT_KEY_RE.match(s3_key)
+    return match.group(1) if match else None
+
+
+class UploadTooLargeError(Exception):
+    """Raised by S3Service.upload_stream when the stream exceeds max_bytes."""
+
+
+@dataclass
+class StoredObject:
+    """Result of a streamed upload."""
+    s3_key: str
+    size: int
+    sha256: str
+
+
+class DirectUploadUnavailableError(Exception):
+    """Raised for presigned uploads in Dev Mode, where there is no S3 to upload to."""
+
+
+# S3 limits: multipart uploads have at most 10,000 parts of at least 5 MiB;
+# delete_objects takes at most 1,000 keys
+MAX_UPLOAD_PARTS = 10000
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_DELETE_KEYS = 1000
+
+
+@dataclass
+class PresignedUpload:
+    """
+    How a client uploads one object directly to S3.
+    
+    A single PUT to url with headers, or, when upload_id is set, one PUT
+    per entry of part_urls (part i covers bytes [(i-1)*part_size, i*part_size)).
+    """
+    s3_key: str
+    expires_in: int
+    url: Optional[str] = None
+    headers: dict = field(default_factory=dict)
+    upload_id: Optional[str] = None
+    part_size: Optional[int] = None
+    part_urls: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ObjectInfo:
+    """A stored object, as listed."""
+    key: str
+    size: int
+    last_modified: datetime
+
+
+@dataclass
+class DeletedObjects:
+    """Tally of deleted objects."""
+    count: int = 0
+    bytes: int = 0
+    
+    def add(self, *objects: ObjectInfo):
+        self.count += len(objects)
+        self.bytes += sum(obj.size for obj in objects)
+    
+    def __iadd__(self, other: "DeletedObjects") -> "DeletedObjects":
+        self.count += other.count
+        self.bytes += other.bytes
+        return self
+
+
 class S3Service:
     """Service for handling S3 operations using Repository pattern."""
     
     def __init__(self):
         self.settings = get_settings()
-        self.s3_client = boto3.client(
+        self.s3_client = self._client(self.settings.s3_endpoint_url)
+        # Presigned URLs must name a host the client can reach
+        if self.settings.s3_public_endpoint_url:
+            self.presign_client = self._client(self.settings.s3_public_endpoint_url)
+        else:
+            self.presign_client = self.s3_client
+        self.bucket_name = self.settings.s3_bucket_name
+        # Use absolute path for local storage
+        self.local_storage_base = Path(self.settings.local_storage_path)
+    
+    def _client(self, endpoint_url: Optional[str]):
+        """boto3 S3 client for AWS, or for an S3-compatible store at endpoint_url."""
+        config = None
+        if endpoint_url:
+            # MinIO/localstack buckets aren't DNS names
+            config = Config(signature_version="s3v4", s3={"addressing_style": "path"})
+        return boto3.client(
             's3',
             aws_access_key_id=self.settings.aws_access_key_id,
             aws_secret_access_key=self.settings.aws_secret_access_key,
-            region_name=self.settings.aws_region
+            region_name=self.settings.aws_region,
+            endpoint_url=endpoint_url,
+            config=config
         )
-        self.bucket_name = self.settings.s3_bucket_name
-        # Use absolute path for local storage
-        self.local_storage_base = Path(__file__).parent.parent.parent / "storage"
     
+    @traced("s3.upload_file")
     async def upload_file(
         self, 
         file_obj: BinaryIO, 
@@ -60,29 +177,191 @@ class S3Service:
             logger.error(f"Failed to upload file to S3: {e}")
             raise Exception(f"S3 upload failed: {str(e)}")
 
+    @traced("s3.upload_stream")
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        s3_key: str,
+        content_type: Optional[str] = None,
+        max_bytes: Optional[int] = None
+    ) -> StoredObject:
+        """
+        Stream an upload to S3 or local storage without buffering it whole.
+        
+        Chunks are regrouped into parts of settings.upload_chunk_size bytes and
+        sent as an S3 multipart upload, settings.upload_concurrency parts at a
+        time (a single put_object when the stream fits in one part). Size and
+        SHA-256 are computed on the way through.
+        
+        Args:
+            chunks: Async iterator over the body
+            s3_key: Destination key
+            content_type: MIME type of the object
+            max_bytes: Abort with UploadTooLargeError past this many bytes
+            
+        Returns:
+            StoredObject with key, size and hex SHA-256
+        """
+        digest = hashlib.sha256()
+        size = 0
+        
+        async def parts():
+            nonlocal size
+            buffer = bytearray()
+            async for chunk in chunks:
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                buffer += chunk
+                while len(buffer) >= self.settings.upload_chunk_size:
+                    yield bytes(buffer[:self.settings.upload_chunk_size])
+                    del buffer[:self.settings.upload_chunk_size]
+            if buffer or size == 0:
+                yield bytes(buffer)
+        
+        if self.settings.aws_access_key_id == "placeholder_access_key":
+            await self._write_local_stream(parts(), s3_key)
+        else:
+            await self._multipart_upload(parts(), s3_key, content_type)
+        
+        logger.info(f"Streamed {size} bytes to {s3_key}")
+        return StoredObject(s3_key=s3_key, size=size, sha256=digest.hexdigest())
+    
+    async def _write_local_stream(self, parts: AsyncIterator[bytes], s3_key: str):
+        """Dev Mode: write parts to local storage, replacing the file only when complete."""
+        local_path = self.local_storage_base / s3_key
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = local_path.with_name(local_path.name + ".part")
+        try:
+            with open(partial_path, "wb") as f:
+                async for part in parts:
+                    await asyncio.to_thread(f.write, part)
+            os.replace(partial_path, local_path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+    
+    async def _multipart_upload(self, parts: AsyncIterator[bytes], s3_key: str, content_type: Optional[str]):
+        """Upload parts as an S3 multipart upload, aborting it on any error."""
+        extra_args = {"ContentType": content_type} if content_type else {}
+        iterator = parts.__aiter__()
+        first = await iterator.__anext__()
+        try:
+            second = await iterator.__anext__()
+        except StopAsyncIteration:
+            # Fits in one part: a plain PUT is one request instead of three
+            await asyncio.to_thread(
+                self.s3_client.put_object, Bucket=self.bucket_name, Key=s3_key, Body=first, **extra_args
+            )
+            return
+        
+        upload_id = (await asyncio.to_thread(
+            self.s3_client.create_multipart_upload, Bucket=self.bucket_name, Key=s3_key, **extra_args
+        ))["UploadId"]
+        slots = asyncio.Semaphore(self.settings.upload_concurrency)
+        tasks = []
+        
+        async def upload_part(number: int, body: bytes) -> dict:
+            try:
+                response = await asyncio.to_thread(
+                    self.s3_client.upload_part,
+                    Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id, PartNumber=number, Body=body
+                )
+                return {"PartNumber": number, "ETag": response["ETag"]}
+            finally:
+                slots.release()
+        
+        async def schedule(number: int, body: bytes):
+            # Waiting for a slot before reading on keeps memory bounded
+            await slots.acquire()
+            tasks.append(asyncio.create_task(upload_part(number, body)))
+        
+        try:
+            await schedule(1, first)
+            await schedule(2, second)
+            number = 2
+            async for body in iterator:
+                number += 1
+                await schedule(number, body)
+            completed = await asyncio.gather(*tasks)
+            await asyncio.to_thread(
+                self.s3_client.complete_multipart_upload,
+                Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id,
+                MultipartUpload={"Parts": completed}
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.to_thread(self._abort_quietly, s3_key, upload_id)
+            raise
+
+    @traced("s3.promote")
+    async def promote(self, source_key: str, dest_key: str) -> bool:
+        """
+        Move an uploaded object to its content-addressed key.
+        
+        When dest_key already exists it holds the same content, so the
+        upload is just dropped.
+        
+        Returns:
+            True when an existing object was reused
+        """
+        exists = await asyncio.to_thread(self.file_exists, dest_key)
+        if not exists:
+            if self.settings.aws_access_key_id == "placeholder_access_key":
+                dest_path = self.local_storage_base / dest_key
+                dest_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(self.local_storage_base / source_key, dest_path)
+                return False
+            # Managed copy: server-side, multipart for objects over 5 GB
+            await asyncio.to_thread(
+                self.s3_client.copy,
+                {"Bucket": self.bucket_name, "Key": source_key}, self.bucket_name, dest_key
+            )
+        await self.delete_file(source_key)
+        logger.info(f"Stored {source_key} as {dest_key}{' (duplicate)' if exists else ''}")
+        return exists
+
+    def read_file(self, s3_key: str) -> Optional[bytes]:
+        """Contents of a (small) object, or None if it doesn't exist."""
+        if self.settings.aws_access_key_id == "placeholder_access_key":
+            try:
+                return (self.local_storage_base / s3_key).read_bytes()
+            except FileNotFoundError:
+                return None
+        try:
+            return self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)["Body"].read()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+
     async def download_file(self, s3_key: str, local_path: str) -> str:
         """Download a file from S3 or local storage."""
         try:
-            if self.settings.aws_access_key_id == "placeholder_access_key":
-                source_path = self.local_storage_base / s3_key
-                import shutil
-                shutil.copy2(source_path, local_path)
-                logger.info(f"Dev Mode: Copied file from local storage: {s3_key}")
-                return local_path
+            with time_stage("download"):
+                if self.settings.aws_access_key_id == "placeholder_access_key":
+                    source_path = self.local_storage_base / s3_key
+                    shutil.copy2(source_path, local_path)
+                    logger.info(f"Dev Mode: Copied file from local storage: {s3_key}")
+                    return local_path
 
-            self.s3_client.download_file(
-                self.bucket_name,
-                s3_key,
-                local_path
-            )
-            
-            logger.info(f"Successfully downloaded file from S3: {s3_key}")
-            return local_path
+                self.s3_client.download_file(
+                    self.bucket_name,
+                    s3_key,
+                    local_path
+                )
+                
+                logger.info(f"Successfully downloaded file from S3: {s3_key}")
+                return local_path
             
         except (ClientError, FileNotFoundError) as e:
             logger.error(f"Failed to download file: {e}")
             raise Exception(f"File download failed: {str(e)}")
 
+    @traced("s3.upload_file_from_path")
     async def upload_file_from_path(
         self, 
         local_path: str, 
@@ -94,7 +373,6 @@ class S3Service:
             if self.settings.aws_access_key_id == "placeholder_access_key":
                 dest_path = self.local_storage_base / s3_key
                 dest_path.parent.mkdir(parents=True, exist_ok=True)
-                import shutil
                 shutil.copy2(local_path, dest_path)
                 logger.info(f"Dev Mode: Saved file locally to {dest_path}")
                 return s3_key
@@ -117,6 +395,137 @@ class S3Service:
             logger.error(f"Failed to upload file to S3: {e}")
             raise Exception(f"S3 upload failed: {str(e)}")
 
+    def presign_upload(
+        self,
+        s3_key: str,
+        size: int,
+        sha256: str,
+        content_type: Optional[str] = None
+    ) -> PresignedUpload:
+        """
+        Presign a direct client upload of size bytes to s3_key.
+        
+        Objects up to settings.presigned_multipart_threshold get a single PUT
+        URL that signs the SHA-256 checksum, so S3 rejects any other content.
+        Larger objects get a multipart upload with one URL per part; their
+        content is checked by complete_direct_upload.
+        
+        Raises:
+            DirectUploadUnavailableError: in Dev Mode
+        """
+        if self.settings.aws_access_key_id == "placeholder_access_key":
+            raise DirectUploadUnavailableError("Direct uploads need S3 storage")
+        
+        expires_in = self.settings.presigned_upload_expiry
+        content_args = {"ContentType": content_type} if content_type else {}
+        
+        if size <= self.settings.presigned_multipart_threshold:
+            checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+            url = self.presign_client.generate_presigned_url(
+                "put_object",
+                Params={"Bucket": self.bucket_name, "Key": s3_key, "ChecksumSHA256": checksum, **content_args},
+                ExpiresIn=expires_in
+            )
+            headers = {"x-amz-checksum-sha256": checksum}
+            if content_type:
+                headers["Content-Type"] = content_type
+            return PresignedUpload(s3_key=s3_key, expires_in=expires_in, url=url, headers=headers)
+        
+        part_size = max(self.settings.upload_chunk_size, MIN_PART_SIZE, math.ceil(size / MAX_UPLOAD_PARTS))
+        upload_id = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name, Key=s3_key, **content_args
+        )["UploadId"]
+        part_urls = [
+            self.presign_client.generate_presigned_url(
+                "upload_part",
+                Params={"Bucket": self.bucket_name, "Key": s3_key, "UploadId": upload_id, "PartNumber": number},
+                ExpiresIn=expires_in
+            )
+            for number in range(1, math.ceil(size / part_size) + 1)
+        ]
+        logger.info(f"Presigned {len(part_urls)}-part upload of {s3_key}")
+        return PresignedUpload(
+            s3_key=s3_key, expires_in=expires_in,
+            upload_id=upload_id, part_size=part_size, part_urls=part_urls
+        )
+    
+    @traced("s3.complete_direct_upload")
+    async def complete_direct_upload(
+        self,
+        s3_key: str,
+        size: int,
+        sha256: str,
+        upload_id: Optional[str] = None
+    ) -> bool:
+        """
+        Finish a presigned upload and check it matches the declared size and SHA-256.
+        
+        Multipart uploads are completed from S3's own part list, then hashed
+        by reading the object back from S3 (single PUTs were checksummed by
+        S3 on write). A mismatching object is deleted.
+        
+        Returns:
+            True when the object is intact, False when it was rejected
+        """
+        if upload_id:
+            try:
+                parts = await asyncio.to_thread(self._list_parts, s3_key, upload_id)
+                await asyncio.to_thread(
+                    self.s3_client.complete_multipart_upload,
+                    Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id,
+                    MultipartUpload={"Parts": parts}
+                )
+            except ClientError as e:
+                logger.warning(f"Could not complete multipart upload of {s3_key}: {e}")
+                await asyncio.to_thread(self._abort_quietly, s3_key, upload_id)
+                return False
+        
+        try:
+            head = await asyncio.to_thread(
+                self.s3_client.head_object, Bucket=self.bucket_name, Key=s3_key, ChecksumMode="ENABLED"
+            )
+        except ClientError as e:
+            logger.warning(f"Direct upload {s3_key} not found: {e}")
+            return False
+        
+        intact = head["ContentLength"] == size
+        if intact:
+            expected = base64.b64encode(bytes.fromhex(sha256)).decode()
+            stored = head.get("ChecksumSHA256")
+            if stored and "-" not in stored:
+                intact = stored == expected
+            else:
+                # Multipart checksums are per part; hash the object itself
+                intact = await asyncio.to_thread(self._sha256_object, s3_key) == sha256
+        
+        if not intact:
+            logger.warning(f"Direct upload {s3_key} doesn't match its declared size/hash, deleting it")
+            await self.delete_file(s3_key)
+        return intact
+    
+    def _list_parts(self, s3_key: str, upload_id: str) -> list:
+        """Uploaded parts of a multipart upload, as complete_multipart_upload expects them."""
+        paginator = self.s3_client.get_paginator("list_parts")
+        return [
+            {"PartNumber": part["PartNumber"], "ETag": part["ETag"]}
+            for page in paginator.paginate(Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id)
+            for part in page.get("Parts", [])
+        ]
+    
+    def _abort_quietly(self, s3_key: str, upload_id: str):
+        try:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id)
+        except ClientError as e:
+            logger.error(f"Failed to abort multipart upload of {s3_key}: {e}")
+    
+    def _sha256_object(self, s3_key: str) -> str:
+        """Hex SHA-256 of an S3 object, read in upload_chunk_size pieces."""
+        digest = hashlib.sha256()
+        body = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)["Body"]
+        for chunk in body.iter_chunks(self.settings.upload_chunk_size):
+            digest.update(chunk)
+        return digest.hexdigest()
+
     def generate_presigned_url(
         self, 
         s3_key: str, 
@@ -126,6 +535,7 @@ class S3Service:
         # ALWAYS use backend proxy to avoid CORS with S3/iframes
         return f"{self.settings.backend_url}/api/v1/storage/{s3_key}"
 
+    @traced("s3.delete_file")
     async def delete_file(self, s3_key: str) -> bool:
         """Delete a file from S3 or local storage."""
         try:
@@ -135,7 +545,8 @@ class S3Service:
                     local_path.unlink()
                 return True
 
-            self.s3_client.delete_object(
+            await asyncio.to_thread(
+                self.s3_client.delete_object,
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
@@ -147,6 +558,135 @@ class S3Service:
             logger.error(f"Failed to delete file: {e}")
             raise Exception(f"S3 delete failed: {str(e)}")
 
+    @traced("s3.delete_prefix")
+    def delete_prefix(self, prefix: str) -> DeletedObjects:
+        """
+        Delete every object under a prefix ("folder").
+        
+        Keys are listed 1,000 at a time and each page is removed with one
+        delete_objects call. The prefix must end with "/" so that, e.g.,
+        htmls/abc/ can't match htmls/abcd/.
+        
+        Returns:
+            DeletedObjects with the number and total size of deleted objects
+        """
+        if not prefix.endswith("/"):
+            raise ValueError(f"Prefix must end with '/': {prefix}")
+        
+        deleted = DeletedObjects()
+        if self.settings.aws_access_key_id == "placeholder_access_key":
+            folder_path = self.local_storage_base / prefix
+            if folder_path.is_dir():
+                for obj in self.iter_objects(prefix):
+                    deleted.add(obj)
+                shutil.rmtree(folder_path)
+            return deleted
+        
+        page = []
+        for obj in self.iter_objects(prefix):
+            page.append(obj)
+            if len(page) == MAX_DELETE_KEYS:
+                self.delete_keys([o.key for o in page])
+                deleted.add(*page)
+                page = []
+        if page:
+            self.delete_keys([o.key for o in page])
+            deleted.add(*page)
+        
+        logger.info(f"Deleted {deleted.count} objects ({deleted.bytes} bytes) under {prefix}")
+        return deleted
+    
+    def delete_keys(self, keys: List[str]):
+        """Delete objects, MAX_DELETE_KEYS per request."""
+        if self.settings.aws_access_key_id == "placeholder_access_key":
+            for key in keys:
+                (self.local_storage_base / key).unlink(missing_ok=True)
+            return
+        
+        for start in range(0, len(keys), MAX_DELETE_KEYS):
+            batch = keys[start:start + MAX_DELETE_KEYS]
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+            )
+            errors = response.get("Errors", [])
+            if errors:
+                raise Exception(
+                    f"S3 delete failed for {len(errors)} of {len(batch)} objects, "
+                    f"e.g. {errors[0].get('Key')}: {errors[0].get('Message')}"
+                )
+    
+    def iter_objects(self, prefix: str) -> Iterator[ObjectInfo]:
+        """Every object under a prefix, listed lazily (1,000 per S3 request)."""
+        if self.settings.aws_access_key_id == "placeholder_access_key":
+            folder_path = self.local_storage_base / prefix
+            if not folder_path.is_dir():
+                return
+            for path in folder_path.rglob("*"):
+                if path.is_file():
+                    stat = path.stat()
+                    yield ObjectInfo(
+                        key=path.relative_to(self.local_storage_base).as_posix(),
+                        size=stat.st_size,
+                        last_modified=datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+                    )
+            return
+        
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=self.bucket_name, Prefix=prefix, PaginationConfig={"PageSize": MAX_DELETE_KEYS}
+        ):
+            for obj in page.get("Contents", []):
+                yield ObjectInfo(key=obj["Key"], size=obj["Size"], last_modified=obj["LastModified"])
+    
+    def get_object_info(self, s3_key: str) -> Optional[ObjectInfo]:
+        """Size and modification time of an object, or None if it doesn't exist."""
+        if self.settings.aws_access_key_id == "placeholder_access_key":
+            try:
+                stat = (self.local_storage_base / s3_key).stat()
+            except FileNotFoundError:
+                return None
+            return ObjectInfo(
+                key=s3_key, size=stat.st_size, last_modified=datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+            )
+        try:
+            head = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        return ObjectInfo(key=s3_key, size=head["ContentLength"], last_modified=head["LastModified"])
+    
+    def list_folders(self, prefix: str) -> List[str]:
+        """Names of the "folders" directly under a prefix (e.g. job IDs under htmls/)."""
+        if self.settings.aws_access_key_id == "placeholder_access_key":
+            folder_path = self.local_storage_base / prefix
+            if not folder_path.is_dir():
+                return []
+            return [path.name for path in folder_path.iterdir() if path.is_dir()]
+        
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        return [
+            common["Prefix"][len(prefix):].rstrip("/")
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, Delimiter="/")
+            for common in page.get("CommonPrefixes", [])
+        ]
+    
+    def abort_stale_multipart_uploads(self, prefix: str, started_before: datetime) -> int:
+        """Abort multipart uploads under a prefix started before a time; returns how many."""
+        if self.settings.aws_access_key_id == "placeholder_access_key":
+            return 0
+        
+        aborted = 0
+        paginator = self.s3_client.get_paginator("list_multipart_uploads")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for upload in page.get("Uploads", []):
+                if upload["Initiated"] < started_before:
+                    self._abort_quietly(upload["Key"], upload["UploadId"])
+                    aborted += 1
+        return aborted
+
+    @traced("s3.file_exists")
     def file_exists(self, s3_key: str) -> bool:
         """Check if a file exists in S3 or local storage."""
         if self.settings.aws_access_key_id == "placeholder_access_key":
@@ -161,6 +701,7 @@ class S3Service:
         except ClientError:
             return False
 
+    @traced("s3.list_files")
     def list_files(self, prefix: str) -> list[str]:
         """List all files under a given prefix in S3 or local storage."""
         try:
@@ -1,35 +1,54 @@
 """Celery tasks for HTML generation and PPT/PDF conversion."""
 from app.celery_app import celery_app
+from app.core.config import get_settings
 from app.core.database import SessionLocal
 from app.repositories.job_repository import JobRepository
 from app.repositories.slide_repository import SlideRepository
 from app.services.s3_service import S3Service
-from app.services.ppt_service import PPTService
-from app.models.job import JobStatus
+from app.services.admission_service import CELERY_PRIORITIES
+from app.services.eta_service import ALL_JOBS
+from app.services.ppt_service import OUTPUT_CONTENT_TYPES, PPTService, metric_labels, output_file_key
+from app.models.job import CANCELLED_MESSAGE, JobStatus
+from app.core.cancellation import CancellationToken, JobCancelled
+from app.core.job_stats import record_duration
+from app.core.metrics import job_labels, observe_queue_wait, time_stage
+from app.core.profiling import JobProfiler
+from app.core.tempfiles import temp_directory
 import os
 import sys
-import tempfile
 import logging
 from pathlib import Path
 import asyncio
 import json
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from celery.exceptions import Retry
 
 # Add backend root to path (where generate_ppt.py is now located)
 current_file = Path(__file__).resolve()
 backend_root = current_file.parent.parent.parent
 sys.path.insert(0, str(backend_root))
 
-from generate_ppt import convert_to_pdf, convert_to_pptx
+from generate_ppt import GenerationCancelled, convert_to_pdf, convert_to_pptx
 
 logger = logging.getLogger(__name__)
 
 
+def job_cancel_token(job_repo: JobRepository, job_id: str) -> CancellationToken:
+    """Cancellation check for a job; reads the database while Redis is unavailable."""
+    return CancellationToken(job_id, fallback=lambda: job_repo.is_cancelled(job_id))
+
+
 @celery_app.task(bind=True, name='app.tasks.conversion_tasks.generate_html_and_convert')
 def generate_html_and_convert_task(self, job_id: str):
     """
     Complete PPT generation: HTML slides + conversion to PPT/PDF.
     This runs the entire pipeline asynchronously.
     
+    Stops within about a second of the job being cancelled (see
+    app.core.cancellation), including during an LLM request.
+    
     Args:
         job_id: ID of the PPT generation job
     """
@@ -44,27 +63,69 @@ def generate_html_and_convert_task(self, job_id: str):
             logger.error(f"Job not found: {job_id}")
             return
         
-        # Parse config
-        config = json.loads(job.config_json)
-        output_format = config.get("output_format", "pdf")
-        
-        # Step 1: Generate HTML slides
-        logger.info(f"Starting HTML generation for job {job_id}")
-        ppt_service = PPTService(s3_service, job_repo, slide_repo)
+        cancel_token = job_cancel_token(job_repo, job_id)
+        if cancel_token.is_cancelled():
+            logger.info(f"Job {job_id} was cancelled before it started")
+            return
         
-        html_folder_s3_key, total_slides = asyncio.run(
-            ppt_service.generate_html_slides(
-                job_id,
-                job.input_s3_key,
-                config
+        if _over_running_limit(self, job_repo, job):
+            logger.info(f"User {job.user_id} has too many jobs running, requeueing job {job_id}")
+            raise self.retry(
+                countdown=get_settings().job_requeue_delay,
+                max_retries=None,
+                priority=CELERY_PRIORITIES[job.priority]
             )
-        )
         
-        logger.info(f"HTML generation complete for job {job_id}, starting conversion...")
+        # Parse config
+        config = json.loads(job.config_json)
+        output_format = config.get("output_format", "pdf")
+        profiler = JobProfiler(job_id, enabled=config.get("profile", False))
         
-        # Step 2: Convert HTML to PPT/PDF
-        convert_html_to_ppt_task(job_id, html_folder_s3_key, output_format)
+        observe_queue_wait(job.priority.value, _seconds_since(job.created_at))
+        started = time.perf_counter()
         
+        with job_labels(**metric_labels(config)):
+            # Step 1: Generate HTML slides
+            logger.info(f"Starting HTML generation for job {job_id}")
+            ppt_service = PPTService(s3_service, job_repo, slide_repo)
+            
+            try:
+                with profiler.section("html_generation"):
+                    html_folder_s3_key, total_slides, output_s3_key = asyncio.run(
+                        ppt_service.generate_html_slides(
+                            job_id,
+                            job.input_s3_key,
+                            config,
+                            input_sha256=job.input_sha256,
+                            cancel_token=cancel_token
+                        )
+                    )
+            finally:
+                asyncio.run(profiler.upload(s3_service))
+            
+            if output_s3_key:
+                # The deck was built while the slides were generated
+                cancel_token.raise_if_cancelled()
+                if not job_repo.complete_job(job_id, output_s3_key):
+                    raise JobCancelled(f"Job {job_id} was cancelled")
+                logger.info(f"Job {job_id} completed successfully")
+            else:
+                logger.info(f"HTML generation complete for job {job_id}, starting conversion...")
+                
+                # Step 2: Convert HTML to PPT/PDF
+                output_s3_key = convert_html_to_ppt_task(
+                    job_id, html_folder_s3_key, output_format, cancel_token=cancel_token
+                )
+            if output_s3_key:
+                record_duration("job", ALL_JOBS, time.perf_counter() - started)
+    
+    except (JobCancelled, GenerationCancelled):
+        # The job already carries its cancelled status
+        logger.info(f"Job {job_id} was cancelled, stopped generation")
+    
+    except Retry:
+        raise
+    
     except Exception as e:
         logger.error(f"Job {job_id} failed during HTML generation: {str(e)}", exc_info=True)
         job_repo.update_job_status(job_id, JobStatus.FAILED, error_message=str(e))
@@ -73,16 +134,49 @@ def generate_html_and_convert_task(self, job_id: str):
         db.close()
 
 
+def _seconds_since(moment: datetime) -> float:
+    """Seconds elapsed since a database timestamp (naive ones are UTC, e.g. on SQLite)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - moment).total_seconds()
+
+
+def _over_running_limit(task, job_repo: JobRepository, job) -> bool:
+    """
+    Whether the job's owner already has settings.max_running_jobs_per_user
+    jobs processing. Approximate: workers starting jobs of the same user at
+    the same moment may both pass. Inline runs (eager mode, direct calls)
+    can't be requeued and are never held back.
+    """
+    limit = get_settings().max_running_jobs_per_user
+    if limit <= 0 or not job.user_id or task.request.is_eager or task.request.called_directly:
+        return False
+    # A redelivered job may already be processing itself
+    return job_repo.count_running_jobs(job.user_id, exclude_job_id=job.id) >= limit
+
+
 @celery_app.task(bind=True, name='app.tasks.conversion_tasks.convert_html_to_ppt')
-def convert_html_to_ppt_task(self, job_id: str, html_folder_s3_key: str, output_format: str):
+def convert_html_to_ppt_task(
+    self,
+    job_id: str,
+    html_folder_s3_key: str,
+    output_format: str,
+    cancel_token: Optional[CancellationToken] = None
+):
     """
     Celery task to convert HTML slides to PPT/PDF.
     This is the only memory-heavy operation that needs queuing.
     
+    Cancellation is checked before each step and each converted slide.
+    
     Args:
         job_id: ID of the PPT generation job
         html_folder_s3_key: S3 key prefix for HTML files folder
         output_format: Output format (pdf or pptx)
+        cancel_token: Cancellation check of the calling task (when run inline)
+    
+    Returns:
+        S3 key of the output file, or None if the job was not completed
     """
     db = SessionLocal()
     job_repo = JobRepository(db)
@@ -95,91 +189,106 @@ def convert_html_to_ppt_task(self, job_id: str, html_folder_s3_key: str, output_
             return
         
         # Check if job was cancelled
-        if job.status == JobStatus.FAILED and job.error_message == "Cancelled by user":
+        if job.status == JobStatus.FAILED and job.error_message == CANCELLED_MESSAGE:
             logger.info(f"Job {job_id} was cancelled, skipping conversion")
             return
         
-        logger.info(f"Starting HTML to {output_format.upper()} conversion for job {job_id}")
+        config = json.loads(job.config_json)
+        profiler = JobProfiler(job_id, enabled=config.get("profile", False))
+        cancel_token = cancel_token or job_cancel_token(job_repo, job_id)
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            html_path = temp_path / "htmls"
-            output_path = temp_path / "output"
-            html_path.mkdir(exist_ok=True)
-            output_path.mkdir(exist_ok=True)
-            
-            # Download all HTML files from S3
-            logger.info(f"Downloading HTML files from {html_folder_s3_key}")
-            await_download = asyncio.run(
-                s3_service.download_file(f"{html_folder_s3_key}/slide_1.html", str(html_path / "slide_1.html"))
-            )
+        with job_labels(**metric_labels(config)):
+            logger.info(f"Starting HTML to {output_format.upper()} conversion for job {job_id}")
             
-            # Download all slides (assuming sequential numbering)
-            slide_num = 1
-            while True:
-                try:
-                    slide_file = f"slide_{slide_num}.html"
-                    s3_key = f"{html_folder_s3_key}/{slide_file}"
-                    local_file = html_path / slide_file
-                    
-                    if not s3_service.file_exists(s3_key):
-                        break
-                    
-                    asyncio.run(s3_service.download_file(s3_key, str(local_file)))
-                    logger.info(f"Downloaded {slide_file}")
-                    slide_num += 1
-                except Exception as e:
-                    logger.warning(f"Stopped downloading at slide {slide_num}: {e}")
-                    break
-            
-            # Prepare config for conversion
-            ppt_config = {
-                "output": {
-                    "format": output_format,
-                    "file_name": f"presentation_{job_id}",
-                    "folder": str(output_path)
-                },
-                "slides": {
-                    "width": 1280,
-                    "height": 720
-                }
-            }
-            
-            # Convert HTML to output format
-            logger.info(f"Converting HTMLs to {output_format.upper()}...")
-            original_dir = os.getcwd()
-            os.chdir(temp_path)
-            
-            try:
-                if output_format == "pdf":
-                    output_file = convert_to_pdf(html_path, ppt_config)
-                else:
-                    output_file = convert_to_pptx(html_path, ppt_config)
-                
-                if not output_file or not Path(output_file).exists():
-                    raise Exception("Failed to generate output file")
+            with temp_directory() as temp_dir:
+                temp_path = Path(temp_dir)
+                html_path = temp_path / "htmls"
+                output_path = temp_path / "output"
+                html_path.mkdir(exist_ok=True)
+                output_path.mkdir(exist_ok=True)
                 
-                # Upload output file to S3
-                logger.info("Uploading output file to S3...")
-                output_s3_key = f"ppt-yash-proj/outputs/{job_id}/{Path(output_file).name}"
-                
-                content_type = "application/pdf" if output_format == "pdf" else \
-                    "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+                # Download all HTML files from S3
+                logger.info(f"Downloading HTML files from {html_folder_s3_key}")
+                await_download = asyncio.run(
+                    s3_service.download_file(f"{html_folder_s3_key}/slide_1.html", str(html_path / "slide_1.html"))
+                )
                 
-                asyncio.run(s3_service.upload_file_from_path(
-                    str(output_file),
-                    output_s3_key,
-                    content_type=content_type
-                ))
+                # Download all slides (assuming sequential numbering)
+                slide_num = 1
+                while True:
+                    cancel_token.raise_if_cancelled()
+                    try:
+                        slide_file = f"slide_{slide_num}.html"
+                        s3_key = f"{html_folder_s3_key}/{slide_file}"
+                        local_file = html_path / slide_file
+                        
+                        if not s3_service.file_exists(s3_key):
+                            break
+                        
+                        asyncio.run(s3_service.download_file(s3_key, str(local_file)))
+                        logger.info(f"Downloaded {slide_file}")
+                        slide_num += 1
+                    except Exception as e:
+                        logger.warning(f"Stopped downloading at slide {slide_num}: {e}")
+                        break
                 
-                # Update job with output S3 key
-                job_repo.set_output_s3_key(job_id, output_s3_key)
-                job_repo.update_job_status(job_id, JobStatus.COMPLETED)
+                # Prepare config for conversion
+                ppt_config = {
+                    "output": {
+                        "format": output_format,
+                        "file_name": f"presentation_{job_id}",
+                        "folder": str(output_path)
+                    },
+                    "slides": {
+                        "width": 1280,
+                        "height": 720
+                    },
+                    "should_abort": cancel_token
+                }
                 
-                logger.info(f"Job {job_id} completed successfully")
+                # Convert HTML to output format
+                logger.info(f"Converting HTMLs to {output_format.upper()}...")
+                original_dir = os.getcwd()
+                os.chdir(temp_path)
                 
-            finally:
-                os.chdir(original_dir)
+                try:
+                    conversion_started = time.perf_counter()
+                    with time_stage("conversion"), profiler.section("conversion"):
+                        if output_format == "pdf":
+                            output_file = convert_to_pdf(html_path, ppt_config)
+                        else:
+                            output_file = convert_to_pptx(html_path, ppt_config)
+                    record_duration("conversion", output_format, time.perf_counter() - conversion_started)
+                    
+                    if not output_file or not Path(output_file).exists():
+                        raise Exception("Failed to generate output file")
+                    
+                    # Upload output file to S3
+                    cancel_token.raise_if_cancelled()
+                    logger.info("Uploading output file to S3...")
+                    output_s3_key = output_file_key(job_id, Path(output_file).name)
+                    
+                    asyncio.run(s3_service.upload_file_from_path(
+                        str(output_file),
+                        output_s3_key,
+                        content_type=OUTPUT_CONTENT_TYPES["pdf" if output_format == "pdf" else "pptx"]
+                    ))
+                    
+                    # Update job with output S3 key (unless cancelled during the upload:
+                    # the token may answer from a cached check, the UPDATE does not)
+                    cancel_token.raise_if_cancelled()
+                    if not job_repo.complete_job(job_id, output_s3_key):
+                        raise JobCancelled(f"Job {job_id} was cancelled")
+                    
+                    logger.info(f"Job {job_id} completed successfully")
+                    return output_s3_key
+                    
+                finally:
+                    os.chdir(original_dir)
+                    asyncio.run(profiler.upload(s3_service))
+    
+    except (JobCancelled, GenerationCancelled):
+        logger.info(f"Job {job_id} was cancelled, stopped conversion")
     
     except Exception as e:
         logger.error(f"Job {job_id} conversion failed: {str(e)}", exc_info=True)
@@ -220,17 +329,15 @@ def regenerate_slides_task(self, job_id: str, slide_numbers: list, instructions:
         
         logger.info(f"Regenerating slides {slide_numbers} for job {job_id}")
         
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with temp_directory() as temp_dir:
             temp_path = Path(temp_dir)
             input_path = temp_path / "input"
             output_path = temp_path / "output"
             input_path.mkdir(exist_ok=True)
             output_path.mkdir(exist_ok=True)
             
-            # Download input file
             file_ext = Path(job.input_s3_key).suffix
             input_file = input_path / f"input_file{file_ext}"
-            asyncio.run(s3_service.download_file(job.input_s3_key, str(input_file)))
             
             # Prepare config for PPT service
             ppt_service = PPTService(s3_service, job_repo, slide_repo)
@@ -249,15 +356,18 @@ def regenerate_slides_task(self, job_id: str, slide_numbers: list, instructions:
                 
                 # Load content
                 from generate_ppt import (
-                    load_source_content,
                     distribute_content_to_slides,
                     generate_content_slide_html,
                     save_html_slide,
-                    get_instructions
+                    get_instructions,
+                    build_content_prompt_template
                 )
                 
                 instructions_text = get_instructions()
-                pages = load_source_content(ppt_config)
+                prompt_template = build_content_prompt_template(ppt_config, instructions_text)
+                pages = asyncio.run(ppt_service.load_source_pages(
+                    job.input_s3_key, job.input_sha256, ppt_config, input_file
+                ))
                 num_slides = ppt_config["slides"]["number_of_slides"]
                 slides_content = distribute_content_to_slides(pages, num_slides)
                 
@@ -282,7 +392,8 @@ def regenerate_slides_task(self, job_id: str, slide_numbers: list, instructions:
                         slide_num,
                         total_slides,
                         ppt_config,
-                        instructions_text
+                        instructions_text,
+                        prompt_template=prompt_template
                     )
                     
                     # Save locally
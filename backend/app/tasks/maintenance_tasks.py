@@ -0,0 +1,278 @@
+"""Celery tasks for storage cleanup."""
+from app.celery_app import celery_app
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.metrics import record_storage_reclaimed
+from app.core.tempfiles import sweep_temp
+from app.repositories.input_repository import InputRepository
+from app.repositories.job_repository import JobRepository
+from app.services.ppt_service import EXTRACTION_CACHE_PREFIX, extraction_cache_sha256
+from app.services.s3_service import DeletedObjects, INPUTS_PREFIX, ObjectInfo, S3Service, UPLOADS_PREFIX, input_sha256
+from app.models.job import JobStatus
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Storage "folders" named after job IDs
+JOB_FOLDER_PREFIXES = ("ppt-yash-proj/htmls/", "ppt-yash-proj/outputs/")
+
+# IDs / keys checked against the database per query
+GC_QUERY_BATCH = 500
+
+
+def job_storage_prefixes(job_id: str) -> List[str]:
+    """Storage prefixes holding a job's files (HTML slides; outputs and profiles)."""
+    return [f"{prefix}{job_id}/" for prefix in JOB_FOLDER_PREFIXES]
+
+
+def delete_job_files(
+    s3_service: S3Service,
+    job_repo: JobRepository,
+    input_repo: InputRepository,
+    job_id: str,
+    input_s3_key: Optional[str]
+) -> DeletedObjects:
+    """
+    Delete the files of a job whose row is gone: everything under its
+    prefixes, and its input unless another job still uses it (inputs are
+    shared by content hash) or it was uploaded within the grace period,
+    i.e. is about to be used by a new job. Such inputs are left to the
+    periodic storage GC.
+    """
+    deleted = DeletedObjects()
+    for prefix in job_storage_prefixes(job_id):
+        deleted += s3_service.delete_prefix(prefix)
+    
+    # Checked now rather than when the job was deleted: the input may have been reused since
+    if input_s3_key:
+        info = s3_service.get_object_info(input_s3_key)
+        if info:
+            deleted += _delete_if_unused(s3_service, job_repo, input_repo, [info], input_grace_cutoff())
+    return deleted
+
+
+def input_grace_cutoff() -> datetime:
+    """Inputs stored or uploaded after this time are kept even when no job uses them."""
+    return datetime.now(timezone.utc) - timedelta(hours=get_settings().storage_gc_grace_hours)
+
+
+def _delete_if_unused(
+    s3_service: S3Service,
+    job_repo: JobRepository,
+    input_repo: InputRepository,
+    inputs: List[ObjectInfo],
+    cutoff: datetime
+) -> DeletedObjects:
+    """
+    Delete the inputs no job uses that were neither stored nor uploaded
+    after cutoff, with their upload records. Dedup hits keep the stored
+    object (and its LastModified) untouched, so the upload records tell
+    when an input was last uploaded.
+    """
+    candidates = [obj for obj in inputs if obj.last_modified < cutoff]
+    if not candidates:
+        return DeletedObjects()
+    keys = [obj.key for obj in candidates]
+    keep = job_repo.referenced_inputs(keys) | input_repo.recently_uploaded(keys, cutoff)
+    unused = [obj for obj in candidates if obj.key not in keep]
+    
+    deleted = DeletedObjects()
+    if unused:
+        s3_service.delete_keys([obj.key for obj in unused])
+        input_repo.delete_uploads([obj.key for obj in unused])
+        deleted.add(*unused)
+    return deleted
+
+
+@celery_app.task(
+    bind=True,
+    name='app.tasks.maintenance_tasks.delete_job_storage',
+    max_retries=5,
+    default_retry_delay=60
+)
+def delete_job_storage_task(self, job_id: str, input_s3_key: Optional[str] = None):
+    """
+    Delete the stored files of a deleted job (see delete_job_files).
+    
+    Safe to repeat, so failures are retried.
+    
+    Args:
+        job_id: ID of the deleted job
+        input_s3_key: S3 key of the job's input file
+    """
+    s3_service = S3Service()
+    db = SessionLocal()
+    
+    try:
+        deleted = delete_job_files(s3_service, JobRepository(db), InputRepository(db), job_id, input_s3_key)
+        record_storage_reclaimed("job_deleted", deleted.count, deleted.bytes)
+        logger.info(f"Deleted {deleted.count} stored files ({deleted.bytes} bytes) of job {job_id}")
+        return deleted.count
+    
+    except Exception as e:
+        logger.error(f"Failed to delete storage of job {job_id}: {str(e)}", exc_info=True)
+        raise self.retry(exc=e)
+    
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name='app.tasks.maintenance_tasks.collect_storage_garbage')
+def collect_storage_garbage_task(self):
+    """
+    Periodic storage GC (scheduled by Celery beat every settings.storage_gc_interval).
+    
+    1. Retention: deletes completed, failed and cancelled jobs older than
+       their retention setting, with their files (slide rows cascade).
+    2. Orphans: deletes job folders (htmls/, outputs/) without a job row,
+       left by failed deletions or by workers still writing after a delete.
+    3. Unused inputs not (re-)uploaded within the grace period, and
+       abandoned uploads older than it, including unfinished multipart
+       uploads.
+    4. Extraction cache entries whose input is no longer stored, of older
+       cache versions, or older than settings.extraction_cache_ttl_days.
+    5. This worker's stale temp files and directories.
+    
+    Each step runs even if an earlier one failed. Deleted objects and
+    reclaimed bytes are counted per reason in the storage metrics.
+    
+    Returns:
+        Objects deleted per step
+    """
+    settings = get_settings()
+    s3_service = S3Service()
+    db = SessionLocal()
+    job_repo = JobRepository(db)
+    input_repo = InputRepository(db)
+    now = datetime.now(timezone.utc)
+    grace_cutoff = input_grace_cutoff()
+    summary: Dict[str, int] = {}
+    
+    steps = [
+        ("retention", lambda: _apply_retention(s3_service, job_repo, input_repo, now)),
+        ("orphaned_job", lambda: _delete_orphaned_job_folders(s3_service, job_repo)),
+        ("unused_input", lambda: _delete_unused_inputs(s3_service, job_repo, input_repo, grace_cutoff)),
+        ("stale_upload", lambda: _delete_stale_uploads(s3_service, grace_cutoff)),
+        ("extraction_cache", lambda: _delete_stale_extractions(s3_service, now)),
+        ("temp", lambda: _sweep_temp(settings.temp_max_age_hours)),
+    ]
+    try:
+        for reason, step in steps:
+            try:
+                deleted = step()
+            except Exception as e:
+                logger.error(f"Storage GC step {reason} failed: {str(e)}", exc_info=True)
+                db.rollback()
+                continue
+            record_storage_reclaimed(reason, deleted.count, deleted.bytes)
+            summary[reason] = deleted.count
+        
+        logger.info(f"Storage GC finished: {summary}")
+        return summary
+    
+    finally:
+        db.close()
+
+
+def _apply_retention(
+    s3_service: S3Service,
+    job_repo: JobRepository,
+    input_repo: InputRepository,
+    now: datetime
+) -> DeletedObjects:
+    """Delete jobs past their retention, at most settings.storage_gc_batch_size per run."""
+    settings = get_settings()
+    policies = [
+        (JobStatus.COMPLETED, None, settings.retention_completed_days),
+        (JobStatus.FAILED, False, settings.retention_failed_days),
+        (JobStatus.FAILED, True, settings.retention_cancelled_days),
+    ]
+    deleted = DeletedObjects()
+    budget = settings.storage_gc_batch_size
+    
+    for status, cancelled, days in policies:
+        if days <= 0 or budget <= 0:
+            continue
+        jobs = job_repo.list_finished_jobs(status, now - timedelta(days=days), budget, cancelled=cancelled)
+        for job in jobs:
+            job_id, input_s3_key = job.id, job.input_s3_key
+            job_repo.delete_job(job_id)
+            deleted += delete_job_files(s3_service, job_repo, input_repo, job_id, input_s3_key)
+        budget -= len(jobs)
+        if jobs:
+            logger.info(f"Retention deleted {len(jobs)} {'cancelled' if cancelled else status.value} jobs")
+    return deleted
+
+
+def _delete_orphaned_job_folders(s3_service: S3Service, job_repo: JobRepository) -> DeletedObjects:
+    """Delete job folders whose job no longer exists."""
+    deleted = DeletedObjects()
+    for base in JOB_FOLDER_PREFIXES:
+        folders = s3_service.list_folders(base)
+        for start in range(0, len(folders), GC_QUERY_BATCH):
+            batch = folders[start:start + GC_QUERY_BATCH]
+            existing = job_repo.existing_job_ids(batch)
+            for job_id in batch:
+                if job_id not in existing:
+                    deleted += s3_service.delete_prefix(f"{base}{job_id}/")
+    return deleted
+
+
+def _delete_unused_inputs(
+    s3_service: S3Service,
+    job_repo: JobRepository,
+    input_repo: InputRepository,
+    cutoff: datetime
+) -> DeletedObjects:
+    """Delete input files that no job uses and nobody uploaded since cutoff."""
+    deleted = DeletedObjects()
+    candidates = []
+    for obj in s3_service.iter_objects(f"{INPUTS_PREFIX}/"):
+        if obj.last_modified < cutoff:
+            candidates.append(obj)
+            if len(candidates) == GC_QUERY_BATCH:
+                deleted += _delete_if_unused(s3_service, job_repo, input_repo, candidates, cutoff)
+                candidates = []
+    if candidates:
+        deleted += _delete_if_unused(s3_service, job_repo, input_repo, candidates, cutoff)
+    return deleted
+
+
+def _delete_stale_uploads(s3_service: S3Service, cutoff: datetime) -> DeletedObjects:
+    """Delete uploads never completed (staging objects and multipart uploads) older than cutoff."""
+    stale = [obj for obj in s3_service.iter_objects(f"{UPLOADS_PREFIX}/") if obj.last_modified < cutoff]
+    s3_service.delete_keys([obj.key for obj in stale])
+    aborted = s3_service.abort_stale_multipart_uploads(f"{UPLOADS_PREFIX}/", cutoff)
+    if aborted:
+        logger.info(f"Aborted {aborted} unfinished multipart uploads")
+    
+    deleted = DeletedObjects()
+    deleted.add(*stale)
+    return deleted
+
+
+def _delete_stale_extractions(s3_service: S3Service, now: datetime) -> DeletedObjects:
+    """Delete extraction cache entries of deleted inputs, older cache versions or past the TTL."""
+    ttl_days = get_settings().extraction_cache_ttl_days
+    expired_before = now - timedelta(days=ttl_days) if ttl_days > 0 else None
+    # Runs after the unused inputs step, so inputs deleted by it count as gone
+    stored = {input_sha256(obj.key) for obj in s3_service.iter_objects(f"{INPUTS_PREFIX}/")}
+    
+    stale = []
+    for obj in s3_service.iter_objects(EXTRACTION_CACHE_PREFIX):
+        sha256 = extraction_cache_sha256(obj.key)
+        if sha256 is None or sha256 not in stored or (expired_before and obj.last_modified < expired_before):
+            stale.append(obj)
+    s3_service.delete_keys([obj.key for obj in stale])
+    
+    deleted = DeletedObjects()
+    deleted.add(*stale)
+    return deleted
+
+
+def _sweep_temp(max_age_hours: float) -> DeletedObjects:
+    """Remove this machine's stale temp files and directories."""
+    count, size = sweep_temp(max_age_hours * 3600)
+    return DeletedObjects(count=count, bytes=size)
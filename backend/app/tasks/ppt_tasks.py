@@ -3,9 +3,9 @@ from app.core.database import SessionLocal
 from app.repositories.job_repository import JobRepository
 from app.services.s3_service import S3Service
 from app.models.job import JobStatus
+from app.core.tempfiles import temp_directory
 import os
 import sys
-import tempfile
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -26,7 +26,8 @@ from generate_ppt import (
     save_html_slide,
     convert_to_pdf,
     convert_to_pptx,
-    get_instructions
+    get_instructions,
+    build_content_prompt_template
 )
 
 logger = logging.getLogger(__name__)
@@ -60,7 +61,7 @@ def generate_ppt_task(self, job_id: str):
         config = json.loads(job.config_json)
         
         # Create temporary working directory
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with temp_directory() as temp_dir:
             temp_path = Path(temp_dir)
             input_path = temp_path / "input"
             output_path = temp_path / "output"
@@ -169,6 +170,9 @@ def generate_ppt_task(self, job_id: str):
                 total_slides = len(slides_content) + 2  # +2 for title and ending
                 job_repo.update_job_progress(job_id, 0, total_slides)
                 
+                # Render the static part of the content prompt once per job
+                prompt_template = build_content_prompt_template(ppt_config, instructions)
+                
                 # Generate slides
                 slide_number = 1
                 
@@ -188,7 +192,8 @@ def generate_ppt_task(self, job_id: str):
                         slide_number,
                         total_slides,
                         ppt_config,
-                        instructions
+                        instructions,
+                        prompt_template=prompt_template
                     )
                     save_html_slide(html, slide_number, output_path)
                     slide_number += 1
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: HTML to PPTX slide conversion for a 100-slide deck.
+
+Compares the previous converter (BeautifulSoup's html.parser, style strings
+re-split and regexes recompiled per element) with PptxDeckBuilder using the
+postprocess.slide_parser backends: the BeautifulSoup fallback and lxml.
+"parse" times reading the slides only; "build" adds the python-pptx shapes.
+
+Usage:
+    python benchmarks/bench_pptx_convert.py [--slides 100] [--repeat 5]
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_ppt import PptxDeckBuilder
+from postprocess import slide_parser
+
+CONFIG = {"output": {"file_name": "bench", "format": "pptx"}}
+
+
+def make_slides(count):
+    """Slides shaped like the generated ones: a title, a bar, cards with nested markup, a footer."""
+    slides = []
+    for number in range(1, count + 1):
+        cards = "".join(
+            f'<div style="position:absolute; left:{60 + col * 400}px; top:{140 + row * 250}px; width:360px; '
+            f'height:220px; background-color:#F4F6F9; border-left:4px solid #0066CC; padding:16px; '
+            f'font-size:14px; color:#333333;"><h3 style="font-size:18px; color:#004080; margin:0;">'
+            f'Insight {row * 3 + col + 1}</h3><ul style="margin:8px 0; padding-left:18px;">'
+            + "".join(f"<li>Revenue grew <b>{n * 4}%</b> in region {n} &amp; margins held</li>" for n in range(1, 5))
+            + "</ul></div>"
+            for row in range(2) for col in range(3)
+        )
+        slides.append(
+            '<!DOCTYPE html><html><head><meta charset="utf-8"><style>body{margin:0;font-family:Inter;}'
+            '.note{color:#666;}</style></head><body>'
+            '<div id="slide" style="position:relative; width:1280px; height:720px; background-color:#FFFFFF; overflow:hidden;">'
+            f'<div style="position:absolute; left:60px; top:30px; width:1160px; height:60px; font-size:28px; '
+            f'font-weight:bold; color:#004080;">Quarterly results, part {number}</div>'
+            '<div style="position:absolute; left:60px; top:95px; width:120px; height:4px; background-color:#FFA000;"></div>'
+            f'{cards}'
+            '<!-- footer -->'
+            f'<div style="position:absolute; left:60px; top:680px; width:1160px; height:24px; font-size:11px; '
+            f'color:#999;">Source: annual report <span class="note">p. {number}</span></div>'
+            '</div></body></html>'
+        )
+    return slides
+
+
+def legacy_parse(html_content):
+    """Reading step of the previous converter."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+    slide_div = soup.find('div', id='slide')
+    if not slide_div:
+        return None
+    re.search(r'background-color:\s*(#[0-9a-fA-F]+)', slide_div.get('style', ''))
+    elements = []
+    for element in slide_div.find_all(recursive=False):
+        style = element.get('style', '')
+        styles = {}
+        for s in style.split(';'):
+            if ':' in s:
+                k, v = s.split(':', 1)
+                styles[k.strip()] = v.strip()
+
+        def parse_val(val):
+            if not val:
+                return 0
+            match = re.match(r"([\d\.]+)", val)
+            return float(match.group(1)) if match else 0
+
+        box = [parse_val(styles.get(key, default)) for key, default in
+               (('left', '0'), ('top', '0'), ('width', '100'), ('height', '50'), ('font-size', '11'))]
+        elements.append((box, styles, element.get_text(strip=True)))
+    return elements
+
+
+def legacy_add_slide(deck, html_content):
+    """The previous converter's per-slide body, verbatim, on a PptxDeckBuilder's presentation."""
+    from bs4 import BeautifulSoup
+    from pptx.util import Pt
+    from pptx.dml.color import RGBColor
+
+    SCALE_FACTOR = deck.scale
+    soup = BeautifulSoup(html_content, 'html.parser')
+    slide_div = soup.find('div', id='slide')
+    if not slide_div:
+        return False
+    slide = deck.prs.slides.add_slide(deck.prs.slide_layouts[6])
+    deck.slide_count += 1
+
+    style = slide_div.get('style', '')
+    bg_match = re.search(r'background-color:\s*(#[0-9a-fA-F]+)', style)
+    if bg_match:
+        hex_color = bg_match.group(1).lstrip('#')
+        rgb = tuple(int(hex_color[j:j+2], 16) for j in (0, 2, 4))
+        slide.background.fill.solid()
+        slide.background.fill.fore_color.rgb = RGBColor(*rgb)
+
+    for element in slide_div.find_all(recursive=False):
+        style = element.get('style', '')
+        styles = {}
+        for s in style.split(';'):
+            if ':' in s:
+                k, v = s.split(':', 1)
+                styles[k.strip()] = v.strip()
+
+        def parse_val(val):
+            if not val:
+                return 0
+            match = re.match(r"([\d\.]+)", val)
+            return float(match.group(1)) if match else 0
+
+        left = parse_val(styles.get('left', '0')) * SCALE_FACTOR
+        top = parse_val(styles.get('top', '0')) * SCALE_FACTOR
+        width_px = parse_val(styles.get('width', '100')) * SCALE_FACTOR
+        height_px = parse_val(styles.get('height', '50')) * SCALE_FACTOR
+
+        shape = slide.shapes.add_textbox(left, top, width_px, height_px)
+        tf = shape.text_frame
+        tf.word_wrap = True
+
+        text = element.get_text(strip=True)
+        if text:
+            tf.paragraphs[0].text = text
+            font_size = parse_val(styles.get('font-size', '11'))
+            if font_size:
+                tf.paragraphs[0].font.size = Pt(font_size * 0.75)
+            color = styles.get('color', '#000000')
+            if color.startswith('#'):
+                hex_c = color.lstrip('#')
+                if len(hex_c) == 3:
+                    hex_c = ''.join([c*2 for c in hex_c])
+                rgb = tuple(int(hex_c[j:j+2], 16) for j in (0, 2, 4))
+                tf.paragraphs[0].font.color.rgb = RGBColor(*rgb)
+            if 'bold' in styles.get('font-weight', ''):
+                tf.paragraphs[0].font.bold = True
+
+        bg_color = styles.get('background-color')
+        if bg_color and bg_color.startswith('#'):
+            hex_c = bg_color.lstrip('#')
+            if len(hex_c) == 3:
+                hex_c = ''.join([c*2 for c in hex_c])
+            rgb = tuple(int(hex_c[j:j+2], 16) for j in (0, 2, 4))
+            shape.fill.solid()
+            shape.fill.fore_color.rgb = RGBColor(*rgb)
+    return True
+
+
+def build(slides, parser):
+    deck = PptxDeckBuilder(CONFIG)
+    if parser == "legacy":
+        for html in slides:
+            legacy_add_slide(deck, html)
+    else:
+        slide_parser.HTML_PARSER = parser
+        for html in slides:
+            deck.add_slide(html)
+    return deck
+
+
+def parse(slides, parser):
+    for html in slides:
+        if parser == "legacy":
+            legacy_parse(html)
+        else:
+            slide_parser.parse_slide(html, parser)
+
+
+def shapes_of(deck):
+    return [
+        [(shape.left, shape.top, shape.width, shape.height, shape.text_frame.text) for shape in slide.shapes]
+        for slide in deck.prs.slides
+    ]
+
+
+def measure(fn, slides, parser, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(slides, parser)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    slides = make_slides(args.slides)
+    parsers = ["legacy", "bs4"]
+    try:
+        import lxml  # noqa: F401
+        parsers.append("lxml")
+    except ImportError:
+        print("  lxml not installed, skipping it")
+
+    # Sanity check: every converter must produce the same shapes
+    expected = shapes_of(build(slides[:3], "legacy"))
+    for name in parsers[1:]:
+        assert shapes_of(build(slides[:3], name)) == expected, f"{name} output differs from legacy"
+
+    print(f"\n📊 PPTX conversion of {args.slides} slides ({args.repeat} runs, median)")
+    results = {}
+    for name in parsers:
+        parse_time = measure(parse, slides, name, args.repeat)
+        build_time = measure(build, slides, name, args.repeat)
+        results[name] = (parse_time, build_time)
+        print(f"  {name:<7} parse {parse_time * 1000:8.1f} ms   build {build_time * 1000:8.1f} ms   "
+              f"per slide {build_time / args.slides * 1000:6.2f} ms")
+
+    legacy_parse_time, legacy_build_time = results["legacy"]
+    for name in parsers[1:]:
+        parse_time, build_time = results[name]
+        print(f"  {name:<7} speedup: parse {legacy_parse_time / parse_time:.1f}x, "
+              f"build {legacy_build_time / build_time:.1f}x")
+    print()
+
+
+if __name__ == "__main__":
+    main()
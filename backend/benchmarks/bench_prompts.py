@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: content prompt construction for a 200-slide batch.
+
+Compares building every prompt from scratch (get_content_slide_prompt) with
+compiling the job-level part once and rendering only the per-slide fields.
+
+Usage:
+    python benchmarks/bench_prompts.py [--slides 200] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_ppt import get_default_instructions
+from prompts.content_prompts import get_content_slide_prompt, compile_content_slide_prompt
+
+STYLING = {
+    "primary_color": "#004080",
+    "secondary_color": "#0066CC",
+    "accent_color": "#FFA000",
+    "page_background_color": "#FFFFFF",
+    "title_color": "#004080",
+    "body_color": "#333333",
+    "font_family": "Inter",
+    "title_font_size": 28,
+    "body_font_size": 11,
+    "additional_prompt": "Keep bullets short.",
+}
+
+
+def make_slides(count):
+    """Fake per-slide content roughly the size of one extracted PDF page."""
+    body = "Revenue grew 12% year over year, driven by new markets. " * 30
+    return [(f"Section {i}", f"{body}\n(page {i})") for i in range(1, count + 1)]
+
+
+def run_uncompiled(slides, instructions):
+    total = len(slides) + 2
+    for number, (title, content) in enumerate(slides, 2):
+        get_content_slide_prompt(title, content, number, total, instructions, STYLING, 1280, 720)
+
+
+def run_compiled(slides, instructions):
+    total = len(slides) + 2
+    template = compile_content_slide_prompt(instructions, STYLING, 1280, 720)
+    for number, (title, content) in enumerate(slides, 2):
+        template.render(page_title=title, content_str=content, slide_number=number, total_slides=total)
+
+
+def measure(fn, slides, instructions, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(slides, instructions)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    slides = make_slides(args.slides)
+    instructions = get_default_instructions()
+
+    # Sanity check: both paths must produce identical prompts
+    template = compile_content_slide_prompt(instructions, STYLING, 1280, 720)
+    title, content = slides[0]
+    assert template.render(page_title=title, content_str=content, slide_number=2, total_slides=3) == \
+        get_content_slide_prompt(title, content, 2, 3, instructions, STYLING, 1280, 720)
+
+    print(f"\n📊 Prompt construction for {args.slides} slides ({args.repeat} runs)")
+    results = {}
+    for name, fn in (("uncompiled", run_uncompiled), ("compiled", run_compiled)):
+        timings = measure(fn, slides, instructions, args.repeat)
+        results[name] = statistics.median(timings)
+        print(f"  {name:<11} median {results[name] * 1000:8.2f} ms   "
+              f"per slide {results[name] / args.slides * 1e6:7.1f} µs")
+
+    print(f"  speedup     {results['uncompiled'] / results['compiled']:.1f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Offline benchmark of concurrent logins and their effect on the job API.
+
+Fires a burst of POST /auth/login requests at the app (in process, through
+its ASGI interface) while a prober keeps calling GET /api/v1/jobs, the
+endpoint the dashboard polls. The database is a temporary SQLite file using
+the app's regular connection pool, so logins that hold connections while
+hashing show up as slower (or failing) job API calls.
+
+Reports logins/s, login latency percentiles and the job API latency before
+and during the burst.
+
+Usage:
+    python benchmarks/login_load.py [--logins 200] [--concurrency 50]
+        [--users 20] [--rounds 12] [--hash-workers N] [--probe-interval 0.05]
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+PASSWORD = "correct horse battery staple"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def create_users(count):
+    """Insert users sharing one password hash (hashing each would dominate setup)."""
+    from app.core.auth_utils import hash_password
+    from app.core.database import SessionLocal
+    from app.models.user import User
+
+    password_hash = hash_password(PASSWORD)
+    db = SessionLocal()
+    try:
+        emails = [f"user{i}@example.com" for i in range(count)]
+        db.add_all(User(email=email, password_hash=password_hash, email_verified=True) for email in emails)
+        db.commit()
+        return emails
+    finally:
+        db.close()
+
+
+async def probe(client, headers, stop, interval, latencies, errors):
+    """Call the job list until stopped, recording latencies."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            response = await client.get("/api/v1/jobs", headers=headers)
+            if response.status_code != 200:
+                errors.append(f"GET /jobs: HTTP {response.status_code}")
+        except Exception as e:
+            errors.append(f"GET /jobs: {e}")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+
+    emails = create_users(args.users)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        response = await client.post("/auth/login", json={"email": emails[0], "password": PASSWORD})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['accessToken']}"}
+
+        # Baseline: job API alone
+        baseline, errors = [], []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, headers, stop, args.probe_interval, baseline, errors))
+        await asyncio.sleep(args.baseline)
+        stop.set()
+        await prober
+
+        # Burst: logins plus the job API
+        during, login_latencies, failures = [], [], []
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def login(i):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(
+                        "/auth/login", json={"email": emails[i % len(emails)], "password": PASSWORD}
+                    )
+                    if response.status_code != 200:
+                        failures.append(f"login: HTTP {response.status_code} {response.text[:100]}")
+                except Exception as e:
+                    failures.append(f"login: {e}")
+                login_latencies.append(time.perf_counter() - start)
+
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, headers, stop, args.probe_interval, during, errors))
+        start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.logins)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+
+    return elapsed, login_latencies, failures, baseline, during, errors
+
+
+def report(args, elapsed, login_latencies, failures, baseline, during, errors):
+    from app.core.auth_utils import PASSWORD_HASH_WORKERS
+
+    print(f"\n🔐 Login load test: {args.logins} logins, concurrency {args.concurrency}, "
+          f"bcrypt rounds {args.rounds}, {PASSWORD_HASH_WORKERS} hash worker(s)")
+    print(f"  throughput  {args.logins / elapsed:8.2f} logins/s   ({elapsed:.1f}s wall)")
+    print(f"  failures    {len(failures) + len(errors):8d}")
+    for failure in (failures + errors)[:3]:
+        print(f"    - {failure[:200]}")
+    print()
+
+    print(f"  {'requests':<26}{'count':>7}{'p50 ms':>11}{'p90 ms':>11}{'p99 ms':>11}{'max ms':>11}")
+    for name, values in [
+        ("login", login_latencies),
+        ("GET /jobs (idle)", baseline),
+        ("GET /jobs (during logins)", during),
+    ]:
+        if not values:
+            continue
+        print(f"  {name:<26}{len(values):>7}"
+              f"{percentile(values, 50) * 1000:>11.1f}{percentile(values, 90) * 1000:>11.1f}"
+              f"{percentile(values, 99) * 1000:>11.1f}{max(values) * 1000:>11.1f}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200, help="Total login requests")
+    parser.add_argument("--concurrency", type=int, default=50, help="Logins in flight at once")
+    parser.add_argument("--users", type=int, default=20, help="Distinct accounts to log in as")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt work factor")
+    parser.add_argument("--hash-workers", type=int, help="Password hashing pool size (default: CPU count)")
+    parser.add_argument("--baseline", type=float, default=2.0, help="Seconds of idle job API probing first")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="Seconds between job API calls")
+    parser.add_argument("--verbose", action="store_true", help="Show app logs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="login-bench-") as tmp:
+        # Settings, engine and the hashing pool are configured at import time
+        os.environ.update({
+            "DATABASE_URL": f"sqlite:///{Path(tmp) / 'bench.db'}",
+            "AWS_ACCESS_KEY_ID": "placeholder_access_key",
+            "LOCAL_STORAGE_PATH": str(Path(tmp) / "storage"),
+            "BCRYPT_ROUNDS": str(args.rounds),
+        })
+        if args.hash_workers:
+            os.environ["PASSWORD_HASH_WORKERS"] = str(args.hash_workers)
+        sys.path.insert(0, str(BACKEND_ROOT))
+        if not args.verbose:
+            logging.disable(logging.WARNING)
+
+        results = asyncio.run(run(args))
+        report(args, *results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""Offline load test of the full generation pipeline with a fake LLM.
+
+Runs the same path as production - POST /upload, POST /jobs,
+generate_html_and_convert_task and the PPTX/PDF conversion - without network
+access or API keys:
+
+- the LLM is a registered fake provider that sleeps for a latency drawn from
+  a configurable distribution and returns canned slide HTML (batched
+  requests get one delimited slide per requested slide),
+- storage is Dev Mode local storage in a temporary directory,
+- the database is a temporary SQLite file,
+- Celery runs in eager mode, so each job runs inside its create_job request.
+
+Each worker is a separate process (like a prefork Celery worker) with its own
+database and storage. Reports jobs/min, per-stage latency percentiles and
+peak RSS. PPTX decks are built while slides are generated: "deck_slide" is
+the conversion of one slide on the deck thread, "conversion" the time a job
+waits for its output once the last slide is generated (PDF, or PPTX via
+DeckStream.finish and the convert_to_pptx fallback).
+
+Usage:
+    python benchmarks/pipeline_load.py [--jobs 10] [--workers 1] [--slides 8]
+        [--latency lognormal:0.5:0.3] [--slides-per-request 1]
+        [--output-format pptx] [--profile] [--verbose]
+
+Latency distributions (seconds, per generated slide):
+    fixed:S   uniform:LOW:HIGH   normal:MEAN:SD   lognormal:MEDIAN:SIGMA
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import multiprocessing
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+# "=== SLIDE n of total ===" headers in a batched content prompt
+BATCH_SLIDE_HEADER = re.compile(r"^=== SLIDE (\d+) of \d+ ===$", re.MULTILINE)
+
+CANNED_SLIDE = """<div id="slide" style="width:1280px; height:720px; position:relative; background-color:#FFFFFF; font-family:Inter;">
+  <div style="position:absolute; top:25px; left:40px; width:1200px; height:45px; font-size:28px; font-weight:700; color:#004080;">Revenue grew 12% on the back of new markets</div>
+  <div style="position:absolute; top:75px; left:40px; width:1200px; height:3px; background-color:#FFA000;"></div>
+  <div style="position:absolute; top:110px; left:40px; width:580px; height:380px; font-size:11px; color:#333333;">
+    <ul><li>New markets contributed 7pp of growth</li><li>Core business grew 5% despite price pressure</li><li>Churn fell to 3.1%</li></ul>
+  </div>
+  <div style="position:absolute; top:110px; left:660px; width:580px; height:380px; font-size:11px; color:#333333;">
+    <table><tr><td>Region</td><td>Growth</td></tr><tr><td>EMEA</td><td>9%</td></tr><tr><td>APAC</td><td>21%</td></tr></table>
+  </div>
+  <div style="position:absolute; top:520px; left:40px; width:1200px; height:120px; font-size:12px; background-color:#F5F8FC; color:#004080;">So what: expansion is paying back faster than planned.</div>
+  <div style="position:absolute; top:685px; left:40px; width:600px; height:20px; font-size:9px; color:#888888;">Source: sample document</div>
+  <div style="position:absolute; top:685px; left:1180px; width:60px; height:20px; font-size:9px; color:#888888;">{slide_number}</div>
+</div>"""
+
+
+# -- Latency distributions ----------------------------------------------------
+
+def parse_latency(spec):
+    """Turn "lognormal:0.5:0.3" etc. into a sampler taking a random.Random."""
+    name, *params = spec.split(":")
+    try:
+        values = [float(p) for p in params]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid latency parameters: {spec}")
+
+    samplers = {
+        "fixed": (1, lambda rng, s: s),
+        "uniform": (2, lambda rng, low, high: rng.uniform(low, high)),
+        "normal": (2, lambda rng, mean, sd: max(0.0, rng.gauss(mean, sd))),
+        "lognormal": (2, lambda rng, median, sigma: rng.lognormvariate(math.log(median), sigma)),
+    }
+    if name not in samplers or len(values) != samplers[name][0]:
+        raise argparse.ArgumentTypeError(f"Invalid latency distribution: {spec}")
+    sample = samplers[name][1]
+    return lambda rng: sample(rng, *values)
+
+
+# -- Stage timing -------------------------------------------------------------
+
+class StageTimings:
+    """Collects wall-clock durations per pipeline stage."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            with self.measure(stage):
+                return fn(*args, **kwargs)
+        return timed
+
+    def wrap_async(self, stage, fn):
+        async def timed(*args, **kwargs):
+            with self.measure(stage):
+                return await fn(*args, **kwargs)
+        return timed
+
+
+class FakeLLM:
+    """Stand-in LLM provider returning canned slide HTML after a simulated delay."""
+
+    def __init__(self, sampler, timings, seed):
+        self.sampler = sampler
+        self.timings = timings
+        self.rng = random.Random(seed)
+
+    def __call__(self, prompt, llm_config, raw=False):
+        from generate_ppt import clean_slide_response
+
+        batch_numbers = [int(n) for n in BATCH_SLIDE_HEADER.findall(prompt)]
+        # Output tokens dominate, so a batched response costs one draw per slide
+        delay = sum(self.sampler(self.rng) for _ in batch_numbers or [None])
+        with self.timings.measure("llm_request"):
+            time.sleep(delay)
+
+        if raw:
+            return "\n".join(
+                f"<!-- SLIDE_BREAK {n} -->\n{CANNED_SLIDE.format(slide_number=n)}"
+                for n in batch_numbers
+            )
+        # Wrapped like a real response so the extractor does its usual work
+        return clean_slide_response(f"```html\n{CANNED_SLIDE.format(slide_number='')}\n```")
+
+
+def make_document(sections):
+    """Markdown input with one ## section per requested slide."""
+    body = ("Revenue grew 12% year over year, driven by new markets in EMEA and APAC. "
+            "Core business grew 5% despite price pressure, and churn fell to 3.1%. ") * 6
+    return "\n\n".join(f"## Section {i}\n\n{body}" for i in range(1, sections + 1)).encode()
+
+
+# -- Worker process -----------------------------------------------------------
+
+def run_worker(worker_id, args, work_dir):
+    """Run args.jobs_per_worker jobs end to end in this process; returns raw results."""
+    # Settings, engine and storage are configured at import time
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{work_dir / 'bench.db'}",
+        "AWS_ACCESS_KEY_ID": "placeholder_access_key",
+        "LOCAL_STORAGE_PATH": str(work_dir / "storage"),
+        # Measure the pipeline, not admission control
+        "MAX_PENDING_JOBS_PER_USER": "0",
+        "MAX_PENDING_JOBS": "0",
+    })
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+    import logging
+    from fastapi.testclient import TestClient
+
+    import generate_ppt
+    from app.main import app
+    from app.celery_app import celery_app
+    from app.middleware.auth import get_current_user
+    from app.services.ppt_service import DeckStream, PPTService
+    from app.tasks import conversion_tasks
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    celery_app.conf.update(task_always_eager=True, task_eager_propagates=True)
+
+    timings = StageTimings()
+    generate_ppt.register_llm_provider("fake", FakeLLM(parse_latency(args.latency), timings, seed=worker_id))
+    PPTService.generate_html_slides = timings.wrap_async("html_generation", PPTService.generate_html_slides)
+    PPTService._upload_single_slide = timings.wrap_async("slide_upload", PPTService._upload_single_slide)
+    generate_ppt.PptxDeckBuilder.add_slide = timings.wrap("deck_slide", generate_ppt.PptxDeckBuilder.add_slide)
+    DeckStream.finish = timings.wrap("conversion", DeckStream.finish)
+    conversion_tasks.convert_to_pptx = timings.wrap("conversion", conversion_tasks.convert_to_pptx)
+    conversion_tasks.convert_to_pdf = timings.wrap("conversion", conversion_tasks.convert_to_pdf)
+
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id="bench-user", email="bench@example.com")
+    client = TestClient(app)
+
+    document = make_document(args.slides)
+    config = {
+        "title": "Benchmark deck",
+        "number_of_slides": args.slides,
+        "output_format": args.output_format,
+        "llm_provider": "fake",
+        "slides_per_request": args.slides_per_request,
+        "profile": args.profile,
+    }
+
+    failures = []
+    output = None if args.verbose else io.StringIO()
+    start = time.perf_counter()
+    for _ in range(args.jobs_per_worker):
+        job_start = time.perf_counter()
+        with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+            with timings.measure("upload_request"):
+                response = client.post("/api/v1/upload", files={"file": ("deck.md", document, "text/markdown")})
+            response.raise_for_status()
+            s3_key = response.json()["s3_key"]
+
+            with timings.measure("create_job_request"):
+                response = client.post("/api/v1/jobs", json={"input_s3_key": s3_key, "config": config})
+
+        if response.status_code != 200:
+            failures.append(response.text)
+        else:
+            status = client.get(f"/api/v1/jobs/{response.json()['job_id']}").json()
+            if status["status"] != "completed":
+                failures.append(status.get("error_message") or status["status"])
+        timings.add("job_total", time.perf_counter() - job_start)
+        if output:
+            output.seek(0)
+            output.truncate()
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_bytes = max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    return {
+        "elapsed": elapsed,
+        "jobs": args.jobs_per_worker,
+        "failures": failures,
+        "samples": dict(timings.samples),
+        "peak_rss": rss_bytes,
+    }
+
+
+def _worker_entry(worker_id, args, queue):
+    with tempfile.TemporaryDirectory(prefix=f"pipeline-bench-{worker_id}-") as tmp:
+        queue.put(run_worker(worker_id, args, Path(tmp)))
+
+
+# -- Reporting ----------------------------------------------------------------
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+STAGE_ORDER = [
+    "job_total", "upload_request", "create_job_request", "html_generation",
+    "llm_request", "slide_upload", "deck_slide", "conversion",
+]
+
+
+def report(results, args):
+    total_jobs = sum(r["jobs"] for r in results)
+    failures = [f for r in results for f in r["failures"]]
+    # Workers run in parallel; throughput is bounded by the slowest one
+    wall = max(r["elapsed"] for r in results)
+
+    samples = defaultdict(list)
+    for r in results:
+        for stage, values in r["samples"].items():
+            samples[stage].extend(values)
+
+    print(f"\n📊 Pipeline load test: {total_jobs} jobs, {args.workers} worker(s), "
+          f"{args.slides} content slides/job, {args.output_format}, "
+          f"{args.slides_per_request} slide(s)/request, latency {args.latency}")
+    print(f"  throughput  {total_jobs / wall * 60:8.2f} jobs/min   ({wall:.1f}s wall)")
+    print(f"  failures    {len(failures):8d}")
+    for failure in failures[:3]:
+        print(f"    - {failure[:200]}")
+    print(f"  peak RSS    {max(r['peak_rss'] for r in results) / 2**20:8.1f} MiB (largest worker)\n")
+
+    print(f"  {'stage':<20}{'count':>7}{'p50 ms':>11}{'p90 ms':>11}{'p99 ms':>11}{'max ms':>11}")
+    for stage in STAGE_ORDER + sorted(set(samples) - set(STAGE_ORDER)):
+        values = samples.get(stage)
+        if not values:
+            continue
+        print(f"  {stage:<20}{len(values):>7}"
+              f"{percentile(values, 50) * 1000:>11.1f}{percentile(values, 90) * 1000:>11.1f}"
+              f"{percentile(values, 99) * 1000:>11.1f}{max(values) * 1000:>11.1f}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10, help="Total jobs across all workers")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--slides", type=int, default=8, help="Content slides per job")
+    parser.add_argument("--latency", default="lognormal:0.5:0.3", help="Fake LLM latency per slide")
+    parser.add_argument("--slides-per-request", type=int, default=1)
+    parser.add_argument("--output-format", choices=["pptx", "pdf"], default="pptx")
+    parser.add_argument("--profile", action="store_true", help="Enable per-job profiling (measures its overhead)")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline logs and prints")
+    args = parser.parse_args()
+
+    # Validate early; workers build their own sampler (lambdas don't pickle)
+    try:
+        parse_latency(args.latency)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    args.jobs_per_worker = max(1, math.ceil(args.jobs / args.workers))
+
+    if args.workers == 1:
+        with tempfile.TemporaryDirectory(prefix="pipeline-bench-") as tmp:
+            results = [run_worker(0, args, Path(tmp))]
+    else:
+        # Fresh interpreters, so each worker imports the app with its own settings
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        processes = [ctx.Process(target=_worker_entry, args=(i, args, queue)) for i in range(args.workers)]
+        for process in processes:
+            process.start()
+        results = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
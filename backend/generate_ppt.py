@@ -14,6 +14,8 @@ import re
 import json
 import yaml
 import glob
+import tempfile
+import time
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
@@ -24,19 +26,51 @@ load_dotenv()
 
 try:
     from prompts.title_prompts import get_title_slide_prompt
-    from prompts.content_prompts import get_content_slide_prompt
+    from prompts.content_prompts import (
+        compile_content_slide_prompt,
+        compile_batched_content_prompt,
+        format_batch_slides,
+    )
     from prompts.ending_prompts import get_ending_slide_prompt
+    from postprocess.html_extractor import extract_slide_html
+    from postprocess.layout import fix_slide_layout
+    from postprocess.slide_parser import parse_slide
+    from postprocess.styles import parse_hex_color, parse_px
 except ImportError:
     # Fallback/Development support if prompts folder isn't in path relatively
     import sys
     sys.path.append(str(Path(__file__).parent))
     from prompts.title_prompts import get_title_slide_prompt
-    from prompts.content_prompts import get_content_slide_prompt
+    from prompts.content_prompts import (
+        compile_content_slide_prompt,
+        compile_batched_content_prompt,
+        format_batch_slides,
+    )
     from prompts.ending_prompts import get_ending_slide_prompt
+    from postprocess.html_extractor import extract_slide_html
+    from postprocess.layout import fix_slide_layout
+    from postprocess.slide_parser import parse_slide
+    from postprocess.styles import parse_hex_color, parse_px
 
 # Get the directory where this script is located
 SCRIPT_DIR = Path(__file__).parent.resolve()
 
+# Batched generation: the "<!-- SLIDE_BREAK n -->" delimiter, capturing n
+SLIDE_BREAK_PATTERN = re.compile(r"<!--\s*SLIDE_BREAK\s+(\d+)\s*-->")
+# Source text budget for one batched request; larger slides go alone
+BATCH_MAX_SOURCE_CHARS = 6000
+# Upper bound for max_tokens when scaling it for a batched response
+BATCH_MAX_OUTPUT_TOKENS = 64000
+# PPTX conversion: background color in the style of <div id="slide">
+SLIDE_BACKGROUND_PATTERN = re.compile(r'background-color:\s*(#[0-9a-fA-F]+)')
+# Prefix of scratch directories; the same as the app's TEMP_PREFIX, so its
+# temp sweep also removes what a killed worker left behind
+TEMP_DIR_PREFIX = "synthatext-"
+
+
+class GenerationCancelled(Exception):
+    """Raised when the caller's should_abort() callback asks to stop (see _check_abort)."""
+
 
 def load_config():
     """Load configuration from config.yaml."""
@@ -45,14 +79,29 @@ def load_config():
         return yaml.safe_load(f)
 
 
+# Cached instructions.md contents, keyed by (path, mtime)
+_instructions_cache = {}
+
+
 def get_instructions():
-    """Reads the instructions.md file."""
+    """Reads the instructions.md file (cached until the file's mtime changes)."""
+    path = SCRIPT_DIR / "instructions.md"
     try:
-        with open(SCRIPT_DIR / "instructions.md", "r") as f:
-            return f.read()
+        mtime = path.stat().st_mtime_ns
     except FileNotFoundError:
         print("Warning: instructions.md not found, using default instructions.")
         return get_default_instructions()
+    
+    key = (str(path), mtime)
+    cached = _instructions_cache.get(key)
+    if cached is None:
+        with open(path, "r") as f:
+            cached = f.read()
+        # Only the current version of each file is worth keeping
+        for stale in [k for k in _instructions_cache if k[0] == key[0]]:
+            del _instructions_cache[stale]
+        _instructions_cache[key] = cached
+    return cached
 
 
 def get_default_instructions():
@@ -192,13 +241,14 @@ def load_source_content(config):
     print(f"  Loading: {file_path.name}")
     
     # Determine content type from file extension
-    ext = file_path.suffix.lower()
-    if ext == ".pdf":
+    if source_extractor(file_path.suffix) == "pdf":
         return extract_content_from_pdf(file_path, pages_to_process)
-    elif ext in [".txt", ".md", ".text", ".markdown"]:
-        return extract_content_from_text(file_path, pages_to_process)
-    else:
-        return extract_content_from_text(file_path, pages_to_process)
+    return extract_content_from_text(file_path, pages_to_process)
+
+
+def source_extractor(suffix):
+    """Extractor load_source_content uses for a file extension: "pdf" or "text" (.txt, .md and anything else)."""
+    return "pdf" if suffix.lower() == ".pdf" else "text"
 
 
 def distribute_content_to_slides(pages, num_slides):
@@ -263,11 +313,7 @@ def generate_title_slide_html(config, instructions):
         font_family=font_family
     )
 
-    provider = llm_config.get("provider", "claude")
-    if provider == "claude":
-        return _generate_with_claude(prompt, llm_config)
-    else:
-        return _generate_with_gemini(prompt, llm_config)
+    return generate_with_llm(prompt, llm_config)
 
 
 def generate_ending_slide_html(config, instructions):
@@ -319,25 +365,22 @@ def generate_ending_slide_html(config, instructions):
         styling=styling
     )
 
-    provider = llm_config.get("provider", "claude")
-    if provider == "claude":
-        return _generate_with_claude(prompt, llm_config)
-    else:
-        return _generate_with_gemini(prompt, llm_config)
+    return generate_with_llm(prompt, llm_config)
 
 
-def generate_content_slide_html(slide_content, slide_number, total_slides, config, instructions):
-    """Generate HTML for a content slide using LLM."""
-    llm_config = config.get("llm", {})
-    styling = config.get("content_styling", {})
+def build_content_prompt_template(config, instructions):
+    """Compile the per-job part of the content slide prompt (call once per job)."""
     slide_config = config.get("slides", {})
-    
-    provider = llm_config.get("provider", "claude")
-    
-    width = slide_config.get("width", 1280)
-    height = slide_config.get("height", 720)
-    
-    # Combine content from multiple pages if needed
+    return compile_content_slide_prompt(
+        instructions=instructions,
+        styling=config.get("content_styling", {}),
+        width=slide_config.get("width", 1280),
+        height=slide_config.get("height", 720)
+    )
+
+
+def combine_slide_content(slide_content, slide_number):
+    """Merge the source pages assigned to a slide into (page_title, content_str)."""
     if isinstance(slide_content, list):
         combined_content = ""
         combined_title = ""
@@ -352,25 +395,192 @@ def generate_content_slide_html(slide_content, slide_number, total_slides, confi
     else:
         content_str = slide_content.get("content", "")
         page_title = slide_content.get("title", f"Slide {slide_number}")
+    return page_title, content_str
+
+
+def generate_content_slide_html(slide_content, slide_number, total_slides, config, instructions, prompt_template=None):
+    """Generate HTML for a content slide using LLM.
+    
+    Pass a prompt_template from build_content_prompt_template() to skip
+    rebuilding the static part of the prompt for every slide.
+    """
+    llm_config = config.get("llm", {})
+    
+    page_title, content_str = combine_slide_content(slide_content, slide_number)
+    
+    if prompt_template is None:
+        prompt_template = build_content_prompt_template(config, instructions)
     
-    prompt = get_content_slide_prompt(
+    prompt = prompt_template.render(
         page_title=page_title,
         content_str=content_str,
         slide_number=slide_number,
-        total_slides=total_slides,
+        total_slides=total_slides
+    )
+
+    return fix_content_slide_layout(generate_with_llm(prompt, llm_config), f"slide {slide_number}")
+
+
+def build_batched_prompt_template(config, instructions):
+    """Compile the per-job part of the batched content prompt (call once per job)."""
+    slide_config = config.get("slides", {})
+    return compile_batched_content_prompt(
         instructions=instructions,
-        styling=styling,
-        width=width,
-        height=height
+        styling=config.get("content_styling", {}),
+        width=slide_config.get("width", 1280),
+        height=slide_config.get("height", 720)
     )
 
-    if provider == "claude":
-        return _generate_with_claude(prompt, llm_config)
-    else:
-        return _generate_with_gemini(prompt, llm_config)
 
+def plan_content_batches(slides_content, slides_per_request, max_chars=BATCH_MAX_SOURCE_CHARS):
+    """
+    Group content slides into batches for batched generation.
+    
+    A batch holds at most slides_per_request slides and at most max_chars of
+    source text, so text-heavy slides still get a request of their own.
+    Returns a list of lists of indexes into slides_content.
+    """
+    batches = []
+    current = []
+    current_chars = 0
+    for i, slide_content in enumerate(slides_content):
+        _, content_str = combine_slide_content(slide_content, i)
+        if current and (len(current) >= slides_per_request or current_chars + len(content_str) > max_chars):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(i)
+        current_chars += len(content_str)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def split_batched_response(content_text, slide_numbers):
+    """
+    Split a batched LLM response into per-slide HTML.
+    
+    Returns a list aligned with slide_numbers; entries are None for slides
+    that are missing or fail validation, so callers can regenerate just those.
+    """
+    sections = {}
+    parts = SLIDE_BREAK_PATTERN.split(content_text)
+    # parts = [preamble, number, html, number, html, ...]
+    for number, chunk in zip(parts[1::2], parts[2::2]):
+        extracted = extract_slide_html(chunk)
+        # A cut-off slide (e.g. max_tokens hit mid-batch) is regenerated alone
+        if extracted is not None and not extracted.truncated:
+            _report_extraction(extracted, f"slide {number}")
+            # First occurrence wins if the model repeats a delimiter
+            sections.setdefault(int(number), fix_content_slide_layout(extracted.html, f"slide {number}"))
+    return [sections.get(number) for number in slide_numbers]
+
+
+def generate_content_slides_batch_html(batch, first_slide_number, total_slides, config, instructions, batch_template=None):
+    """
+    Generate several consecutive content slides with a single LLM request.
+    
+    Returns a list of HTML strings aligned with batch. Slides the response
+    could not be split into are None; generate those with
+    generate_content_slide_html() instead.
+    """
+    llm_config = config.get("llm", {})
+    
+    if batch_template is None:
+        batch_template = build_batched_prompt_template(config, instructions)
+    
+    slide_numbers = list(range(first_slide_number, first_slide_number + len(batch)))
+    slides = []
+    for slide_number, slide_content in zip(slide_numbers, batch):
+        page_title, content_str = combine_slide_content(slide_content, slide_number)
+        slides.append((slide_number, page_title, content_str))
+    
+    prompt = batch_template.render(
+        slides_block=format_batch_slides(slides, total_slides),
+        slide_count=len(batch)
+    )
+    
+    content_text = generate_with_llm(prompt, _scale_max_tokens(llm_config, len(batch)), raw=True)
+    return split_batched_response(content_text, slide_numbers)
 
-def _generate_with_claude(prompt, llm_config):
+
+def _scale_max_tokens(llm_config, factor):
+    """Copy llm_config with each provider's max_tokens scaled for a multi-slide response."""
+    scaled = dict(llm_config)
+    for provider in ("claude", "gemini"):
+        provider_config = dict(scaled.get(provider, {}))
+        max_tokens = provider_config.get("max_tokens", 10000)
+        provider_config["max_tokens"] = min(max_tokens * factor, BATCH_MAX_OUTPUT_TOKENS)
+        scaled[provider] = provider_config
+    return scaled
+
+
+def generate_with_llm(prompt, llm_config, raw=False):
+    """Send a prompt to the configured provider and return the slide HTML (or the raw text)."""
+    provider = llm_config.get("provider", "claude")
+    generate = LLM_PROVIDERS.get(provider, LLM_PROVIDERS["gemini"])
+    _check_abort(llm_config)
+    return generate(prompt, llm_config, raw=raw)
+
+
+def _check_abort(config):
+    """
+    Raise GenerationCancelled if config["should_abort"] (an optional callable
+    set by the caller, e.g. the worker's cancellation check) returns true.
+    """
+    should_abort = config.get("should_abort")
+    if should_abort and should_abort():
+        raise GenerationCancelled("Generation cancelled")
+
+
+def clean_slide_response(content_text):
+    """
+    Turn a raw LLM response into slide HTML.
+    
+    Keeps only the <div id="slide"> subtree, dropping prose and extra code
+    blocks around it and closing tags the model left open. Responses
+    without a slide root fall back to plain fence stripping.
+    """
+    extracted = extract_slide_html(content_text)
+    if extracted is None:
+        return _strip_code_fences(content_text)
+    _report_extraction(extracted, "slide")
+    return extracted.html
+
+
+def _report_extraction(extracted, label):
+    """Print what the HTML extractor had to fix."""
+    if extracted.repaired:
+        print(f"    Repaired unbalanced tags in {label}")
+
+
+def fix_content_slide_layout(slide_html, label):
+    """
+    Fix overflowing / overlapping elements of a content slide locally.
+    
+    Re-flows colliding boxes and shrinks the content zone to fit above the
+    footer, so a bad layout does not need another LLM round trip.
+    """
+    fixed_html, report = fix_slide_layout(slide_html)
+    if report.ok:
+        return slide_html
+    print(f"    ⚠ {label}: {len(report.overflows)} overflowing, {len(report.overlaps)} overlapping element(s)")
+    if report.changed:
+        print(f"    Fixed layout of {label}: moved {len(set(report.moved))}, "
+              f"narrowed {len(set(report.narrowed))}, scaled {report.scale:.2f}")
+    return fixed_html
+
+
+def _strip_code_fences(content_text):
+    """Remove markdown code fences around generated HTML."""
+    if "```html" in content_text:
+        content_text = content_text.split("```html")[1].split("```")[0].strip()
+    elif "```" in content_text:
+        content_text = content_text.split("```")[1].split("```")[0].strip()
+    return content_text
+
+
+def _generate_with_claude(prompt, llm_config, raw=False):
     """Generate HTML using Claude API."""
     from anthropic import Anthropic
     
@@ -380,25 +590,34 @@ def _generate_with_claude(prompt, llm_config):
     
     client = Anthropic(api_key=api_key)
     claude_config = llm_config.get("claude", {})
+    model_name = claude_config.get("model", "claude-sonnet-4-5-20250929")
     
-    message = client.messages.create(
-        model=claude_config.get("model", "claude-sonnet-4-5-20250929"),
+    # Streamed so a cancelled job can drop the request mid-response;
+    # leaving the block closes the connection, which stops generation
+    start = time.perf_counter()
+    with client.messages.stream(
+        model=model_name,
         max_tokens=claude_config.get("max_tokens", 10000),
         messages=[{"role": "user", "content": prompt}]
+    ) as stream:
+        for _ in stream.text_stream:
+            _check_abort(llm_config)
+        message = stream.get_final_message()
+    _notify_llm_observers(
+        "claude", model_name, time.perf_counter() - start,
+        input_tokens=message.usage.input_tokens,
+        output_tokens=message.usage.output_tokens
     )
     
     content_text = message.content[0].text.strip()
     
-    # Clean up response
-    if "```html" in content_text:
-        content_text = content_text.split("```html")[1].split("```")[0].strip()
-    elif "```" in content_text:
-        content_text = content_text.split("```")[1].split("```")[0].strip()
+    if raw:
+        return content_text
     
-    return content_text
+    return clean_slide_response(content_text)
 
 
-def _generate_with_gemini(prompt, llm_config):
+def _generate_with_gemini(prompt, llm_config, raw=False):
     """Generate HTML using Gemini API."""
     import google.generativeai as genai
     
@@ -409,18 +628,77 @@ def _generate_with_gemini(prompt, llm_config):
     genai.configure(api_key=api_key)
     gemini_config = llm_config.get("gemini", {})
     
-    model = genai.GenerativeModel(gemini_config.get("model", "gemini-3-pro-preview"))
-    response = model.generate_content(prompt, request_options={"timeout": 1000})
+    model_name = gemini_config.get("model", "gemini-3-pro-preview")
+    model = genai.GenerativeModel(model_name)
+    start = time.perf_counter()
+    # Streamed so a cancelled job can drop the request mid-response
+    response = model.generate_content(prompt, stream=True, request_options={"timeout": 1000})
+    try:
+        for _ in response:
+            _check_abort(llm_config)
+    except GenerationCancelled:
+        _cancel_gemini_stream(response)
+        raise
+    usage = getattr(response, "usage_metadata", None)
+    _notify_llm_observers(
+        "gemini", model_name, time.perf_counter() - start,
+        input_tokens=getattr(usage, "prompt_token_count", None),
+        output_tokens=getattr(usage, "candidates_token_count", None)
+    )
     
     content_text = response.text.strip()
     
-    # Clean up response
-    if "```html" in content_text:
-        content_text = content_text.split("```html")[1].split("```")[0].strip()
-    elif "```" in content_text:
-        content_text = content_text.split("```")[1].split("```")[0].strip()
+    if raw:
+        return content_text
     
-    return content_text
+    return clean_slide_response(content_text)
+
+
+def _cancel_gemini_stream(response):
+    """
+    Cancel the underlying gRPC call of a streamed Gemini response (best effort).
+    
+    The SDK has no public cancel, so this relies on its private _iterator;
+    if that changes, say so instead of silently letting the request run on.
+    """
+    cancel = getattr(getattr(response, "_iterator", None), "cancel", None)
+    if cancel is None:
+        print("    ⚠ Could not cancel the Gemini request: no cancel handle on the streamed response "
+              "(google-generativeai changed?); it keeps running until the model finishes")
+        return
+    cancel()
+
+
+# Provider name -> generate(prompt, llm_config, raw=False); unknown names use Gemini
+LLM_PROVIDERS = {
+    "claude": _generate_with_claude,
+    "gemini": _generate_with_gemini,
+}
+
+
+def register_llm_provider(name, generate):
+    """Register (or replace) an LLM backend, e.g. a fake one for offline benchmarks."""
+    LLM_PROVIDERS[name] = generate
+
+
+# Callbacks fn(provider, model, seconds, input_tokens=None, output_tokens=None)
+# invoked after every completed LLM API call
+LLM_OBSERVERS = []
+
+
+def add_llm_observer(observer):
+    """Register a callback for LLM call timings and token usage (e.g. metrics)."""
+    if observer not in LLM_OBSERVERS:
+        LLM_OBSERVERS.append(observer)
+
+
+def _notify_llm_observers(provider, model, seconds, input_tokens=None, output_tokens=None):
+    for observer in LLM_OBSERVERS:
+        try:
+            observer(provider, model, seconds, input_tokens=input_tokens, output_tokens=output_tokens)
+        except Exception as e:
+            # Observability must never fail a slide
+            print(f"    LLM observer failed: {e}")
 
 
 def save_html_slide(html_content, slide_number, output_folder):
@@ -435,7 +713,6 @@ def convert_to_pdf(output_folder, config):
     """Convert all HTML slides to a single PDF using WeasyPrint (stable alternative to Playwright)."""
     from weasyprint import HTML, CSS
     from PyPDF2 import PdfMerger
-    import tempfile
     
     slide_config = config.get("slides", {})
     output_config = config.get("output", {})
@@ -460,8 +737,6 @@ def convert_to_pdf(output_folder, config):
     output_name = output_config.get("file_name", "Presentation")
     output_file = output_folder / f"{output_name}_{date_str}.pdf"
     
-    temp_pdfs = []
-    
     # CSS for proper sizing
     css_string = f"""
     @page {{
@@ -476,17 +751,24 @@ def convert_to_pdf(output_folder, config):
     }}
     """
     
-    for i, html_file in enumerate(html_files, 1):
-        print(f"    [{i}/{len(html_files)}] Converting: {html_file.name}")
+    # Per-slide PDFs go in one temp directory, removed however the loop ends
+    # (a cancellation or a failed slide included); the app prefix lets the
+    # storage GC sweep it if the process is killed
+    with tempfile.TemporaryDirectory(prefix=TEMP_DIR_PREFIX) as temp_dir:
+        temp_pdfs = []
         
-        try:
-            # Read HTML content
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
+        for i, html_file in enumerate(html_files, 1):
+            _check_abort(config)
+            print(f"    [{i}/{len(html_files)}] Converting: {html_file.name}")
             
-            # Wrap with proper HTML structure if needed
-            if '<!DOCTYPE' not in html_content.upper():
-                html_content = f'''<!DOCTYPE html>
+            try:
+                # Read HTML content
+                with open(html_file, 'r', encoding='utf-8') as f:
+                    html_content = f.read()
+                
+                # Wrap with proper HTML structure if needed
+                if '<!DOCTYPE' not in html_content.upper():
+                    html_content = f'''<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -504,152 +786,140 @@ def convert_to_pdf(output_folder, config):
 {html_content}
 </body>
 </html>'''
-            
-            # Create temporary PDF
-            temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-            temp_pdfs.append(temp_pdf.name)
-            temp_pdf.close()
-            
-            # Convert HTML to PDF
-            html_doc = HTML(string=html_content)
-            html_doc.write_pdf(temp_pdf.name, stylesheets=[CSS(string=css_string)])
-            
-        except Exception as e:
-            print(f"    ✗ Failed to convert {html_file.name}: {str(e)}")
-            raise
-    
-    # Merge all PDFs
-    print("  Merging PDFs...")
-    merger = PdfMerger()
-    for temp_pdf in temp_pdfs:
-        merger.append(temp_pdf)
-    
-    merger.write(str(output_file))
-    merger.close()
-    
-    # Cleanup temp files
-    for temp_pdf in temp_pdfs:
+                
+                # Convert HTML to a temporary PDF
+                temp_pdf = os.path.join(temp_dir, f"slide_{i}.pdf")
+                html_doc = HTML(string=html_content)
+                html_doc.write_pdf(temp_pdf, stylesheets=[CSS(string=css_string)])
+                temp_pdfs.append(temp_pdf)
+                
+            except Exception as e:
+                print(f"    ✗ Failed to convert {html_file.name}: {str(e)}")
+                raise
+        
+        # Merge all PDFs
+        print("  Merging PDFs...")
+        merger = PdfMerger()
         try:
-            os.unlink(temp_pdf)
-        except:
-            pass
+            for temp_pdf in temp_pdfs:
+                merger.append(temp_pdf)
+            merger.write(str(output_file))
+        finally:
+            merger.close()
     
     print(f"  ✓ PDF saved: {output_file}")
     return output_file
 
 
-def convert_to_pptx(output_folder, config):
-    """Convert all HTML slides to a PPTX file."""
-    from bs4 import BeautifulSoup
-    from pptx import Presentation
-    from pptx.util import Inches, Pt
-    from pptx.dml.color import RGBColor
-    
-    slide_config = config.get("slides", {})
-    output_config = config.get("output", {})
-    
-    width = slide_config.get("width", 1280)
-    height = slide_config.get("height", 720)
-    
-    SCALE_FACTOR = Inches(13.333) / 1280
-    
-    html_files = sorted(
-        output_folder.glob("slide_*.html"),
-        key=lambda x: int(re.search(r'slide_(\d+)', x.name).group(1))
-    )
-    
-    if not html_files:
-        print("  No HTML slides found to convert")
-        return None
-    
-    print(f"\n  Converting {len(html_files)} slides to PPTX...")
+class PptxDeckBuilder:
+    """
+    Build a PPTX deck one slide at a time.
     
-    prs = Presentation()
-    prs.slide_width = Inches(13.333)
-    prs.slide_height = Inches(7.5)
+    add_slide() converts a slide as soon as its HTML exists, so during
+    generation the deck is ready to save right after the last slide instead
+    of re-reading and converting every file at the end. Not thread-safe.
+    """
     
-    for i, html_file in enumerate(html_files, 1):
-        print(f"    [{i}/{len(html_files)}] Converting: {html_file.name}")
-        
-        with open(html_file, 'r') as f:
-            html_content = f.read()
+    def __init__(self, config):
+        from pptx import Presentation
+        from pptx.util import Inches
         
-        soup = BeautifulSoup(html_content, 'html.parser')
-        slide_div = soup.find('div', id='slide')
+        self.config = config
+        self.scale = Inches(13.333) / 1280
+        self.prs = Presentation()
+        self.prs.slide_width = Inches(13.333)
+        self.prs.slide_height = Inches(7.5)
+        self.slide_count = 0
+    
+    def add_slide(self, html_content):
+        """Append a slide converted from its HTML; returns False if it has no slide container."""
+        from pptx.util import Pt
+        from pptx.dml.color import RGBColor
         
-        if not slide_div:
-            print(f"      Warning: No slide container found in {html_file.name}")
-            continue
+        parsed = parse_slide(html_content)
+        if parsed is None:
+            return False
         
-        blank_layout = prs.slide_layouts[6]
-        slide = prs.slides.add_slide(blank_layout)
+        blank_layout = self.prs.slide_layouts[6]
+        slide = self.prs.slides.add_slide(blank_layout)
+        self.slide_count += 1
         
-        style = slide_div.get('style', '')
-        bg_match = re.search(r'background-color:\s*(#[0-9a-fA-F]+)', style)
-        if bg_match:
-            hex_color = bg_match.group(1).lstrip('#')
-            rgb = tuple(int(hex_color[j:j+2], 16) for j in (0, 2, 4))
+        bg_match = SLIDE_BACKGROUND_PATTERN.search(parsed.style)
+        rgb = parse_hex_color(bg_match.group(1)) if bg_match else None
+        if rgb:
             slide.background.fill.solid()
             slide.background.fill.fore_color.rgb = RGBColor(*rgb)
         
-        for element in slide_div.find_all(recursive=False):
-            style = element.get('style', '')
-            styles = {}
-            for s in style.split(';'):
-                if ':' in s:
-                    k, v = s.split(':', 1)
-                    styles[k.strip()] = v.strip()
-            
-            def parse_val(val):
-                if not val:
-                    return 0
-                match = re.match(r"([\d\.]+)", val)
-                return float(match.group(1)) if match else 0
-            
-            left = parse_val(styles.get('left', '0')) * SCALE_FACTOR
-            top = parse_val(styles.get('top', '0')) * SCALE_FACTOR
-            width_px = parse_val(styles.get('width', '100')) * SCALE_FACTOR
-            height_px = parse_val(styles.get('height', '50')) * SCALE_FACTOR
+        for element in parsed.elements:
+            styles = element.styles
+            left = parse_px(styles.get('left', '0')) * self.scale
+            top = parse_px(styles.get('top', '0')) * self.scale
+            width_px = parse_px(styles.get('width', '100')) * self.scale
+            height_px = parse_px(styles.get('height', '50')) * self.scale
             
             shape = slide.shapes.add_textbox(left, top, width_px, height_px)
             tf = shape.text_frame
             tf.word_wrap = True
             
-            text = element.get_text(strip=True)
-            if text:
-                tf.paragraphs[0].text = text
+            if element.text:
+                tf.paragraphs[0].text = element.text
                 
-                font_size = parse_val(styles.get('font-size', '11'))
+                font_size = parse_px(styles.get('font-size', '11'))
                 if font_size:
                     tf.paragraphs[0].font.size = Pt(font_size * 0.75)
                 
-                color = styles.get('color', '#000000')
-                if color.startswith('#'):
-                    hex_c = color.lstrip('#')
-                    if len(hex_c) == 3:
-                        hex_c = ''.join([c*2 for c in hex_c])
-                    rgb = tuple(int(hex_c[j:j+2], 16) for j in (0, 2, 4))
+                rgb = parse_hex_color(styles.get('color', '#000000'))
+                if rgb:
                     tf.paragraphs[0].font.color.rgb = RGBColor(*rgb)
                 
                 if 'bold' in styles.get('font-weight', ''):
                     tf.paragraphs[0].font.bold = True
             
-            bg_color = styles.get('background-color')
-            if bg_color and bg_color.startswith('#'):
-                hex_c = bg_color.lstrip('#')
-                if len(hex_c) == 3:
-                    hex_c = ''.join([c*2 for c in hex_c])
-                rgb = tuple(int(hex_c[j:j+2], 16) for j in (0, 2, 4))
+            rgb = parse_hex_color(styles.get('background-color'))
+            if rgb:
                 shape.fill.solid()
                 shape.fill.fore_color.rgb = RGBColor(*rgb)
+        
+        return True
+    
+    def save(self, output_folder):
+        """Save the deck into output_folder as <output.file_name>_<date>.pptx; returns its path."""
+        output_config = self.config.get("output", {})
+        date_str = datetime.now().strftime("%Y-%m-%d")
+        output_name = output_config.get("file_name", "Presentation")
+        output_file = Path(output_folder) / f"{output_name}_{date_str}.pptx"
+        
+        self.prs.save(str(output_file))
+        print(f"  ✓ PPTX saved: {output_file}")
+        return output_file
+
+
+def convert_to_pptx(output_folder, config):
+    """Convert all HTML slides to a PPTX file."""
+    html_files = sorted(
+        output_folder.glob("slide_*.html"),
+        key=lambda x: int(re.search(r'slide_(\d+)', x.name).group(1))
+    )
     
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    output_name = output_config.get("file_name", "Presentation")
-    output_file = output_folder / f"{output_name}_{date_str}.pptx"
+    if not html_files:
+        print("  No HTML slides found to convert")
+        return None
     
-    prs.save(str(output_file))
-    print(f"  ✓ PPTX saved: {output_file}")
-    return output_file
+    print(f"\n  Converting {len(html_files)} slides to PPTX...")
+    
+    deck = PptxDeckBuilder(config)
+    
+    for i, html_file in enumerate(html_files, 1):
+        _check_abort(config)
+        print(f"    [{i}/{len(html_files)}] Converting: {html_file.name}")
+        
+        with open(html_file, 'r') as f:
+            html_content = f.read()
+        
+        if not deck.add_slide(html_content):
+            print(f"      Warning: No slide container found in {html_file.name}")
+    
+    return deck.save(output_folder)
 
 
 def main():
@@ -721,6 +991,7 @@ def main():
     
     # Content slides
     total_content_slides = len(slides_content)
+    prompt_template = build_content_prompt_template(config, instructions)
     for i, slide_content in enumerate(slides_content):
         print(f"  Generating slide {slide_number}: Content {i+1}/{total_content_slides}...")
         
@@ -731,7 +1002,8 @@ def main():
                     slide_number, 
                     total_content_slides + 2,  # +2 for title and ending
                     config, 
-                    instructions
+                    instructions,
+                    prompt_template=prompt_template
                 )
                 save_html_slide(html, slide_number, output_folder)
                 all_html_slides.append(html)
@@ -0,0 +1,12 @@
+-- Migration: Record the content hash of job inputs
+-- Date: 2026-10-18
+
+ALTER TABLE ppt_jobs ADD COLUMN IF NOT EXISTS input_sha256 VARCHAR(64);
+
+-- Inputs uploaded from now on are stored once per content hash and may be
+-- shared by several jobs; deleting a job only deletes its input when no other
+-- job references it. Older jobs keep input_sha256 NULL and their own input.
+
+-- CONCURRENTLY avoids locking ppt_jobs; run outside a transaction.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ppt_jobs_input_s3_key
+    ON ppt_jobs (input_s3_key);
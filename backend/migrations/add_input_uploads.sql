@@ -0,0 +1,23 @@
+-- Migration: Per-user ownership and upload time of content-addressed inputs
+-- Date: 2026-10-18
+
+-- Inputs live at inputs/<sha256><ext>, a key anyone knowing the hash can
+-- guess. Jobs may only be created from inputs the user uploaded, and storage
+-- GC keeps recently (re-)uploaded inputs even when no job uses them yet.
+CREATE TABLE IF NOT EXISTS input_uploads (
+    user_id VARCHAR NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    input_s3_key VARCHAR NOT NULL,
+    uploaded_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (user_id, input_s3_key)
+);
+
+CREATE INDEX IF NOT EXISTS ix_input_uploads_key_uploaded
+    ON input_uploads (input_s3_key, uploaded_at);
+
+-- Users keep access to the inputs of their existing jobs
+INSERT INTO input_uploads (user_id, input_s3_key, uploaded_at)
+SELECT user_id, input_s3_key, MIN(created_at)
+FROM ppt_jobs
+WHERE user_id IS NOT NULL
+GROUP BY user_id, input_s3_key
+ON CONFLICT DO NOTHING;
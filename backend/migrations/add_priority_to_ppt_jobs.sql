@@ -0,0 +1,10 @@
+-- Migration: Job priorities and the pending-job backlog index
+-- Date: 2026-10-18
+
+-- Stored as the enum name, like status
+ALTER TABLE ppt_jobs ADD COLUMN IF NOT EXISTS priority VARCHAR(16) NOT NULL DEFAULT 'INTERACTIVE';
+
+-- Admission control counts the pending jobs of the whole system on every
+-- job creation. CONCURRENTLY avoids locking ppt_jobs; run outside a transaction.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ppt_jobs_status_created
+    ON ppt_jobs (status, created_at);
@@ -0,0 +1,12 @@
+-- Migration: Enforce one slide row per (job_id, slide_number)
+-- Date: 2026-10-18
+
+-- Remove duplicates left by retried generation, keeping the newest row
+DELETE FROM slides a
+USING slides b
+WHERE a.job_id = b.job_id
+  AND a.slide_number = b.slide_number
+  AND (a.created_at, a.id) < (b.created_at, b.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_slides_job_id_slide_number
+    ON slides (job_id, slide_number);
@@ -0,0 +1,14 @@
+-- Migration: Scope jobs to their owner and index the job listing
+-- Date: 2026-10-18
+
+ALTER TABLE ppt_jobs ADD COLUMN IF NOT EXISTS user_id VARCHAR REFERENCES users(id) ON DELETE CASCADE;
+
+-- Existing jobs have no recorded owner and keep user_id NULL; they no longer
+-- show up in GET /api/v1/jobs.
+
+-- Keyset pagination on (created_at, id), newest first, per user and status.
+-- CONCURRENTLY avoids locking ppt_jobs; run outside a transaction.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ppt_jobs_user_created
+    ON ppt_jobs (user_id, created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ppt_jobs_user_status_created
+    ON ppt_jobs (user_id, status, created_at, id);
@@ -0,0 +1 @@
+"""Postprocess module initialization."""
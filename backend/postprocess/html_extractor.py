@@ -0,0 +1,209 @@
+"""Extract and repair slide HTML from raw LLM responses.
+
+The model is asked for a bare <div id="slide"> but regularly wraps it in
+markdown fences, adds prose before or after it, emits a second code block or
+stops before closing every tag. SlideHTMLExtractor makes one pass over the
+response (it can be fed while the response streams in), keeps only the
+<div id="slide"> subtree, closes any tags the model left open and drops stray
+closing tags. Direct children that reach below the safe bottom edge are
+reported so the layout fixer can deal with them without another LLM call.
+"""
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import List, Optional
+
+from postprocess.styles import parse_inline_style, parse_px
+
+# Lowest y (px) a content element may reach; the band below is the footer
+SAFE_BOTTOM = 670
+
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+})
+
+# Text inside these tags is shown verbatim, so a ``` there is slide content
+PREFORMATTED_ELEMENTS = frozenset({"pre", "code", "script", "style"})
+
+# A markdown fence at the start of a line ends the model's code block
+_FENCE_LINE = re.compile(r"(?:^|\n)[ \t]*```")
+
+
+@dataclass
+class Overflow:
+    """A direct child of #slide whose box crosses the safe bottom edge."""
+    index: int
+    tag: str
+    top: float
+    height: float
+
+    @property
+    def bottom(self) -> float:
+        return self.top + self.height
+
+
+@dataclass
+class ExtractedSlide:
+    """Result of extracting the slide root from an LLM response."""
+    html: str
+    repaired: bool = False
+    truncated: bool = False
+    dropped_chatter: bool = False
+    overflows: List[Overflow] = field(default_factory=list)
+
+
+class SlideHTMLExtractor(HTMLParser):
+    """Single-pass extractor for the <div id="slide"> subtree."""
+
+    def __init__(self, safe_bottom: float = SAFE_BOTTOM):
+        super().__init__(convert_charrefs=False)
+        self.safe_bottom = safe_bottom
+        self._out: List[str] = []
+        self._stack: List[str] = []
+        self._text: List[str] = []
+        self._started = False
+        self._child_index = 0
+        self.done = False
+        self.repaired = False
+        self.truncated = False
+        self.dropped_chatter = False
+        self.overflows: List[Overflow] = []
+
+    # -- HTMLParser callbacks -------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if self.done:
+            return
+        if not self._started:
+            if tag == "div" and dict(attrs).get("id") == "slide":
+                self._started = True
+                self._stack.append(tag)
+                self._out.append(self.get_starttag_text())
+            return
+
+        if len(self._stack) == 1:
+            self._check_child(tag, attrs)
+        self._out.append(self.get_starttag_text())
+        if tag not in VOID_ELEMENTS:
+            self._stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_text()
+        if self._inside():
+            if len(self._stack) == 1:
+                self._check_child(tag, attrs)
+            self._out.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if not self._inside() or tag in VOID_ELEMENTS:
+            return
+        if tag not in self._stack:
+            # Stray closing tag - drop it
+            self.repaired = True
+            return
+        while self._stack:
+            open_tag = self._stack.pop()
+            self._out.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+            # Closing an outer tag implicitly closes the inner ones
+            self.repaired = True
+        if not self._stack:
+            self.done = True
+
+    def handle_data(self, data):
+        # Text may arrive in several pieces while streaming; it is checked
+        # as one run when the next markup (or the end of input) arrives
+        self._text.append(data)
+
+    def handle_entityref(self, name):
+        self._flush_text()
+        if self._inside():
+            self._out.append(f"&{name};")
+
+    def handle_charref(self, name):
+        self._flush_text()
+        if self._inside():
+            self._out.append(f"&#{name};")
+
+    def handle_comment(self, data):
+        self._flush_text()
+        if self._inside():
+            self._out.append(f"<!--{data}-->")
+
+    # -- Public API -----------------------------------------------------------
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        if self._stack:
+            # Response ended (was cut off) with the slide root still open
+            self.truncated = True
+            self._close_open_tags()
+
+    def result(self) -> Optional[ExtractedSlide]:
+        """The extracted slide, or None if the input had no <div id="slide">."""
+        if not self._started:
+            return None
+        return ExtractedSlide(
+            html="".join(self._out).strip(),
+            repaired=self.repaired,
+            truncated=self.truncated,
+            dropped_chatter=self.dropped_chatter,
+            overflows=self.overflows,
+        )
+
+    # -- Helpers --------------------------------------------------------------
+
+    def _inside(self) -> bool:
+        return self._started and not self.done
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        data = "".join(self._text)
+        self._text.clear()
+        if not self._inside():
+            if data.strip():
+                self.dropped_chatter = True
+            return
+        if "```" in data and PREFORMATTED_ELEMENTS.isdisjoint(self._stack):
+            fence = _FENCE_LINE.search(data)
+            if fence:
+                # The code block ended before the slide root was closed
+                self._out.append(data[:fence.start()])
+                self.dropped_chatter = True
+                self._close_open_tags()
+                return
+        self._out.append(data)
+
+    def _close_open_tags(self):
+        if self._stack:
+            self.repaired = True
+            while self._stack:
+                self._out.append(f"</{self._stack.pop()}>")
+        if self._started:
+            self.done = True
+
+    def _check_child(self, tag, attrs):
+        index = self._child_index
+        self._child_index += 1
+        styles = parse_inline_style(dict(attrs).get("style") or "")
+        if "top" not in styles or "height" not in styles:
+            return
+        top = parse_px(styles["top"])
+        height = parse_px(styles["height"])
+        # Elements that start in the footer band (page number, source) are fine
+        if top < self.safe_bottom < top + height:
+            self.overflows.append(Overflow(index=index, tag=tag, top=top, height=height))
+
+
+def extract_slide_html(text: str, safe_bottom: float = SAFE_BOTTOM) -> Optional[ExtractedSlide]:
+    """Extract the <div id="slide"> subtree from an LLM response, or None if there is none."""
+    extractor = SlideHTMLExtractor(safe_bottom=safe_bottom)
+    extractor.feed(text)
+    extractor.close()
+    return extractor.result()
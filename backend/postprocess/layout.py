@@ -0,0 +1,331 @@
+"""Validate and repair the layout of absolutely positioned slide elements.
+
+Content slides are a <div id="slide"> whose direct children are positioned
+with inline top/left/width/height in px (the same boxes convert_to_pptx
+reads). The prompts ask the model to keep every box above the footer band and
+never let boxes overlap; when it does not, the slide can usually be fixed
+without another LLM call:
+
+1. Overlapping boxes are re-flowed: a box that collides with one above it is
+   narrowed when the collision is a small side-by-side overlap, otherwise it
+   is pushed below the other box.
+2. If the content then reaches below the safe bottom edge, the content zone
+   is scaled vertically to fit, and font sizes inside it are scaled with it.
+
+Title elements (above the content zone) are re-flowed among themselves the
+same way, with a tighter gap, before the content is placed below them; they
+are never scaled. The footer band is never moved.
+Elements without text (bars, background panels) are decoration and are not
+treated as colliding with anything.
+"""
+import html as html_lib
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from postprocess.html_extractor import SAFE_BOTTOM, VOID_ELEMENTS
+from postprocess.styles import parse_inline_style, format_inline_style, parse_px
+
+# Content area starts below the action title / subtitle
+CONTENT_TOP = 100
+# Minimum gaps the prompts ask for between stacked / side-by-side boxes
+VERTICAL_GAP = 15
+HORIZONTAL_GAP = 20
+# Gap between a title and a subtitle pushed below it
+TITLE_GAP = 5
+# Narrow a box instead of moving it when it keeps at least this share of its width
+MIN_NARROWED_WIDTH = 0.6
+# Smallest font size the fixer will scale text down to
+MIN_FONT_PX = 9.0
+
+
+@dataclass
+class Box:
+    """A direct child of #slide with a fully specified pixel box."""
+    index: int
+    token: int
+    left: float
+    top: float
+    width: float
+    height: float
+    has_text: bool
+    # Token range [token, end) covering the element and its descendants
+    end: int = 0
+
+    @property
+    def right(self) -> float:
+        return self.left + self.width
+
+    @property
+    def bottom(self) -> float:
+        return self.top + self.height
+
+    def overlap(self, other: "Box") -> Tuple[float, float]:
+        """Horizontal and vertical overlap in px (<= 0 means none)."""
+        x = min(self.right, other.right) - max(self.left, other.left)
+        y = min(self.bottom, other.bottom) - max(self.top, other.top)
+        return x, y
+
+
+@dataclass
+class LayoutReport:
+    """Layout problems found in a slide and what the fixer changed."""
+    overflows: List[int] = field(default_factory=list)
+    overlaps: List[Tuple[int, int]] = field(default_factory=list)
+    moved: List[int] = field(default_factory=list)
+    narrowed: List[int] = field(default_factory=list)
+    scale: float = 1.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.overflows and not self.overlaps
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.moved or self.narrowed or self.scale != 1.0)
+
+
+class _Token:
+    __slots__ = ("raw", "tag", "attrs", "self_closing", "_styles")
+
+    def __init__(self, raw, tag=None, attrs=None, self_closing=False):
+        self.raw = raw
+        self.tag = tag
+        self.attrs = attrs
+        self.self_closing = self_closing
+        self._styles = None
+
+    @property
+    def styles(self) -> dict:
+        """Inline styles of a start tag; edits are written back by render()."""
+        if self._styles is None:
+            self._styles = parse_inline_style(dict(self.attrs).get("style") or "")
+        return self._styles
+
+    def render(self):
+        """Rebuild the start tag from attrs with the (edited) styles."""
+        attrs = []
+        for name, value in self.attrs:
+            if name == "style":
+                value = format_inline_style(self.styles)
+            if value is None:
+                attrs.append(f" {name}")
+            else:
+                attrs.append(f' {name}="{html_lib.escape(value, quote=True)}"')
+        closing = "/>" if self.self_closing and self.raw.rstrip().endswith("/>") else ">"
+        self.raw = f"<{self.tag}{''.join(attrs)}{closing}"
+
+
+class _SlideTokenizer(HTMLParser):
+    """Tokenizes slide HTML and records the boxes of #slide's direct children."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.tokens: List[_Token] = []
+        self.boxes: List[Box] = []
+        self._depth = 0
+        self._root_depth: Optional[int] = None
+        self._child_index = 0
+        self._open_box: Optional[Box] = None
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, self_closing=tag in VOID_ELEMENTS)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, self_closing=True)
+
+    def handle_endtag(self, tag):
+        self.tokens.append(_Token(f"</{tag}>"))
+        if tag in VOID_ELEMENTS:
+            return
+        self._depth -= 1
+        if self._open_box is not None and self._depth == self._root_depth:
+            self._open_box.end = len(self.tokens)
+            self._open_box = None
+        if self._root_depth is not None and self._depth < self._root_depth:
+            self._root_depth = None
+
+    def handle_data(self, data):
+        self.tokens.append(_Token(data))
+        if self._open_box is not None and data.strip():
+            self._open_box.has_text = True
+
+    def handle_entityref(self, name):
+        self.handle_data(f"&{name};")
+
+    def handle_charref(self, name):
+        self.handle_data(f"&#{name};")
+
+    def handle_comment(self, data):
+        self.tokens.append(_Token(f"<!--{data}-->"))
+
+    def _start(self, tag, attrs, self_closing):
+        token_index = len(self.tokens)
+        self.tokens.append(_Token(self.get_starttag_text(), tag, attrs, self_closing))
+
+        if self._root_depth is None:
+            if tag == "div" and dict(attrs).get("id") == "slide":
+                self._root_depth = self._depth + 1
+        elif self._depth == self._root_depth:
+            self._add_child(token_index, tag, attrs, self_closing)
+
+        if not self_closing:
+            self._depth += 1
+
+    def _add_child(self, token_index, tag, attrs, self_closing):
+        index = self._child_index
+        self._child_index += 1
+        styles = parse_inline_style(dict(attrs).get("style") or "")
+        if not all(key in styles for key in ("top", "left", "width", "height")):
+            return
+        if not all(styles[key].strip().endswith("px") for key in ("top", "left", "width", "height")):
+            return
+        box = Box(
+            index=index,
+            token=token_index,
+            left=parse_px(styles["left"]),
+            top=parse_px(styles["top"]),
+            width=parse_px(styles["width"]),
+            height=parse_px(styles["height"]),
+            has_text=tag == "img",
+        )
+        self.boxes.append(box)
+        if self_closing:
+            box.end = token_index + 1
+        else:
+            self._open_box = box
+
+
+def _parse(slide_html: str) -> _SlideTokenizer:
+    tokenizer = _SlideTokenizer()
+    tokenizer.feed(slide_html)
+    tokenizer.close()
+    for box in tokenizer.boxes:
+        if not box.end:
+            box.end = len(tokenizer.tokens)
+    return tokenizer
+
+
+def _content_boxes(boxes: List[Box], safe_bottom: float) -> List[Box]:
+    """Boxes the fixer may move: text-bearing, below the title, above the footer."""
+    return [
+        box for box in boxes
+        if box.has_text and box.top >= CONTENT_TOP and box.top < safe_bottom
+    ]
+
+
+def _find_problems(boxes: List[Box], safe_bottom: float, report: LayoutReport):
+    report.overflows = [
+        box.index for box in boxes
+        if box.top < safe_bottom < box.bottom
+    ]
+    text_boxes = [box for box in boxes if box.has_text]
+    report.overlaps = []
+    for i, a in enumerate(text_boxes):
+        for b in text_boxes[i + 1:]:
+            x, y = a.overlap(b)
+            if x > 0 and y > 0:
+                report.overlaps.append((a.index, b.index))
+
+
+def validate_slide_layout(slide_html: str, safe_bottom: float = SAFE_BOTTOM) -> LayoutReport:
+    """Report overflowing and overlapping elements without changing anything."""
+    report = LayoutReport()
+    _find_problems(_parse(slide_html).boxes, safe_bottom, report)
+    return report
+
+
+def _reflow(content: List[Box], fixed: List[Box], report: LayoutReport,
+            vertical_gap: float = VERTICAL_GAP):
+    """Resolve collisions by narrowing or pushing boxes down, in top-to-bottom order."""
+    placed = list(fixed)
+    for box in sorted(content, key=lambda b: (b.top, b.left)):
+        # Each push moves the box strictly down, so this terminates
+        for _ in range(len(placed) + 1):
+            blocker = next(
+                (other for other in placed if min(box.overlap(other)) > 0),
+                None,
+            )
+            if blocker is None:
+                break
+            x, y = box.overlap(blocker)
+            if x <= y and box.left > blocker.left:
+                new_width = box.right - (blocker.right + HORIZONTAL_GAP)
+                if new_width >= box.width * MIN_NARROWED_WIDTH:
+                    box.left = blocker.right + HORIZONTAL_GAP
+                    box.width = new_width
+                    report.narrowed.append(box.index)
+                    continue
+            box.top = blocker.bottom + vertical_gap
+            report.moved.append(box.index)
+        placed.append(box)
+
+
+def _fit_vertically(content: List[Box], safe_bottom: float) -> float:
+    """Scale the content zone so nothing reaches below safe_bottom; returns the factor."""
+    if not content:
+        return 1.0
+    zone_top = min(box.top for box in content)
+    zone_bottom = max(box.bottom for box in content)
+    if zone_bottom <= safe_bottom or zone_bottom <= zone_top:
+        return 1.0
+    scale = (safe_bottom - zone_top) / (zone_bottom - zone_top)
+    for box in content:
+        box.top = zone_top + (box.top - zone_top) * scale
+        box.height = box.height * scale
+    return scale
+
+
+def _px(value: float) -> str:
+    return f"{int(value)}px" if value == int(value) else f"{value:.1f}px"
+
+
+def _scale_fonts(tokens: List[_Token], start: int, end: int, scale: float):
+    for token in tokens[start:end]:
+        if token.tag is None:
+            continue
+        font_size = token.styles.get("font-size", "")
+        if not font_size.strip().endswith("px"):
+            continue
+        current = parse_px(font_size)
+        token.styles["font-size"] = _px(round(max(current * scale, min(current, MIN_FONT_PX)), 1))
+        token.render()
+
+
+def fix_slide_layout(slide_html: str, safe_bottom: float = SAFE_BOTTOM) -> Tuple[str, LayoutReport]:
+    """
+    Re-flow overlapping boxes and shrink content that overflows the safe bottom.
+
+    Returns the (possibly unchanged) HTML and a report. The report's
+    overflows/overlaps describe the slide as it was received.
+    """
+    tokenizer = _parse(slide_html)
+    report = LayoutReport()
+    _find_problems(tokenizer.boxes, safe_bottom, report)
+    if report.ok:
+        return slide_html, report
+
+    content = _content_boxes(tokenizer.boxes, safe_bottom)
+    # Title elements are separated first, then push content below them; the
+    # footer band is left alone and handled by fitting the content zone above it
+    titles = [box for box in tokenizer.boxes if box.has_text and box.top < CONTENT_TOP]
+    originals = {box.index: (box.left, box.top, box.width, box.height) for box in titles + content}
+
+    _reflow(titles, [], report, vertical_gap=TITLE_GAP)
+    _reflow(content, titles, report)
+    report.scale = _fit_vertically(content, safe_bottom)
+
+    tokens = tokenizer.tokens
+    for box in titles + content:
+        if originals[box.index] == (box.left, box.top, box.width, box.height):
+            continue
+        token = tokens[box.token]
+        token.styles.update(left=_px(round(box.left, 1)), top=_px(round(box.top, 1)),
+                            width=_px(round(box.width, 1)), height=_px(round(box.height, 1)))
+        token.render()
+
+    if report.scale != 1.0:
+        for box in content:
+            _scale_fonts(tokens, box.token, box.end, report.scale)
+
+    return "".join(token.raw for token in tokens), report
@@ -0,0 +1,92 @@
+"""Read the positioned elements of a slide for the PPTX converter.
+
+The converter only needs the inline style of <div id="slide"> and, for each
+of its direct children, the parsed inline style and the text. lxml (C) reads
+that several times faster than BeautifulSoup's pure-Python html.parser, so it
+is used when installed; BeautifulSoup is the fallback. Both backends return
+the same result for well-formed slides; for broken markup the trees may
+differ where libxml2 and html.parser repair it differently.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+from postprocess.styles import parse_inline_style
+
+try:
+    import lxml.html
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "bs4"
+
+# Elements whose content is not slide text (BeautifulSoup's get_text skips them too)
+_NON_TEXT_ELEMENTS = frozenset(("script", "style", "template"))
+
+
+@dataclass
+class SlideElement:
+    """A direct child of #slide."""
+    styles: dict
+    # Text of the element and its descendants, each piece stripped
+    text: str
+
+
+@dataclass
+class ParsedSlide:
+    # Raw style attribute of #slide
+    style: str
+    elements: List[SlideElement]
+
+
+def parse_slide(html: str, parser: Optional[str] = None) -> Optional[ParsedSlide]:
+    """
+    Parse a slide's HTML with `parser` ("lxml" or "bs4", default HTML_PARSER).
+    Returns None if there is no <div id="slide">.
+    """
+    if (parser or HTML_PARSER) == "lxml":
+        return _parse_lxml(html)
+    return _parse_bs4(html)
+
+
+def _parse_lxml(html: str) -> Optional[ParsedSlide]:
+    if not html or not html.strip():
+        return None
+    root = lxml.html.document_fromstring(html)
+    slide_div = root.find('.//div[@id="slide"]')
+    if slide_div is None:
+        return None
+    elements = [
+        SlideElement(parse_inline_style(child.get("style", "")), _lxml_text(child))
+        # Comments and processing instructions have a non-string tag
+        for child in slide_div if isinstance(child.tag, str)
+    ]
+    return ParsedSlide(slide_div.get("style", ""), elements)
+
+
+def _lxml_text(element) -> str:
+    parts = []
+
+    def collect(node):
+        if node.text and (node is element or node.tag not in _NON_TEXT_ELEMENTS):
+            parts.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str):
+                collect(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    collect(element)
+    return "".join(stripped for stripped in (part.strip() for part in parts) if stripped)
+
+
+def _parse_bs4(html: str) -> Optional[ParsedSlide]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    slide_div = soup.find("div", id="slide")
+    if not slide_div:
+        return None
+    elements = [
+        SlideElement(parse_inline_style(child.get("style", "")), child.get_text(strip=True))
+        for child in slide_div.find_all(recursive=False)
+    ]
+    return ParsedSlide(slide_div.get("style", ""), elements)
@@ -0,0 +1,54 @@
+"""Inline style parsing shared by the slide post-processors."""
+import re
+from functools import lru_cache
+
+_PX_VALUE = re.compile(r"\s*(-?[\d.]+)")
+
+
+@lru_cache(maxsize=4096)
+def _parse_inline_style(style: str) -> tuple:
+    items = []
+    for declaration in style.split(";"):
+        if ":" in declaration:
+            key, value = declaration.split(":", 1)
+            items.append((key.strip().lower(), value.strip()))
+    return tuple(items)
+
+
+def parse_inline_style(style: str) -> dict:
+    """Parse a style="" attribute into {property: value}. Results are cached per string."""
+    if not style:
+        return {}
+    return dict(_parse_inline_style(style))
+
+
+def format_inline_style(styles: dict) -> str:
+    """Serialize {property: value} back into a style attribute value."""
+    return "; ".join(f"{key}:{value}" for key, value in styles.items()) + ";"
+
+
+def parse_px(value, default=0.0) -> float:
+    """Read the leading number of a CSS length ("120px" -> 120.0)."""
+    if not value:
+        return default
+    match = _PX_VALUE.match(value)
+    if not match:
+        return default
+    try:
+        return float(match.group(1))
+    except ValueError:
+        return default
+
+
+@lru_cache(maxsize=1024)
+def parse_hex_color(value: str):
+    """Read a "#rgb" / "#rrggbb" color into an (r, g, b) tuple; None if it isn't one."""
+    if not value or not value.startswith("#"):
+        return None
+    hex_value = value[1:]
+    if len(hex_value) == 3:
+        hex_value = "".join(c * 2 for c in hex_value)
+    try:
+        return tuple(int(hex_value[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return None
@@ -1,4 +1,24 @@
+from prompts.templates import PromptTemplate
+
+# Arguments of get_content_slide_prompt that change from slide to slide
+CONTENT_SLIDE_FIELDS = ("page_title", "content_str", "slide_number", "total_slides")
+
+# Arguments of get_batched_content_slides_prompt that change from batch to batch
+BATCHED_CONTENT_FIELDS = ("slides_block", "slide_count")
+
+# Delimiter the model must print before each slide in a batched response
+SLIDE_BREAK_MARKER = "<!-- SLIDE_BREAK {slide_number} -->"
+
+
 def get_content_slide_prompt(page_title, content_str, slide_number, total_slides, instructions, styling, width, height):
+    return (
+        _content_slide_header(page_title, content_str, slide_number, total_slides)
+        + _content_slide_rules(page_title, slide_number, instructions, styling, width, height)
+        + SINGLE_SLIDE_OUTPUT_RULES
+    )
+
+
+def _content_slide_header(page_title, content_str, slide_number, total_slides):
     return f"""
 You are a professional presentation designer. Create a single HTML slide based on the following content.
 
@@ -9,7 +29,11 @@ Content:
 
 This is slide {slide_number} of {total_slides} content slides.
 
-CRITICAL DATA RULES - MOST IMPORTANT:
+"""
+
+
+def _content_slide_rules(page_title, slide_number, instructions, styling, width, height):
+    return f"""CRITICAL DATA RULES - MOST IMPORTANT:
 ⚠️ DO NOT add any text, data, or content from your side
 ⚠️ Use ONLY the data provided in the Content section above
 ⚠️ If text is too big to fit: Remove jargons, filler words, and unnecessary text
@@ -403,6 +427,69 @@ DIAGRAM SIZE CHECK:
 
 IF ANY BOTTOM > 675 OR ANY OVERLAP DETECTED → REJECT AND REDESIGN WITH COLUMNS/QUADRANTS/DYNAMIC SIZING/SEPARATE PAGES
 
-Output ONLY the raw HTML code, starting with <div id="slide"> and ending with </div>.
+"""
+
+
+SINGLE_SLIDE_OUTPUT_RULES = """Output ONLY the raw HTML code, starting with <div id="slide"> and ending with </div>.
 DO NOT use markdown code blocks. DO NOT include explanations. DO NOT add any text before or after the HTML.
-"""
\ No newline at end of file
+"""
+
+
+def compile_content_slide_prompt(instructions, styling, width, height):
+    """Render the job-level part of the content prompt once; fill slides with .render()."""
+    return PromptTemplate(
+        get_content_slide_prompt,
+        CONTENT_SLIDE_FIELDS,
+        instructions=instructions,
+        styling=styling,
+        width=width,
+        height=height,
+    )
+
+
+def format_batch_slides(slides, total_slides):
+    """Format [(slide_number, page_title, content_str), ...] as the content block of a batched prompt."""
+    blocks = []
+    for slide_number, page_title, content_str in slides:
+        blocks.append(f"""=== SLIDE {slide_number} of {total_slides} ===
+Title: {page_title}
+Content:
+{content_str}
+""")
+    return "\n".join(blocks)
+
+
+def get_batched_content_slides_prompt(slides_block, slide_count, instructions, styling, width, height):
+    example_break = SLIDE_BREAK_MARKER.format(slide_number="N")
+    return f"""
+You are a professional presentation designer. Create {slide_count} separate HTML slides, one for each content block below.
+
+Each block is exactly one slide. NEVER move content from one block to another, merge blocks, or skip a block.
+
+CONTENT TO PRESENT (USE EXACTLY AS GIVEN - DO NOT ADD OR MODIFY):
+
+{slides_block}
+The rules below apply to EVERY slide on its own. "Content section" means that slide's own Content,
+the title means that slide's own Title, and the page number is that slide's own SLIDE number.
+
+""" + _content_slide_rules(
+        "the slide's own Title", "N", instructions, styling, width, height
+    ) + f"""OUTPUT FORMAT - MANDATORY:
+Output exactly {slide_count} slides, in the same order as the content blocks.
+Immediately before each slide, output this delimiter on its own line, with N replaced by that slide's number:
+{example_break}
+Then output the raw HTML for that slide, starting with <div id="slide"> and ending with </div>.
+DO NOT use markdown code blocks. DO NOT include explanations. DO NOT add any text other than the delimiters and the HTML.
+"""
+
+
+def compile_batched_content_prompt(instructions, styling, width, height):
+    """Render the job-level part of the batched content prompt once; fill batches with .render()."""
+    return PromptTemplate(
+        get_batched_content_slides_prompt,
+        BATCHED_CONTENT_FIELDS,
+        instructions=instructions,
+        styling=styling,
+        width=width,
+        height=height,
+    )
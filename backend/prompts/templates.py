@@ -0,0 +1,42 @@
+"""Precompiled prompt templates.
+
+The slide prompts are large f-strings where almost everything depends only on
+the job (instructions, styling, slide size) and a handful of fields change per
+slide. A PromptTemplate renders the job-level text once and keeps the
+per-slide fields as open slots, so the per-slide cost is a single join.
+"""
+import re
+
+_SLOT_MARK = "\x00"
+_SLOT_PATTERN = re.compile(f"{_SLOT_MARK}(\\w+){_SLOT_MARK}")
+
+
+class PromptTemplate:
+    """A prompt with its static portion rendered and per-slide slots left open."""
+
+    def __init__(self, builder, fields, **static):
+        """
+        Compile a prompt builder into a template.
+
+        Args:
+            builder: Prompt function (e.g. get_content_slide_prompt)
+            fields: Names of the builder arguments that change per slide
+            **static: Builder arguments that stay fixed for the whole job
+        """
+        self.fields = tuple(fields)
+        slots = {name: f"{_SLOT_MARK}{name}{_SLOT_MARK}" for name in self.fields}
+        text = builder(**static, **slots)
+
+        # re.split with one group alternates literal text and slot names
+        parts = _SLOT_PATTERN.split(text)
+        self._literals = parts[0::2]
+        self._slots = parts[1::2]
+
+    def render(self, **values) -> str:
+        """Fill the per-slide slots and return the full prompt."""
+        literals = self._literals
+        out = [literals[0]]
+        for i, name in enumerate(self._slots):
+            out.append(str(values[name]))
+            out.append(literals[i + 1])
+        return "".join(out)
@@ -0,0 +1,26 @@
+"""
+Unit tests for code that runs without a database, Redis or S3.
+
+Run from backend/:  python -m pytest tests
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The app's engines are created at import time; no test connects to them
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def local_s3(monkeypatch, tmp_path):
+    """S3Service on the Dev Mode local-storage backend, rooted in tmp_path."""
+    from app.services.s3_service import S3Service
+
+    s3 = S3Service()
+    monkeypatch.setattr(s3.settings, "aws_access_key_id", "placeholder_access_key")
+    s3.local_storage_base = tmp_path
+    return s3
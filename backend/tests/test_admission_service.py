@@ -0,0 +1,144 @@
+"""AdmissionService with a stub job repository."""
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.job import JobPriority, JobStatus
+from app.services.admission_service import (
+    DEFAULT_RETRY_AFTER,
+    MAX_RETRY_AFTER,
+    MIN_RETRY_AFTER,
+    AdmissionRejectedError,
+    AdmissionService,
+)
+from app.repositories.job_repository import AsyncJobRepository
+
+
+class StubJobRepository:
+    def __init__(self, unfinished=0, pending=0, finished=0, durations=()):
+        self.unfinished = unfinished
+        self.pending = pending
+        self.finished = finished
+        self.durations = list(durations)
+        self.calls = []
+
+    async def lock_user(self, user_id):
+        self.calls.append("lock_user")
+
+    async def count_unfinished_jobs(self, user_id):
+        self.calls.append("count_unfinished_jobs")
+        return self.unfinished
+
+    async def count_jobs_by_status(self, status):
+        assert status == JobStatus.PENDING
+        return self.pending
+
+    async def finished_jobs_since(self, since):
+        return self.finished, self.durations
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    service = AdmissionService(StubJobRepository())
+    for name, value in {
+        "max_pending_jobs_per_user": 3,
+        "max_running_jobs_per_user": 2,
+        "max_pending_jobs": 10,
+        "batch_backlog_share": 0.5,
+        "admission_throughput_window": 600,
+    }.items():
+        monkeypatch.setattr(service.settings, name, value)
+    return service.settings
+
+
+def admit(repo, priority=JobPriority.INTERACTIVE):
+    return asyncio.run(AdmissionService(repo).admit("user-1", priority))
+
+
+def rejection(repo, priority=JobPriority.INTERACTIVE):
+    with pytest.raises(AdmissionRejectedError) as info:
+        admit(repo, priority)
+    return info.value
+
+
+def test_admits_below_limits(settings):
+    admit(StubJobRepository(unfinished=2, pending=9))
+    admit(StubJobRepository(unfinished=2, pending=4), JobPriority.BATCH)
+
+
+def test_user_is_locked_before_counting(settings):
+    repo = StubJobRepository()
+
+    admit(repo)
+
+    assert repo.calls == ["lock_user", "count_unfinished_jobs"]
+
+
+def test_lock_user_selects_for_update():
+    class Session:
+        async def execute(self, statement):
+            self.sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    session = Session()
+    asyncio.run(AsyncJobRepository(session).lock_user("user-1"))
+
+    assert session.sql.endswith("FOR UPDATE")
+    assert "FROM users" in session.sql
+
+
+def test_user_limit(settings):
+    # 2 jobs must finish; 2 run at a time, 30s each on average
+    error = rejection(StubJobRepository(unfinished=4, durations=[20.0, 40.0]))
+
+    assert "limit 3" in str(error)
+    assert error.retry_after == 30
+
+
+def test_user_limit_without_recent_jobs(settings):
+    assert rejection(StubJobRepository(unfinished=3)).retry_after == DEFAULT_RETRY_AFTER
+
+
+def test_system_backlog(settings):
+    # 1 job must finish; 20 finished in the last 600s
+    error = rejection(StubJobRepository(pending=10, finished=20))
+
+    assert error.retry_after == 30
+
+
+def test_system_backlog_without_recent_jobs(settings):
+    assert rejection(StubJobRepository(pending=10)).retry_after == DEFAULT_RETRY_AFTER
+
+
+def test_batch_jobs_get_a_share_of_the_backlog(settings):
+    repo = StubJobRepository(pending=5, finished=600)
+
+    admit(repo, JobPriority.INTERACTIVE)
+    assert rejection(repo, JobPriority.BATCH).retry_after == MIN_RETRY_AFTER
+
+
+def test_backlog_limit(settings):
+    service = AdmissionService(StubJobRepository())
+
+    assert service.backlog_limit(JobPriority.INTERACTIVE) == 10
+    assert service.backlog_limit(JobPriority.BATCH) == 5
+    settings.batch_backlog_share = 0.01
+    assert service.backlog_limit(JobPriority.BATCH) == 1
+    settings.max_pending_jobs = 0
+    assert service.backlog_limit(JobPriority.BATCH) == 0
+
+
+def test_zero_limits_admit_everything(settings):
+    settings.max_pending_jobs_per_user = 0
+    settings.max_pending_jobs = 0
+
+    repo = StubJobRepository(unfinished=1000, pending=1000)
+
+    admit(repo, JobPriority.BATCH)
+    assert repo.calls == []
+
+
+def test_retry_after_is_capped(settings):
+    error = rejection(StubJobRepository(unfinished=1000, durations=[3600.0]))
+
+    assert error.retry_after == MAX_RETRY_AFTER
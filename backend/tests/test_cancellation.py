@@ -0,0 +1,80 @@
+"""CancellationToken with a stub Redis client."""
+import pytest
+
+from app.core import cancellation
+from app.core.cancellation import CancellationToken, JobCancelled
+
+
+class StubRedis:
+    def __init__(self, flags=(), error=None):
+        self.flags = set(flags)
+        self.error = error
+        self.checks = 0
+
+    def exists(self, key):
+        self.checks += 1
+        if self.error:
+            raise self.error
+        return int(key in self.flags)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = StubRedis()
+    failures = []
+    monkeypatch.setattr(cancellation, "shared_redis", lambda: client)
+    monkeypatch.setattr(cancellation, "redis_failed", failures.append)
+    client.failures = failures
+    return client
+
+
+def test_not_cancelled(redis):
+    token = CancellationToken("job-1", check_interval=0)
+
+    assert not token.is_cancelled()
+    assert not token()
+    token.raise_if_cancelled()
+
+
+def test_flag_cancels(redis):
+    token = CancellationToken("job-1", check_interval=0)
+    redis.flags.add("job:cancel:job-1")
+
+    assert token.is_cancelled()
+    with pytest.raises(JobCancelled):
+        token.raise_if_cancelled()
+
+
+def test_checks_at_most_once_per_interval(redis):
+    token = CancellationToken("job-1", check_interval=3600)
+
+    assert not token.is_cancelled()
+    redis.flags.add("job:cancel:job-1")
+    assert not token.is_cancelled()
+    assert redis.checks == 1
+
+
+def test_stays_cancelled(redis):
+    token = CancellationToken("job-1", check_interval=0)
+    redis.flags.add("job:cancel:job-1")
+    assert token.is_cancelled()
+
+    redis.flags.clear()
+    assert token.is_cancelled()
+    assert redis.checks == 1
+
+
+def test_fallback_when_redis_unavailable(monkeypatch):
+    monkeypatch.setattr(cancellation, "shared_redis", lambda: None)
+
+    assert CancellationToken("job-1", check_interval=0, fallback=lambda: True).is_cancelled()
+    assert not CancellationToken("job-1", check_interval=0, fallback=lambda: False).is_cancelled()
+    assert not CancellationToken("job-1", check_interval=0).is_cancelled()
+
+
+def test_fallback_when_redis_fails(redis):
+    redis.error = ConnectionError("down")
+    token = CancellationToken("job-1", check_interval=0, fallback=lambda: True)
+
+    assert token.is_cancelled()
+    assert redis.failures == [redis.error]
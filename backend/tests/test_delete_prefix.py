@@ -0,0 +1,104 @@
+"""S3Service.delete_prefix on local storage and against a stub S3 client."""
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.s3_service import MAX_DELETE_KEYS
+
+
+def write(root, key, data=b"x"):
+    path = root / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_local_deletes_folder_and_tallies(local_s3, tmp_path):
+    write(tmp_path, "htmls/abc/slide_1.html", b"12345")
+    write(tmp_path, "htmls/abc/assets/logo.png", b"123")
+    write(tmp_path, "htmls/abcd/slide_1.html")
+    write(tmp_path, "htmls/other.html")
+
+    deleted = local_s3.delete_prefix("htmls/abc/")
+
+    assert (deleted.count, deleted.bytes) == (2, 8)
+    assert not (tmp_path / "htmls/abc").exists()
+    assert (tmp_path / "htmls/abcd/slide_1.html").exists()
+    assert (tmp_path / "htmls/other.html").exists()
+
+
+def test_local_missing_prefix(local_s3):
+    deleted = local_s3.delete_prefix("htmls/missing/")
+
+    assert (deleted.count, deleted.bytes) == (0, 0)
+
+
+def test_prefix_must_end_with_slash(local_s3, tmp_path):
+    write(tmp_path, "htmls/abc/slide_1.html")
+
+    with pytest.raises(ValueError):
+        local_s3.delete_prefix("htmls/abc")
+    assert (tmp_path / "htmls/abc/slide_1.html").exists()
+
+
+class StubPaginator:
+    def __init__(self, keys):
+        self.keys = keys
+
+    def paginate(self, Bucket, Prefix, PaginationConfig):
+        keys = [key for key in self.keys if key.startswith(Prefix)]
+        size = PaginationConfig["PageSize"]
+        for start in range(0, len(keys), size):
+            yield {"Contents": [
+                {"Key": key, "Size": 10, "LastModified": datetime(2026, 1, 1, tzinfo=timezone.utc)}
+                for key in keys[start:start + size]
+            ]}
+        if not keys:
+            yield {}
+
+
+class StubS3Client:
+    def __init__(self, keys, errors=()):
+        self.keys = keys
+        self.errors = list(errors)
+        self.delete_calls = []
+
+    def get_paginator(self, name):
+        assert name == "list_objects_v2"
+        return StubPaginator(self.keys)
+
+    def delete_objects(self, Bucket, Delete):
+        self.delete_calls.append([obj["Key"] for obj in Delete["Objects"]])
+        return {"Errors": self.errors}
+
+
+@pytest.fixture
+def s3(local_s3, monkeypatch):
+    monkeypatch.setattr(local_s3.settings, "aws_access_key_id", "test-key")
+    return local_s3
+
+
+def test_s3_deletes_in_pages(s3):
+    keys = [f"htmls/abc/slide_{i}.html" for i in range(MAX_DELETE_KEYS + 5)]
+    s3.s3_client = StubS3Client(keys + ["htmls/abcd/slide_1.html"])
+
+    deleted = s3.delete_prefix("htmls/abc/")
+
+    assert [len(call) for call in s3.s3_client.delete_calls] == [MAX_DELETE_KEYS, 5]
+    assert sum(s3.s3_client.delete_calls, []) == keys
+    assert (deleted.count, deleted.bytes) == (len(keys), 10 * len(keys))
+
+
+def test_s3_empty_prefix(s3):
+    s3.s3_client = StubS3Client([])
+
+    deleted = s3.delete_prefix("htmls/abc/")
+
+    assert s3.s3_client.delete_calls == []
+    assert deleted.count == 0
+
+
+def test_s3_delete_errors_raise(s3):
+    s3.s3_client = StubS3Client(["htmls/abc/a"], errors=[{"Key": "htmls/abc/a", "Message": "Access Denied"}])
+
+    with pytest.raises(Exception, match="Access Denied"):
+        s3.delete_prefix("htmls/abc/")
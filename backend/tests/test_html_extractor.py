@@ -0,0 +1,115 @@
+"""Extracting and repairing slide HTML from LLM responses."""
+from postprocess.html_extractor import SlideHTMLExtractor, extract_slide_html
+
+SLIDE = '<div id="slide" style="width:1280px; height:720px;"><h1>Title</h1><p>Body &amp; more</p></div>'
+
+
+def test_bare_slide_is_unchanged():
+    extracted = extract_slide_html(SLIDE)
+
+    assert extracted.html == SLIDE
+    assert not (extracted.repaired or extracted.truncated or extracted.dropped_chatter)
+    assert extracted.overflows == []
+
+
+def test_no_slide_root():
+    assert extract_slide_html("<div><p>not a slide</p></div>") is None
+    assert extract_slide_html("") is None
+
+
+def test_strips_fences_and_prose():
+    response = f"Sure! Here is your slide:\n```html\n{SLIDE}\n```\nLet me know if you want changes."
+
+    extracted = extract_slide_html(response)
+
+    assert extracted.html == SLIDE
+    assert extracted.dropped_chatter
+    assert not extracted.repaired
+
+
+def test_ignores_a_second_code_block():
+    other = SLIDE.replace("Title", "Another")
+    response = f"```html\n{SLIDE}\n```\nAlternative:\n```html\n{other}\n```"
+
+    assert extract_slide_html(response).html == SLIDE
+
+
+def test_fence_before_slide_root_closes_it():
+    response = '```html\n<div id="slide"><div><p>Cut short\n```\nThat is all.'
+
+    extracted = extract_slide_html(response)
+
+    assert extracted.html == '<div id="slide"><div><p>Cut short</p></div></div>'
+    assert extracted.repaired
+    assert extracted.dropped_chatter
+    assert not extracted.truncated
+
+
+def test_backticks_in_preformatted_text_are_content():
+    slide = '<div id="slide"><pre>\n```\ncode\n```\n</pre></div>'
+
+    extracted = extract_slide_html(slide)
+
+    assert extracted.html == slide
+    assert not extracted.dropped_chatter
+
+
+def test_closes_tags_left_open_by_a_truncated_response():
+    extracted = extract_slide_html('<div id="slide"><ul><li>One<li>Two')
+
+    assert extracted.html == '<div id="slide"><ul><li>One<li>Two</li></li></ul></div>'
+    assert extracted.truncated
+    assert extracted.repaired
+
+
+def test_drops_stray_closing_tags():
+    extracted = extract_slide_html('<div id="slide"><p>Text</span></p></div>')
+
+    assert extracted.html == '<div id="slide"><p>Text</p></div>'
+    assert extracted.repaired
+
+
+def test_closing_an_outer_tag_closes_inner_ones():
+    extracted = extract_slide_html('<div id="slide"><div><b>Bold</div></div>')
+
+    assert extracted.html == '<div id="slide"><div><b>Bold</b></div></div>'
+    assert extracted.repaired
+
+
+def test_keeps_void_elements_entities_and_comments():
+    slide = '<div id="slide"><img src="a.png"><br/><!-- note --><p>&lt;x&gt; &#169;</p></div>'
+
+    assert extract_slide_html(slide).html == slide
+
+
+def test_flags_children_crossing_the_safe_bottom():
+    slide = (
+        '<div id="slide">'
+        '<div style="position:absolute; top:100px; height:200px;">Fits</div>'
+        '<div style="position:absolute; top:600px; height:100px;">Overflows</div>'
+        '<div style="position:absolute; top:680px; height:20px;">Footer</div>'
+        '<div style="position:absolute; top:650px;">No height</div>'
+        '<div style="top:10px; height:20px;"><p style="top:660px; height:50px;">Nested</p></div>'
+        '</div>'
+    )
+
+    overflows = extract_slide_html(slide).overflows
+
+    assert [(o.index, o.tag, o.top, o.bottom) for o in overflows] == [(1, "div", 600, 700)]
+
+
+def test_safe_bottom_is_configurable():
+    slide = '<div id="slide"><div style="top:500px; height:100px;">Box</div></div>'
+
+    assert extract_slide_html(slide).overflows == []
+    assert len(extract_slide_html(slide, safe_bottom=550).overflows) == 1
+
+
+def test_streamed_in_pieces_matches_one_shot():
+    response = f"Here it is:\n```html\n{SLIDE}\n```\nDone."
+    extractor = SlideHTMLExtractor()
+    for i in range(0, len(response), 7):
+        extractor.feed(response[i:i + 7])
+    extractor.close()
+
+    assert extractor.result() == extract_slide_html(response)
@@ -0,0 +1,37 @@
+"""Opaque job list cursors."""
+import base64
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.repositories.job_repository import decode_job_cursor, encode_job_cursor
+
+
+def test_round_trip():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    job = SimpleNamespace(created_at=created_at, id="0b7e5c1e-job")
+
+    cursor = encode_job_cursor(job)
+
+    assert "=" not in cursor
+    assert decode_job_cursor(cursor) == (created_at, "0b7e5c1e-job")
+
+
+def test_round_trip_naive_datetime():
+    created_at = datetime(2026, 3, 1, 12, 30)
+    job = SimpleNamespace(created_at=created_at, id="j")
+
+    assert decode_job_cursor(encode_job_cursor(job)) == (created_at, "j")
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'["2026-03-01T12:30:00"]').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", "j"]').decode(),
+])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_job_cursor(cursor)
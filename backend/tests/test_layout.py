@@ -0,0 +1,152 @@
+"""Validating and repairing slide layouts."""
+from postprocess.layout import MIN_FONT_PX, fix_slide_layout, validate_slide_layout
+from postprocess.slide_parser import parse_slide
+
+
+def element(top, left, width, height, text="Text", style=""):
+    return (f'<div style="position:absolute; top:{top}px; left:{left}px; width:{width}px; '
+            f'height:{height}px;{style}">{text}</div>')
+
+
+def slide(*elements):
+    return f'<div id="slide" style="width:1280px; height:720px;">{"".join(elements)}</div>'
+
+
+def boxes(html):
+    """(top, left, width, height) of each direct child of #slide."""
+    return [
+        tuple(float(child.styles[key].rstrip("px")) for key in ("top", "left", "width", "height"))
+        for child in parse_slide(html).elements
+    ]
+
+
+def test_clean_slide_is_unchanged():
+    html = slide(
+        element(30, 60, 1160, 40, "Title"),
+        element(120, 60, 560, 200),
+        element(120, 660, 560, 200),
+        element(680, 60, 800, 20, "Footer"),
+    )
+
+    fixed, report = fix_slide_layout(html)
+
+    assert fixed == html
+    assert report.ok and not report.changed
+
+
+def test_validate_reports_without_changing():
+    html = slide(element(120, 60, 560, 200), element(300, 60, 560, 400))
+
+    report = validate_slide_layout(html)
+
+    assert report.overlaps == [(0, 1)]
+    assert report.overflows == [1]
+    assert not report.changed
+
+
+def test_stacked_overlap_is_pushed_down():
+    html = slide(element(120, 60, 560, 200), element(300, 60, 560, 100))
+
+    fixed, report = fix_slide_layout(html)
+
+    assert report.overlaps == [(0, 1)]
+    assert report.moved == [1]
+    # Below the first box plus the 15px gap
+    assert boxes(fixed)[1] == (335, 60, 560, 100)
+    assert validate_slide_layout(fixed).ok
+
+
+def test_small_side_by_side_overlap_is_narrowed():
+    html = slide(element(120, 60, 560, 200), element(120, 600, 560, 200))
+
+    fixed, report = fix_slide_layout(html)
+
+    assert report.narrowed == [1]
+    assert report.moved == []
+    # Starts 20px right of the first box and keeps its right edge
+    assert boxes(fixed)[1] == (120, 640, 520, 200)
+    assert validate_slide_layout(fixed).ok
+
+
+def test_large_side_by_side_overlap_is_pushed_down():
+    html = slide(element(120, 60, 560, 200), element(120, 300, 560, 200))
+
+    fixed, report = fix_slide_layout(html)
+
+    assert report.moved == [1]
+    assert boxes(fixed)[1] == (335, 300, 560, 200)
+
+
+def test_decoration_does_not_collide():
+    html = slide(element(120, 60, 560, 200, text=""), element(120, 60, 560, 200))
+
+    fixed, report = fix_slide_layout(html)
+
+    assert fixed == html
+    assert report.ok
+
+
+def test_overflow_is_scaled_to_fit_with_fonts():
+    html = slide(
+        element(100, 60, 560, 300, style=" font-size:20px;"),
+        element(400, 60, 560, 400, text='<p style="font-size:10px;">Small</p>'),
+        element(680, 60, 800, 20, "Footer", style=" font-size:12px;"),
+    )
+
+    fixed, report = fix_slide_layout(html, safe_bottom=670)
+
+    assert report.overflows == [1]
+    # Content zone 100..800 squeezed into 100..670
+    assert report.scale == (670 - 100) / (800 - 100)
+    first, second, footer = boxes(fixed)
+    assert first == (100, 60, 560, round(300 * report.scale, 1))
+    assert second[0] + second[3] <= 670
+    assert footer == (680, 60, 800, 20)
+    assert "font-size:16.3px" in fixed
+    # Not below MIN_FONT_PX (10px * 0.81 would be 8.1px)
+    assert f"font-size:{MIN_FONT_PX:g}px" in fixed
+    assert "font-size:12px" in fixed
+    assert validate_slide_layout(fixed).ok
+
+
+def test_overlap_then_overflow():
+    html = slide(element(120, 60, 560, 300), element(400, 60, 560, 260))
+
+    fixed, report = fix_slide_layout(html)
+
+    assert report.moved == [1]
+    assert report.scale < 1
+    assert validate_slide_layout(fixed).ok
+
+
+def test_title_overlap_is_repaired():
+    html = slide(
+        element(30, 60, 1160, 40, "Title", style=" font-size:28px;"),
+        element(65, 60, 1160, 20, "Subtitle"),
+        element(110, 60, 560, 100),
+    )
+
+    fixed, report = fix_slide_layout(html)
+
+    assert report.overlaps == [(0, 1)]
+    title, subtitle, content = boxes(fixed)
+    assert title == (30, 60, 1160, 40)
+    assert subtitle == (75, 60, 1160, 20)
+    assert content == (110, 60, 560, 100)
+    # Titles are never scaled
+    assert "font-size:28px" in fixed
+    assert validate_slide_layout(fixed).ok
+    assert fix_slide_layout(fixed)[0] == fixed
+
+
+def test_subtitle_pushed_into_content_moves_content():
+    html = slide(
+        element(30, 60, 1160, 60, "Title"),
+        element(70, 60, 1160, 30, "Subtitle"),
+        element(100, 60, 560, 100),
+    )
+
+    fixed, report = fix_slide_layout(html)
+
+    assert boxes(fixed)[1:] == [(95, 60, 1160, 30), (140, 60, 560, 100)]
+    assert validate_slide_layout(fixed).ok
@@ -0,0 +1,53 @@
+"""Splitting a batched LLM response into per-slide HTML."""
+from generate_ppt import split_batched_response
+
+
+def slide(text):
+    return f'<div id="slide" style="width:1280px; height:720px;"><p>{text}</p></div>'
+
+
+def test_splits_on_slide_breaks():
+    response = (
+        "Here are the slides:\n"
+        f"<!-- SLIDE_BREAK 3 -->\n```html\n{slide('three')}\n```\n"
+        f"<!--SLIDE_BREAK 4-->\n{slide('four')}\n"
+    )
+
+    assert split_batched_response(response, [3, 4]) == [slide("three"), slide("four")]
+
+
+def test_result_follows_requested_order():
+    response = f"<!-- SLIDE_BREAK 4 -->{slide('four')}<!-- SLIDE_BREAK 3 -->{slide('three')}"
+
+    assert split_batched_response(response, [3, 4]) == [slide("three"), slide("four")]
+
+
+def test_missing_slide_is_none():
+    response = f"<!-- SLIDE_BREAK 3 -->{slide('three')}"
+
+    assert split_batched_response(response, [3, 4]) == [slide("three"), None]
+
+
+def test_truncated_slide_is_none():
+    response = (
+        f"<!-- SLIDE_BREAK 3 -->{slide('three')}"
+        '<!-- SLIDE_BREAK 4 --><div id="slide" style="width:1280px;"><p>cut off'
+    )
+
+    assert split_batched_response(response, [3, 4]) == [slide("three"), None]
+
+
+def test_section_without_slide_is_none():
+    response = f"<!-- SLIDE_BREAK 3 -->Sorry, no slide here<!-- SLIDE_BREAK 4 -->{slide('four')}"
+
+    assert split_batched_response(response, [3, 4]) == [None, slide("four")]
+
+
+def test_first_repeated_delimiter_wins():
+    response = f"<!-- SLIDE_BREAK 3 -->{slide('first')}<!-- SLIDE_BREAK 3 -->{slide('second')}"
+
+    assert split_batched_response(response, [3]) == [slide("first")]
+
+
+def test_response_without_delimiters():
+    assert split_batched_response(slide("lonely"), [3, 4]) == [None, None]
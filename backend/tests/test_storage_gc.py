@@ -0,0 +1,247 @@
+"""Storage GC (retention, orphans, unused inputs) on local storage with stub repositories."""
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pytest
+
+from app.models.job import JobStatus
+from app.services.ppt_service import extraction_cache_key
+from app.services.s3_service import INPUTS_PREFIX, UPLOADS_PREFIX
+from app.tasks import maintenance_tasks
+from app.tasks.maintenance_tasks import (
+    _apply_retention,
+    _delete_orphaned_job_folders,
+    _delete_stale_extractions,
+    _delete_stale_uploads,
+    _delete_unused_inputs,
+    delete_job_files,
+    input_grace_cutoff,
+)
+
+NOW = datetime.now(timezone.utc)
+OLD = NOW - timedelta(days=30)
+
+
+@dataclass
+class Job:
+    id: str
+    input_s3_key: Optional[str]
+    status: JobStatus = JobStatus.COMPLETED
+    cancelled: bool = False
+    finished_at: datetime = OLD
+
+
+class StubJobRepository:
+    def __init__(self, *jobs):
+        self.jobs = {job.id: job for job in jobs}
+
+    def referenced_inputs(self, keys):
+        used = {job.input_s3_key for job in self.jobs.values()}
+        return {key for key in keys if key in used}
+
+    def existing_job_ids(self, job_ids):
+        return {job_id for job_id in job_ids if job_id in self.jobs}
+
+    def list_finished_jobs(self, status, finished_before, limit, cancelled=None):
+        jobs = [
+            job for job in self.jobs.values()
+            if job.status == status and job.finished_at < finished_before
+            and (cancelled is None or job.cancelled == cancelled)
+        ]
+        return sorted(jobs, key=lambda job: job.finished_at)[:limit]
+
+    def delete_job(self, job_id):
+        del self.jobs[job_id]
+
+
+class StubInputRepository:
+    def __init__(self, uploads=None):
+        # input key -> last upload time
+        self.uploads = dict(uploads or {})
+
+    def recently_uploaded(self, keys, since):
+        return {key for key in keys if key in self.uploads and self.uploads[key] >= since}
+
+    def delete_uploads(self, keys):
+        for key in keys:
+            self.uploads.pop(key, None)
+
+
+def input_key(n):
+    return f"{INPUTS_PREFIX}/{n:064x}.pdf"
+
+
+@pytest.fixture
+def storage(local_s3, tmp_path, monkeypatch):
+    monkeypatch.setattr(local_s3.settings, "storage_gc_grace_hours", 24)
+    monkeypatch.setattr(local_s3.settings, "storage_gc_batch_size", 500)
+    monkeypatch.setattr(local_s3.settings, "extraction_cache_ttl_days", 30)
+
+    def put(key, modified=OLD, data=b"data"):
+        path = tmp_path / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        os.utime(path, (modified.timestamp(), modified.timestamp()))
+        return key
+
+    def exists(key):
+        return (tmp_path / key).exists()
+
+    local_s3.put = put
+    local_s3.exists = exists
+    return local_s3
+
+
+def put_job_files(storage, job_id):
+    return [
+        storage.put(f"ppt-yash-proj/htmls/{job_id}/slide_1.html"),
+        storage.put(f"ppt-yash-proj/outputs/{job_id}/deck.pptx"),
+    ]
+
+
+def test_delete_job_files_deletes_folders_and_unused_input(storage):
+    files = put_job_files(storage, "job-1")
+    storage.put(input_key(1))
+    input_repo = StubInputRepository({input_key(1): OLD})
+
+    deleted = delete_job_files(storage, StubJobRepository(), input_repo, "job-1", input_key(1))
+
+    assert deleted.count == 3
+    assert not any(storage.exists(key) for key in files + [input_key(1)])
+    assert input_repo.uploads == {}
+
+
+def test_delete_job_files_keeps_input_used_by_another_job(storage):
+    put_job_files(storage, "job-1")
+    storage.put(input_key(1))
+
+    deleted = delete_job_files(
+        storage, StubJobRepository(Job("job-2", input_key(1))), StubInputRepository(), "job-1", input_key(1)
+    )
+
+    assert deleted.count == 2
+    assert storage.exists(input_key(1))
+
+
+def test_delete_job_files_keeps_input_stored_within_grace(storage):
+    storage.put(input_key(1), modified=NOW)
+
+    delete_job_files(storage, StubJobRepository(), StubInputRepository(), "job-1", input_key(1))
+
+    assert storage.exists(input_key(1))
+
+
+def test_delete_job_files_keeps_input_reuploaded_within_grace(storage):
+    # A dedup hit leaves the old object alone and only records the upload
+    storage.put(input_key(1))
+    input_repo = StubInputRepository({input_key(1): NOW})
+
+    delete_job_files(storage, StubJobRepository(), input_repo, "job-1", input_key(1))
+
+    assert storage.exists(input_key(1))
+    assert input_key(1) in input_repo.uploads
+
+
+def test_retention_deletes_expired_jobs_by_policy(storage, monkeypatch):
+    monkeypatch.setattr(storage.settings, "retention_completed_days", 0)
+    monkeypatch.setattr(storage.settings, "retention_failed_days", 14)
+    monkeypatch.setattr(storage.settings, "retention_cancelled_days", 1)
+    jobs = StubJobRepository(
+        Job("completed", input_key(1)),
+        Job("failed-old", input_key(2), JobStatus.FAILED),
+        Job("failed-recent", input_key(3), JobStatus.FAILED, finished_at=NOW - timedelta(days=2)),
+        Job("cancelled", input_key(4), JobStatus.FAILED, cancelled=True, finished_at=NOW - timedelta(days=2)),
+    )
+    for n, job_id in enumerate(["completed", "failed-old", "failed-recent", "cancelled"], start=1):
+        put_job_files(storage, job_id)
+        storage.put(input_key(n))
+
+    _apply_retention(storage, jobs, StubInputRepository(), NOW)
+
+    assert set(jobs.jobs) == {"completed", "failed-recent"}
+    assert storage.exists("ppt-yash-proj/outputs/completed/deck.pptx")
+    assert not storage.exists("ppt-yash-proj/outputs/failed-old/deck.pptx")
+    assert not storage.exists("ppt-yash-proj/outputs/cancelled/deck.pptx")
+    assert [storage.exists(input_key(n)) for n in range(1, 5)] == [True, False, True, False]
+
+
+def test_retention_disabled_by_zero_days(storage, monkeypatch):
+    for name in ("retention_completed_days", "retention_failed_days", "retention_cancelled_days"):
+        monkeypatch.setattr(storage.settings, name, 0)
+    jobs = StubJobRepository(Job("failed", None, JobStatus.FAILED), Job("completed", None))
+
+    deleted = _apply_retention(storage, jobs, StubInputRepository(), NOW)
+
+    assert deleted.count == 0
+    assert set(jobs.jobs) == {"failed", "completed"}
+
+
+def test_retention_batch_size(storage, monkeypatch):
+    monkeypatch.setattr(storage.settings, "retention_failed_days", 1)
+    monkeypatch.setattr(storage.settings, "retention_cancelled_days", 1)
+    monkeypatch.setattr(storage.settings, "storage_gc_batch_size", 2)
+    jobs = StubJobRepository(*[
+        Job(f"job-{n}", None, JobStatus.FAILED, cancelled=n % 2 == 0, finished_at=OLD + timedelta(hours=n))
+        for n in range(4)
+    ])
+
+    _apply_retention(storage, jobs, StubInputRepository(), NOW)
+
+    assert len(jobs.jobs) == 2
+
+
+def test_orphaned_job_folders(storage):
+    live = put_job_files(storage, "live")
+    orphaned = put_job_files(storage, "orphan")
+
+    deleted = _delete_orphaned_job_folders(storage, StubJobRepository(Job("live", None)))
+
+    assert deleted.count == 2
+    assert all(storage.exists(key) for key in live)
+    assert not any(storage.exists(key) for key in orphaned)
+
+
+def test_unused_inputs(storage, monkeypatch):
+    monkeypatch.setattr(maintenance_tasks, "GC_QUERY_BATCH", 2)
+    used = storage.put(input_key(1))
+    unused = storage.put(input_key(2))
+    stored_recently = storage.put(input_key(3), modified=NOW)
+    uploaded_recently = storage.put(input_key(4))
+    also_unused = storage.put(input_key(5))
+    input_repo = StubInputRepository({uploaded_recently: NOW, unused: OLD})
+
+    deleted = _delete_unused_inputs(
+        storage, StubJobRepository(Job("job", used)), input_repo, input_grace_cutoff()
+    )
+
+    assert deleted.count == 2
+    assert [storage.exists(key) for key in (used, unused, stored_recently, uploaded_recently, also_unused)] == \
+        [True, False, True, True, False]
+    assert input_repo.uploads == {uploaded_recently: NOW}
+
+
+def test_stale_uploads(storage):
+    stale = storage.put(f"{UPLOADS_PREFIX}/abc/old.pdf")
+    fresh = storage.put(f"{UPLOADS_PREFIX}/def/new.pdf", modified=NOW)
+
+    deleted = _delete_stale_uploads(storage, input_grace_cutoff())
+
+    assert deleted.count == 1
+    assert not storage.exists(stale)
+    assert storage.exists(fresh)
+
+
+def test_stale_extractions(storage):
+    storage.put(input_key(1))
+    valid = storage.put(extraction_cache_key(f"{1:064x}", "pdf", 10), modified=NOW)
+    expired = storage.put(extraction_cache_key(f"{1:064x}", "text", -1), modified=NOW - timedelta(days=31))
+    input_gone = storage.put(extraction_cache_key(f"{2:064x}", "pdf", 10), modified=NOW)
+    old_version = storage.put(f"ppt-yash-proj/cache/extract/v1/{1:064x}-10.json", modified=NOW)
+
+    deleted = _delete_stale_extractions(storage, NOW)
+
+    assert deleted.count == 3
+    assert storage.exists(valid)
+    assert not any(storage.exists(key) for key in (expired, input_gone, old_version))
@@ -0,0 +1,136 @@
+"""S3Service.upload_stream against a stub S3 client."""
+import asyncio
+import hashlib
+import threading
+
+import pytest
+
+from app.services.s3_service import S3Service, UploadTooLargeError
+
+CHUNK_SIZE = 4
+
+
+class StubS3Client:
+    """Records the S3 calls of an upload; upload_part fails for fail_part."""
+
+    def __init__(self, fail_part=None):
+        self.fail_part = fail_part
+        self.calls = []
+        self.parts = {}
+        self._lock = threading.Lock()
+
+    def _record(self, name, **kwargs):
+        with self._lock:
+            self.calls.append((name, kwargs))
+
+    def names(self):
+        return [name for name, _ in self.calls]
+
+    def put_object(self, **kwargs):
+        self._record("put_object", **kwargs)
+
+    def create_multipart_upload(self, **kwargs):
+        self._record("create_multipart_upload", **kwargs)
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, **kwargs):
+        self._record("upload_part", **kwargs)
+        if kwargs["PartNumber"] == self.fail_part:
+            raise RuntimeError("part failed")
+        with self._lock:
+            self.parts[kwargs["PartNumber"]] = kwargs["Body"]
+        return {"ETag": f'"etag-{kwargs["PartNumber"]}"'}
+
+    def complete_multipart_upload(self, **kwargs):
+        self._record("complete_multipart_upload", **kwargs)
+
+    def abort_multipart_upload(self, **kwargs):
+        self._record("abort_multipart_upload", **kwargs)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    s3 = S3Service()
+    monkeypatch.setattr(s3.settings, "aws_access_key_id", "test-key")
+    monkeypatch.setattr(s3.settings, "upload_chunk_size", CHUNK_SIZE)
+    monkeypatch.setattr(s3.settings, "upload_concurrency", 2)
+    s3.s3_client = StubS3Client()
+    return s3
+
+
+def upload(s3, chunks, max_bytes=None):
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    return asyncio.run(s3.upload_stream(body(), "uploads/a.txt", "text/plain", max_bytes=max_bytes))
+
+
+def test_single_part_uses_put_object(service):
+    stored = upload(service, [b"ab", b"c"])
+
+    assert service.s3_client.names() == ["put_object"]
+    _, call = service.s3_client.calls[0]
+    assert call["Body"] == b"abc"
+    assert call["ContentType"] == "text/plain"
+    assert stored.size == 3
+    assert stored.sha256 == hashlib.sha256(b"abc").hexdigest()
+
+
+def test_empty_body_uses_put_object(service):
+    stored = upload(service, [])
+
+    assert service.s3_client.names() == ["put_object"]
+    assert service.s3_client.calls[0][1]["Body"] == b""
+    assert stored.size == 0
+
+
+def test_multipart_parts_are_numbered_in_order(service):
+    data = b"0123456789abcdefghij"
+    # Chunk boundaries that do not line up with the parts
+    stored = upload(service, [data[:3], data[3:10], data[10:11], data[11:]])
+
+    client = service.s3_client
+    assert client.names()[0] == "create_multipart_upload"
+    assert client.names()[-1] == "complete_multipart_upload"
+    assert "abort_multipart_upload" not in client.names()
+    assert client.parts == {1: b"0123", 2: b"4567", 3: b"89ab", 4: b"cdef", 5: b"ghij"}
+    completed = client.calls[-1][1]["MultipartUpload"]["Parts"]
+    assert completed == [{"PartNumber": n, "ETag": f'"etag-{n}"'} for n in range(1, 6)]
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+
+
+def test_short_last_part(service):
+    upload(service, [b"0123456789"])
+
+    assert service.s3_client.parts == {1: b"0123", 2: b"4567", 3: b"89"}
+
+
+def test_limit_exceeded_mid_stream_aborts_upload(service):
+    with pytest.raises(UploadTooLargeError):
+        upload(service, [b"0123", b"4567", b"89ab", b"cdef"], max_bytes=10)
+
+    names = service.s3_client.names()
+    assert "create_multipart_upload" in names
+    assert names[-1] == "abort_multipart_upload"
+    assert "complete_multipart_upload" not in names
+    assert service.s3_client.calls[-1][1]["UploadId"] == "upload-1"
+
+
+def test_limit_exceeded_in_first_part_sends_nothing(service):
+    with pytest.raises(UploadTooLargeError):
+        upload(service, [b"0123456789"], max_bytes=5)
+
+    assert service.s3_client.calls == []
+
+
+def test_failed_part_aborts_upload(service):
+    service.s3_client.fail_part = 2
+
+    with pytest.raises(RuntimeError):
+        upload(service, [b"0123456789ab"])
+
+    names = service.s3_client.names()
+    assert names[-1] == "abort_multipart_upload"
+    assert "complete_multipart_upload" not in names
@@ -1,5 +1,6 @@
 import axios, { AxiosError } from 'axios';
 import { getAccessToken } from '@/lib/api';
+import { sha256File } from '@/lib/sha256';
 
 // PPT backend API URL (FastAPI)
 // Production URL first, then environment variable, then localhost fallback
@@ -9,6 +10,10 @@ const API_BASE_URL = process.env.NEXT_PUBLIC_PPT_API_URL || 'https://api-synthat
 
 const API_V1_PREFIX = '/api/v1';
 
+// Upload files straight to S3 with presigned URLs. Needs a CORS rule on the
+// bucket (see docs/ENV_GUIDE.md); uploads fall back to the API if it fails.
+const DIRECT_UPLOADS = process.env.NEXT_PUBLIC_DIRECT_UPLOADS === 'true';
+
 const apiClient = axios.create({
   baseURL: API_BASE_URL,
   timeout: 30000,
@@ -72,6 +77,8 @@ export interface JobResponse {
   error?: string;
   outputFormat?: 'pptx' | 'pdf';
   outputS3Key?: string;
+  etaSeconds?: number;
+  queuePosition?: number;
 }
 
 export interface ApiError {
@@ -83,8 +90,24 @@ export interface FileUploadResponse {
   s3_key: string;
   file_name: string;
   file_size: number;
+  sha256?: string | null;
 }
 
+interface PresignedUploadResponse {
+  upload_token: string;
+  s3_key: string;
+  expires_in: number;
+  already_uploaded: boolean;
+  url?: string | null;
+  headers: Record<string, string>;
+  upload_id?: string | null;
+  part_size?: number | null;
+  part_urls: string[];
+}
+
+// PUTs straight to S3 (no auth header, no API timeout)
+const storageClient = axios.create({ timeout: 0 });
+
 export interface JobCreateResponse {
   job_id: string;
   status: JobResponse['status'];
@@ -103,6 +126,10 @@ export interface JobStatusResponse {
   updated_at?: string | null;
   started_at?: string | null;
   completed_at?: string | null;
+  // Only returned by GET /jobs/{id}, for unfinished jobs
+  eta_seconds?: number | null;
+  queue_position?: number | null;
+  estimated_completion_at?: string | null;
 }
 
 export interface JobListResponse {
@@ -110,6 +137,7 @@ export interface JobListResponse {
   total: number;
   page: number;
   page_size: number;
+  next_cursor?: string | null;
 }
 
 export interface PresignedUrlResponse {
@@ -174,11 +202,23 @@ function mapJobStatusToJobResponse(job: JobStatusResponse): JobResponse {
     error: job.error_message ?? undefined,
     outputFormat,
     outputS3Key,
+    etaSeconds: job.eta_seconds ?? undefined,
+    queuePosition: job.queue_position ?? undefined,
   };
 }
 
 export const pptApi = {
   async uploadFile(file: File): Promise<FileUploadResponse> {
+    if (DIRECT_UPLOADS) {
+      try {
+        return await pptApi.uploadFileDirect(file);
+      } catch (error) {
+        // No S3 behind the API (501 in dev mode), a bucket without the CORS
+        // rule, a failed PUT...: upload through the API instead
+        console.warn('[PPT API] Direct upload failed, uploading through the API:', error);
+      }
+    }
+
     const formData = new FormData();
     formData.append('file', file);
 
@@ -192,6 +232,32 @@ export const pptApi = {
     }
   },
 
+  async uploadFileDirect(file: File): Promise<FileUploadResponse> {
+    const presign = await apiClient.post<PresignedUploadResponse>(`${API_V1_PREFIX}/upload/presign`, {
+      file_name: file.name,
+      file_size: file.size,
+      sha256: await sha256File(file),
+      content_type: file.type || undefined,
+    });
+    const upload = presign.data;
+
+    if (upload.already_uploaded) {
+      // Same content stored before: nothing to send
+    } else if (upload.url) {
+      await storageClient.put(upload.url, file, { headers: upload.headers });
+    } else {
+      const partSize = upload.part_size as number;
+      await Promise.all(
+        upload.part_urls.map((url, i) => storageClient.put(url, file.slice(i * partSize, (i + 1) * partSize)))
+      );
+    }
+
+    const response = await apiClient.post<FileUploadResponse>(`${API_V1_PREFIX}/upload/complete`, {
+      upload_token: upload.upload_token,
+    });
+    return response.data;
+  },
+
   async createJob(payload: CreateJobPayload): Promise<JobResponse> {
     try {
       const upload = await pptApi.uploadFile(payload.file);
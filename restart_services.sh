@@ -29,7 +29,10 @@ sleep 3
 # Start Celery worker
 echo "🔨 Starting Celery worker..."
 cd ..
-nohup celery -A backend.app.celery_app worker --loglevel=info > logs/celery.log 2>&1 &
+# The prefork pool's children export metrics through an empty shared directory
+METRICS_DIR=/tmp/synthatext-worker-metrics
+rm -rf "$METRICS_DIR" && mkdir -p "$METRICS_DIR"
+PROMETHEUS_MULTIPROC_DIR="$METRICS_DIR" nohup celery -A backend.app.celery_app worker --loglevel=info > logs/celery.log 2>&1 &
 CELERY_PID=$!
 echo "   Celery PID: $CELERY_PID"
 